@@ -0,0 +1,181 @@
+"""
+SecureVigil Async Scanner Module
+asyncio scan engine running one nmap process per host with bounded concurrency
+"""
+
+import asyncio
+import ipaddress
+import shlex
+import time
+from typing import List, Dict, Iterator, Optional
+
+import nmap
+
+from scanner import VulnerabilityScanner
+
+# Async engine defaults
+DEFAULT_CONCURRENCY = 32
+DEFAULT_HOST_TIMEOUT = 300.0
+
+
+def iter_hosts(target: str) -> Iterator[str]:
+    """
+    Lazily expand a target into individual host addresses
+
+    Args:
+        target: IP address, CIDR range or hostname, or several separated by spaces
+
+    Yields:
+        Host addresses (hostnames and nmap range syntax are yielded as-is)
+    """
+    for part in target.split():
+        try:
+            network = ipaddress.ip_network(part, strict=False)
+        except ValueError:
+            yield part
+            continue
+
+        # Every address in the range, network and broadcast included, as
+        # nmap and split_target cover them
+        for host in network:
+            yield str(host)
+
+
+class AsyncScanner:
+    """asyncio scan engine with per-host deadlines and a concurrency cap"""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY,
+                 host_timeout: float = DEFAULT_HOST_TIMEOUT,
+                 nmap_path: str = "nmap"):
+        self.concurrency = max(1, concurrency)
+        self.host_timeout = host_timeout
+        self.nmap_path = nmap_path
+        # Only used to parse XML output; never runs a scan itself
+        self.nm = nmap.PortScanner()
+        self.timed_out: List[str] = []
+        self.failed: List[str] = []
+
+    async def scan(self, target: str, scan_type: str = "-sV -T4",
+                   total_timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Scan every host in target, at most self.concurrency at a time
+
+        Hosts that exceed host_timeout are killed and recorded in
+        self.timed_out; hosts whose scan raises are recorded in self.failed
+        and the rest of the scan continues. When total_timeout expires,
+        running nmap processes are killed and the results gathered so far
+        are returned.
+
+        Args:
+            target: IP address or CIDR range
+            scan_type: Nmap scan arguments (default: -sV -T4)
+            total_timeout: Optional deadline in seconds for the whole scan
+
+        Returns:
+            List of discovered services with details
+        """
+        print(f"[*] Starting async scan on {target} "
+              f"(concurrency {self.concurrency}, host timeout {self.host_timeout}s)...")
+
+        start = time.perf_counter()
+        self.timed_out = []
+        self.failed = []
+        results: List[Dict] = []
+        hosts = iter_hosts(target)
+        arguments = shlex.split(scan_type)
+
+        async def worker() -> None:
+            # Workers pull from a shared lazy iterator, so a /16 never
+            # materialises 65k pending tasks
+            for host in hosts:
+                results.extend(await self._scan_host(host, arguments))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.wait_for(asyncio.gather(*workers), timeout=total_timeout)
+        except asyncio.TimeoutError:
+            print(f"[!] Scan deadline of {total_timeout}s reached, "
+                  f"cancelled remaining hosts")
+
+        elapsed = time.perf_counter() - start
+        hosts_seen = len({item["host"] for item in results})
+        print(f"[+] Scan complete. Found {len(results)} services on {hosts_seen} hosts "
+              f"in {elapsed:.2f} seconds")
+        if self.timed_out:
+            print(f"[!] {len(self.timed_out)} hosts exceeded the {self.host_timeout}s deadline")
+        if self.failed:
+            print(f"[!] {len(self.failed)} hosts failed to scan")
+        return results
+
+    async def _scan_host(self, host: str, arguments: List[str]) -> List[Dict]:
+        """Scan a single host, reporting errors and returning empty results"""
+        try:
+            return await self._run_nmap(host, arguments)
+        except Exception as e:
+            # e.g. nmap missing or out of file descriptors; other hosts carry on
+            print(f"[!] Scan error on {host}: {e}")
+            self.failed.append(host)
+            return []
+
+    async def _run_nmap(self, host: str, arguments: List[str]) -> List[Dict]:
+        """
+        Run nmap against a single host under the per-host deadline
+
+        Args:
+            host: Host address
+            arguments: Nmap scan arguments, already split
+
+        Returns:
+            List of the host's discovered services
+        """
+        process = await asyncio.create_subprocess_exec(
+            self.nmap_path, "-oX", "-", *arguments, host,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        try:
+            output, errors = await asyncio.wait_for(process.communicate(),
+                                                    timeout=self.host_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out.append(host)
+            return []
+        finally:
+            # Covers both the per-host deadline and cancellation of the scan
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        self.nm.analyse_nmap_xml_scan(nmap_xml_output=output.decode(),
+                                      nmap_err=errors.decode())
+        return VulnerabilityScanner._collect_results(self.nm)
+
+
+def async_scan_target(target: str, scan_type: str = "-sV -T4",
+                      concurrency: int = DEFAULT_CONCURRENCY,
+                      host_timeout: float = DEFAULT_HOST_TIMEOUT,
+                      total_timeout: Optional[float] = None) -> List[Dict]:
+    """
+    Convenience function running the async engine from synchronous code
+
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap scan arguments
+        concurrency: Maximum number of concurrent nmap processes
+        host_timeout: Per-host deadline in seconds
+        total_timeout: Optional deadline in seconds for the whole scan
+
+    Returns:
+        List of scan results
+    """
+    scanner = AsyncScanner(concurrency, host_timeout)
+    return asyncio.run(scanner.scan(target, scan_type, total_timeout))
+
+
+if __name__ == "__main__":
+    # Example usage
+    target = input("Enter target IP or CIDR range: ")
+    results = async_scan_target(target, host_timeout=60)
+
+    for item in results:
+        print(f"[{item['host']}:{item['port']}] {item['service']}")
@@ -0,0 +1,604 @@
+"""
+SecureVigil Benchmarks
+Micro-benchmarks for the scan → risk → database pipeline
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Iterator, List, Dict
+
+from finding import Finding
+from risk_engine import (classify_risk, get_recommendation, get_recommendation_cache_stats,
+                         apply_risk, RiskSummary, TopFindings)
+from vuln_index import VulnerabilityIndex
+
+# Original list-scanning classifier, kept as the baseline for bench_classify
+_LEGACY_HIGH_PORTS = [21, 23, 25, 445, 1433, 3306, 3389, 5432, 5900, 6379]
+_LEGACY_MEDIUM_PORTS = [80, 139, 443, 8080, 8443]
+_LEGACY_HIGH_SERVICES = ["telnet", "ftp", "smb", "rdp", "mysql", "postgresql", "vnc", "redis"]
+_LEGACY_UNENCRYPTED = ["http", "ftp", "telnet", "smtp"]
+
+# Realistic mix of services seen on enterprise networks
+SAMPLE_SERVICES = [
+    (22, "ssh", "OpenSSH", "8.9p1"),
+    (80, "http", "Apache httpd", "2.4.52"),
+    (443, "https", "nginx", "1.18.0"),
+    (445, "microsoft-ds", "Samba smbd", "4.15"),
+    (3389, "ms-wbt-server", "Microsoft Terminal Services", ""),
+    (3306, "mysql", "MySQL", "8.0.32"),
+    (21, "ftp", "vsftpd", "2.0.8"),
+    (8080, "http-proxy", "Jetty", "9.4.z"),
+    (25, "smtp", "Postfix smtpd", ""),
+    (53, "domain", "ISC BIND", "9.16.1"),
+]
+
+
+def _fresh(value: str) -> str:
+    """Return an equal but distinct string object, as parsing nmap XML would"""
+    return value.encode().decode()
+
+
+def make_findings(count: int, factory: Callable = dict, seed: int = 42) -> List:
+    """
+    Build synthetic scan findings
+
+    Args:
+        count: Number of findings
+        factory: Record constructor taking keyword fields (dict or Finding)
+        seed: Random seed for reproducible data
+
+    Returns:
+        List of findings
+    """
+    rng = random.Random(seed)
+    findings = []
+    for i in range(count):
+        port, service, product, version = rng.choice(SAMPLE_SERVICES)
+        host_id = i // 4  # about four open ports per host
+        findings.append(factory(
+            host=f"10.{(host_id >> 16) & 255}.{(host_id >> 8) & 255}.{host_id & 255}",
+            hostname="",
+            port=port,
+            protocol=_fresh("tcp"),
+            service=_fresh(service),
+            product=_fresh(product),
+            version=_fresh(version),
+            extrainfo="",
+            state=_fresh("open"),
+            risk=_fresh("HIGH"),
+            recommendation="Review and harden configuration",
+            cvss_estimate=7.5
+        ))
+    return findings
+
+
+def measure_memory(build: Callable[[], List]) -> int:
+    """
+    Measure bytes allocated by a builder function that returns a list
+
+    Args:
+        build: Zero-argument function building the objects to measure
+
+    Returns:
+        Bytes still allocated once the list is built
+    """
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current
+
+
+def bench_finding_memory(count: int = 100_000) -> Dict:
+    """
+    Compare memory use of dict findings against slotted Finding records
+
+    Args:
+        count: Number of findings to build
+
+    Returns:
+        Dictionary with bytes per finding for each representation and the saving
+    """
+    dict_bytes = measure_memory(lambda: make_findings(count, dict))
+    slot_bytes = measure_memory(lambda: make_findings(count, Finding))
+
+    findings = make_findings(count, Finding)
+    start = time.perf_counter()
+    for item in findings:
+        item.get("risk")
+        item["port"]
+    access_time = time.perf_counter() - start
+
+    return {
+        "count": count,
+        "dict_bytes_per_finding": round(dict_bytes / count, 1),
+        "finding_bytes_per_finding": round(slot_bytes / count, 1),
+        "saving_percent": round((1 - slot_bytes / dict_bytes) * 100, 1),
+        "finding_access_ns": round(access_time / count / 2 * 1e9, 1)
+    }
+
+
+def _classify_risk_legacy(port: int, service: str, version: str = "") -> str:
+    """classify_risk as it was before the rules were compiled"""
+    service_lower = service.lower()
+    if port in _LEGACY_HIGH_PORTS:
+        return "HIGH"
+    if any(risky in service_lower for risky in _LEGACY_HIGH_SERVICES):
+        return "HIGH"
+    if service_lower in _LEGACY_UNENCRYPTED:
+        return "MEDIUM"
+    if port in _LEGACY_MEDIUM_PORTS:
+        return "MEDIUM"
+    if version:
+        outdated_indicators = ["1.0", "2.0", "legacy", "old", "deprecated"]
+        if any(indicator in version.lower() for indicator in outdated_indicators):
+            return "MEDIUM"
+    return "LOW"
+
+
+def make_classify_inputs(count: int, seed: int = 42) -> List[tuple]:
+    """
+    Build (port, service, version) tuples with a long tail of unusual ports
+    
+    Args:
+        count: Number of inputs
+        seed: Random seed for reproducible data
+    
+    Returns:
+        List of classify_risk argument tuples
+    """
+    rng = random.Random(seed)
+    extra = [(9200, "elasticsearch", "7.10.2"), (5601, "kibana", ""),
+             (27017, "mongodb", "3.6.8"), (161, "snmp", "legacy"),
+             (8888, "http-alt", "old-build"), (1723, "pptp", "")]
+    pool = [(port, service, version) for port, service, _, version in SAMPLE_SERVICES] + extra
+    return [rng.choice(pool) if rng.random() < 0.8
+            else (rng.randint(1024, 65535), rng.choice(("unknown", "tcpwrapped", "ssl")), "")
+            for _ in range(count)]
+
+
+def bench_classify(count: int = 1_000_000) -> Dict:
+    """
+    Measure classify_risk throughput against the original list-based rules
+    
+    Args:
+        count: Number of classifications
+    
+    Returns:
+        Dictionary with classifications per second for each and the speedup
+    """
+    inputs = make_classify_inputs(count)
+    
+    start = time.perf_counter()
+    legacy = [_classify_risk_legacy(*args) for args in inputs]
+    legacy_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    compiled = [classify_risk(*args) for args in inputs]
+    compiled_time = time.perf_counter() - start
+    
+    if legacy != compiled:
+        raise AssertionError("compiled rules disagree with the original classifier")
+    
+    return {
+        "count": count,
+        "legacy_per_second": round(count / legacy_time),
+        "compiled_per_second": round(count / compiled_time),
+        "speedup": round(legacy_time / compiled_time, 2)
+    }
+
+
+def _get_recommendation_legacy(item: Dict) -> str:
+    """get_recommendation as it was before the tables were memoized"""
+    risk_level = item.get("risk", "LOW")
+    service = item.get("service", "unknown")
+    port = item.get("port", 0)
+    recommendations = {
+        "HIGH": {
+            "telnet": "URGENT: Disable Telnet and use SSH instead",
+            "ftp": "URGENT: Disable FTP or use SFTP/FTPS with encryption",
+            "smb": "URGENT: Restrict SMB access, apply patches, use SMBv3",
+            "rdp": "URGENT: Restrict RDP access, use VPN, enable NLA",
+            "mysql": "URGENT: Restrict database access to localhost or VPN only",
+            "postgresql": "URGENT: Restrict database access to localhost or VPN only",
+            "default": f"URGENT: Disable or restrict {service} on port {port}"
+        },
+        "MEDIUM": {
+            "http": f"Review and consider enabling HTTPS for {service}",
+            "default": f"Review and harden {service} configuration"
+        },
+        "LOW": {
+            "default": f"Monitor {service} for updates and security advisories"
+        }
+    }
+    risk_recommendations = recommendations.get(risk_level, recommendations["LOW"])
+    return risk_recommendations.get(service, risk_recommendations["default"])
+
+
+def bench_recommendations(count: int = 300_000) -> Dict:
+    """
+    Measure get_recommendation throughput and cache hit rate
+    
+    Args:
+        count: Number of findings
+    
+    Returns:
+        Dictionary with recommendations per second before and after
+        memoization, the speedup and the cache hit rate
+    """
+    findings = make_findings(count, Finding)
+    for item, (port, service, version) in zip(findings, make_classify_inputs(count)):
+        item["port"], item["service"] = port, service
+        item["risk"] = classify_risk(port, service, version)
+    
+    start = time.perf_counter()
+    legacy = [_get_recommendation_legacy(item) for item in findings]
+    legacy_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    memoized = [get_recommendation(item) for item in findings]
+    memoized_time = time.perf_counter() - start
+    
+    if legacy != memoized:
+        raise AssertionError("memoized recommendations disagree with the original")
+    
+    return {
+        "count": count,
+        "legacy_per_second": round(count / legacy_time),
+        "memoized_per_second": round(count / memoized_time),
+        "speedup": round(legacy_time / memoized_time, 2),
+        "cache_hit_rate": get_recommendation_cache_stats()["hit_rate"]
+    }
+
+
+def write_vuln_data(path: str, products: int = 5000, ranges: int = 20, seed: int = 42) -> int:
+    """
+    Write a synthetic offline vulnerability data file
+    
+    Args:
+        path: Output CSV path
+        products: Number of distinct products (the sample services included)
+        ranges: Affected version ranges per product
+        seed: Random seed for reproducible data
+    
+    Returns:
+        Number of records written
+    """
+    rng = random.Random(seed)
+    names = [product for _, _, product, _ in SAMPLE_SERVICES if product]
+    names += [f"vendor{i}:product{i}" for i in range(products - len(names))]
+    records = 0
+    with open(path, "w") as f:
+        f.write("product,affected_from,fixed_in,cve,cvss\n")
+        for name in names:
+            for _ in range(ranges):
+                major, minor = rng.randint(0, 9), rng.randint(0, 20)
+                start = f"{major}.{minor}"
+                fixed = f"{major}.{minor + rng.randint(1, 10)}" if rng.random() < 0.9 else ""
+                f.write(f"{name},{start},{fixed},CVE-{rng.randint(1999, 2026)}-"
+                        f"{rng.randint(1000, 99999)},{rng.uniform(2, 10):.1f}\n")
+                records += 1
+    return records
+
+
+def bench_vuln_match(count: int = 1_000_000) -> Dict:
+    """
+    Measure vulnerability index load time and product/version match throughput
+    
+    Args:
+        count: Number of lookups
+    
+    Returns:
+        Dictionary with records, load time, matches per second (cold cache
+        and steady state) and the share of lookups that matched
+    """
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        records = write_vuln_data(path)
+        start = time.perf_counter()
+        index = VulnerabilityIndex(path)
+        load_time = time.perf_counter() - start
+    finally:
+        os.remove(path)
+    
+    rng = random.Random(7)
+    products = [product for _, _, product, _ in SAMPLE_SERVICES if product]
+    products += [f"product{i}" for i in range(200)]
+    lookups = [(rng.choice(products), f"{rng.randint(0, 9)}.{rng.randint(0, 30)}")
+               for _ in range(count)]
+    
+    # Every lookup through the uncached path measures the interval search itself
+    start = time.perf_counter()
+    for product, version in lookups:
+        index._match(product, version)
+    search_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    matched = sum(1 for product, version in lookups if index.match(product, version))
+    cached_time = time.perf_counter() - start
+    
+    return {
+        "records": records,
+        "load_seconds": round(load_time, 3),
+        "search_per_second": round(count / search_time),
+        "cached_per_second": round(count / cached_time),
+        "matched_percent": round(matched / count * 100, 1),
+        "cache_hit_rate": index.cache_stats()["hit_rate"]
+    }
+
+
+# Estate sizes for bench_estate, by name
+ESTATE_SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Findings generated, and timed, per batch
+ESTATE_BATCH_SIZE = 10_000
+
+# Host roles in a synthetic estate: (weight, [(port, service, product,
+# versions, probability the port is open)])
+HOST_PROFILES = [
+    (40, [(22, "ssh", "OpenSSH", ("7.4", "8.2p1", "8.9p1", "9.6p1"), 0.95),
+          (80, "http", "Apache httpd", ("2.4.6", "2.4.52", "2.4.58"), 0.4),
+          (443, "https", "nginx", ("1.14.1", "1.18.0", "1.24.0"), 0.4),
+          (111, "rpcbind", "", ("2-4",), 0.3)]),
+    (25, [(135, "msrpc", "Microsoft Windows RPC", ("",), 0.95),
+          (139, "netbios-ssn", "Microsoft Windows netbios-ssn", ("",), 0.9),
+          (445, "microsoft-ds", "Microsoft Windows Server", ("2016", "2019", "2022"), 0.9),
+          (3389, "ms-wbt-server", "Microsoft Terminal Services", ("",), 0.6)]),
+    (10, [(80, "http", "nginx", ("1.18.0", "1.24.0"), 0.9),
+          (443, "https", "nginx", ("1.18.0", "1.24.0"), 0.95),
+          (8080, "http-proxy", "Jetty", ("9.4.z", "10.0.18"), 0.3),
+          (8443, "https-alt", "Apache Tomcat", ("9.0.83",), 0.2)]),
+    (8, [(22, "ssh", "OpenSSH", ("8.2p1", "8.9p1"), 0.9),
+         (3306, "mysql", "MySQL", ("5.7.44", "8.0.32"), 0.5),
+         (5432, "postgresql", "PostgreSQL DB", ("12.17", "15.5"), 0.4),
+         (6379, "redis", "Redis key-value store", ("6.0.16", "7.2.4"), 0.2)]),
+    (10, [(23, "telnet", "", ("",), 0.5),
+          (80, "http", "lighttpd", ("1.4.35", "legacy"), 0.8),
+          (161, "snmp", "net-snmp", ("5.7.2",), 0.4),
+          (21, "ftp", "vsftpd", ("2.0.8", "3.0.3"), 0.3)]),
+    (7, [(25, "smtp", "Postfix smtpd", ("",), 0.8),
+         (53, "domain", "ISC BIND", ("9.11.4", "9.16.1"), 0.5),
+         (993, "imaps", "Dovecot imapd", ("",), 0.6),
+         (1433, "ms-sql-s", "Microsoft SQL Server", ("2019",), 0.2)]),
+]
+
+# Services found on arbitrary high ports, one chance per host
+TAIL_SERVICES = ["unknown", "tcpwrapped", "ssl", "http-alt", "upnp"]
+TAIL_PORT_CHANCE = 0.15
+
+
+def iter_estate(count: int, batch_size: int = ESTATE_BATCH_SIZE,
+                seed: int = 42) -> Iterator[List[Dict]]:
+    """
+    Stream a synthetic estate of scan findings in batches
+
+    Hosts are drawn from HOST_PROFILES, so ports, services and versions
+    cluster the way they do on real networks, with a long tail of
+    unclassified high ports. Only one batch is held at a time.
+
+    Args:
+        count: Total number of findings
+        batch_size: Findings per batch
+        seed: Random seed for reproducible data
+
+    Yields:
+        Lists of unclassified finding dicts, as the scanner produces them
+    """
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in HOST_PROFILES]
+    profiles = [services for _, services in HOST_PROFILES]
+    produced = 0
+    host_id = 0
+    batch: List[Dict] = []
+
+    while produced < count:
+        host = f"10.{(host_id >> 16) & 255}.{(host_id >> 8) & 255}.{host_id & 255}"
+        host_id += 1
+        services = [(port, service, product, rng.choice(versions))
+                    for port, service, product, versions, chance
+                    in rng.choices(profiles, weights)[0] if rng.random() < chance]
+        if rng.random() < TAIL_PORT_CHANCE:
+            services.append((rng.randint(1024, 65535), rng.choice(TAIL_SERVICES), "", ""))
+
+        for port, service, product, version in services:
+            batch.append({
+                "host": host, "hostname": "", "port": port, "protocol": "tcp",
+                "state": "open" if rng.random() < 0.97 else "filtered",
+                "service": service, "product": product, "version": version,
+                "extrainfo": ""
+            })
+            produced += 1
+            if len(batch) == batch_size or produced == count:
+                yield batch
+                batch = []
+                if produced == count:
+                    break
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    return ordered[max(0, -(-len(ordered) * percent // 100) - 1)]
+
+
+def _estate_stages(limit: int) -> List[tuple]:
+    """
+    Build the stages timed by bench_estate, in pipeline order
+
+    Each stage is (name, per-batch function, finish function, keeps state).
+    apply_risk is called as main.py calls it, sort included. The summary
+    and priority stages accumulate across batches exactly as
+    generate_risk_summary and get_priority_findings do over a whole list.
+    """
+    summary = RiskSummary()
+    top = TopFindings(limit)
+    return [
+        ("apply_risk", apply_risk, lambda: None, False),
+        ("generate_risk_summary", summary.update, summary.to_dict, True),
+        ("get_priority_findings", top.update, top.results, True),
+    ]
+
+
+def bench_estate(count: int, batch_size: int = ESTATE_BATCH_SIZE, limit: int = 10,
+                 memory: bool = True, seed: int = 42) -> Dict:
+    """
+    Measure how the risk pipeline scales over a synthetic estate
+
+    The estate is streamed once for timing: throughput covers every batch
+    plus the final summary/top-k step, and p99 is taken over per-batch
+    call times. Generation time is excluded. Peak memory is measured in a
+    second pass under tracemalloc (which would distort the timings): the
+    highest memory a stage holds at once, i.e. its accumulated state plus
+    the transient allocations of a call, excluding the input batch.
+
+    Args:
+        count: Number of findings
+        batch_size: Findings per batch
+        limit: Number of priority findings kept
+        memory: Run the peak memory pass
+        seed: Random seed for reproducible data
+
+    Returns:
+        Dictionary with count, batches and per-stage findings_per_second,
+        p50_batch_ms, p99_batch_ms and peak_memory_kib
+    """
+    stages = _estate_stages(limit)
+    timings: Dict[str, List[float]] = {name: [] for name, *_ in stages}
+    batches = 0
+
+    for batch in iter_estate(count, batch_size, seed):
+        batches += 1
+        for name, run, _, _ in stages:
+            start = time.perf_counter()
+            run(batch)
+            timings[name].append(time.perf_counter() - start)
+
+    result: Dict = {"count": count, "batches": batches, "batch_size": batch_size}
+    for name, _, finish, _ in stages:
+        start = time.perf_counter()
+        finish()
+        total = sum(timings[name]) + time.perf_counter() - start
+        result[name] = {
+            "findings_per_second": round(count / total) if total else None,
+            "total_seconds": round(total, 3),
+            "p50_batch_ms": round(_percentile(timings[name], 50) * 1000, 3),
+            "p99_batch_ms": round(_percentile(timings[name], 99) * 1000, 3),
+        }
+
+    if memory:
+        for name, peak in _estate_peak_memory(count, batch_size, limit, seed).items():
+            result[name]["peak_memory_kib"] = round(peak / 1024, 1)
+    return result
+
+
+def _estate_peak_memory(count: int, batch_size: int, limit: int, seed: int) -> Dict[str, int]:
+    """Peak bytes held by each bench_estate stage, measured under tracemalloc"""
+    stages = _estate_stages(limit)
+    retained = {name: 0 for name, *_ in stages}
+    peaks = {name: 0 for name, *_ in stages}
+
+    tracemalloc.start()
+    try:
+        for batch in iter_estate(count, batch_size, seed):
+            for name, run, _, stateful in stages:
+                if not stateful:
+                    retained[name] = 0  # Its output lives in the batch, freed with it
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                run(batch)
+                current, peak = tracemalloc.get_traced_memory()
+                peaks[name] = max(peaks[name], retained[name] + peak - before)
+                retained[name] += current - before
+            del batch
+
+        for name, _, finish, _ in stages:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            finish()
+            peaks[name] = max(peaks[name],
+                              retained[name] + tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def print_result(name: str, result: Dict) -> None:
+    """Print one benchmark result"""
+    print(f"\n[{name}]")
+    for key, value in result.items():
+        if isinstance(value, dict):
+            print(f"  {key}:")
+            for field, number in value.items():
+                print(f"    {field}: {number}")
+        else:
+            print(f"  {key}: {value}")
+
+
+def write_results(path: str, results: Dict) -> None:
+    """
+    Write benchmark results as JSON, with enough context to compare runs
+
+    Args:
+        path: Output file path
+        results: Benchmark results by name
+    """
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[+] Results written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SecureVigil benchmarks")
+    parser.add_argument("--count", type=int, default=100_000,
+                        help="Number of synthetic findings (default: 100000)")
+    parser.add_argument("--classify-count", type=int, default=1_000_000,
+                        help="Number of classifications to time (default: 1000000)")
+    parser.add_argument("--estates", default="10k,1m,10m",
+                        help="Comma-separated synthetic estate sizes to run: "
+                             f"{', '.join(ESTATE_SIZES)} or a number, empty to skip "
+                             "(default: 10k,1m,10m)")
+    parser.add_argument("--batch-size", type=int, default=ESTATE_BATCH_SIZE,
+                        help=f"Findings per estate batch (default: {ESTATE_BATCH_SIZE})")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the estate peak memory pass")
+    parser.add_argument("--estates-only", action="store_true",
+                        help="Skip the micro-benchmarks")
+    parser.add_argument("--json", metavar="FILE",
+                        help="Write machine-readable results to FILE")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    benches = [] if args.estates_only else [
+        ("finding memory", lambda: bench_finding_memory(args.count)),
+        ("classify_risk", lambda: bench_classify(args.classify_count)),
+        ("recommendations", lambda: bench_recommendations(args.count)),
+        ("vulnerability index", lambda: bench_vuln_match(args.classify_count)),
+    ]
+    for size in filter(None, (part.strip().lower() for part in args.estates.split(","))):
+        count = ESTATE_SIZES.get(size) or int(size)
+        benches.append((f"estate {size}", lambda count=count: bench_estate(
+            count, args.batch_size, memory=not args.no_memory)))
+
+    for name, bench in benches:
+        results[name] = bench()
+        print_result(name, results[name])
+
+    if args.json:
+        write_results(args.json, results)
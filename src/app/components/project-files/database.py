@@ -3,143 +3,815 @@ SecureVigil Database Module
 SQLite persistence for vulnerability scan results and historical tracking
 """
 
+import atexit
+import os
+import re
 import sqlite3
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Tuple
 import json
 
+from finding import Finding
+from risk_engine import RiskSummary, get_rules, get_rules_version, normalize_rules
+
 
 DB_NAME = "vulnerabilities.db"
 
+# Applied once to every managed connection when it is opened
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",      # Readers and the writer do not block each other
+    "synchronous": "NORMAL",    # Safe with WAL; fsync at checkpoints only
+    "cache_size": -16000,       # Negative means KiB: 16 MB page cache
+    "mmap_size": 268435456,     # Read up to 256 MB through a memory map
+}
+
+# Seconds a connection waits for a lock held by another connection
+BUSY_TIMEOUT = 30
+
+# Secondary indexes on the scans table, by name. Each matches the filter
+# and ORDER BY of a helper so no query scans the table or sorts:
+#   idx_scan_findings  get_scan_by_id, get_scan_totals, refresh_scan_summaries
+#   idx_risk_date      get_high_risk_findings
+#   idx_host_date      get_host_history, get_latest_findings
+#   idx_scan_date      get_all_scans
+#   idx_scored_rule_version  get_rule_version_counts, rescoring (rule-scored rows only)
+SCAN_INDEXES = {
+    "idx_scan_findings": "scans(scan_id, risk DESC, port)",
+    "idx_risk_date": "scans(risk, scan_date)",
+    "idx_host_date": "scans(host, scan_date)",
+    "idx_scan_date": "scans(scan_date, risk)",
+    "idx_scored_rule_version": "scans(rule_version, cves) WHERE cves IS NULL",
+}
+
+# The same indexes in the normalized layout, where scans is a view. Dates
+# are indexed in the view's text form so its ORDER BY can use them. The
+# last two let prune_dimensions check each interned row with a seek.
+NORMALIZED_INDEXES = {
+    "idx_scan_findings": "scan_findings(scan_id, risk DESC, port)",
+    "idx_risk_date": "scan_findings(risk, datetime(scan_date, 'unixepoch'))",
+    "idx_host_date": "scan_findings(host_id, datetime(scan_date, 'unixepoch'))",
+    "idx_scan_date": "scan_findings(datetime(scan_date, 'unixepoch'), risk)",
+    "idx_scored_rule_version": "scan_findings(rule_version, cves) WHERE cves IS NULL",
+    "idx_finding_fingerprint": "scan_findings(fingerprint_id)",
+    "idx_finding_recommendation": "scan_findings(recommendation_id)",
+}
+
+# Indexes on scan_summary: listing and cleanup by date, and a covering
+# index on the day for get_scan_trends
+SUMMARY_INDEXES = {
+    "idx_summary_date": "scan_summary(scan_date)",
+    "idx_summary_day": "scan_summary(DATE(scan_date), high_risk, medium_risk, "
+                       "low_risk, risk_score)",
+}
+
+# Indexes superseded by the ones above
+OBSOLETE_INDEXES = ["idx_scan_id", "idx_risk", "idx_host", "idx_rule_version"]
+
+# Query plan steps that read a whole table, a whole index, or sort a result
+_TABLE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+_INDEX_SCAN = re.compile(r"^SCAN .* USING (COVERING )?INDEX ")
+_SORT = re.compile(r"^USE TEMP B-TREE FOR (?!count\(DISTINCT\))")
+# prune_dimensions necessarily visits every row of the table it prunes
+_PRUNED_TABLES = {"hosts", "fingerprints", "recommendations"}
+
+# Normalized layout: each finding references interned host, service
+# fingerprint and recommendation rows and stores its date as Unix seconds.
+# scans becomes a view with the original columns, and INSTEAD OF triggers
+# route writes to it, so every query and helper works on either layout.
+NORMALIZED_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS hosts (
+        id INTEGER PRIMARY KEY,
+        host TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fingerprints (
+        id INTEGER PRIMARY KEY,
+        protocol TEXT,
+        service TEXT,
+        product TEXT,
+        version TEXT,
+        UNIQUE (protocol, service, product, version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recommendations (
+        id INTEGER PRIMARY KEY,
+        text TEXT NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scan_findings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scan_id TEXT NOT NULL,
+        host_id INTEGER NOT NULL REFERENCES hosts(id),
+        hostname TEXT,
+        port INTEGER NOT NULL,
+        fingerprint_id INTEGER NOT NULL REFERENCES fingerprints(id),
+        risk TEXT,
+        cvss_estimate REAL,
+        recommendation_id INTEGER REFERENCES recommendations(id),
+        scan_date INTEGER NOT NULL,
+        cves TEXT,
+        rule_version TEXT
+    )
+    """,
+    """
+    CREATE VIEW IF NOT EXISTS scans AS
+    SELECT f.id, f.scan_id, h.host, f.hostname, f.port, p.protocol, p.service,
+           p.product, p.version, f.risk, f.cvss_estimate, r.text AS recommendation,
+           datetime(f.scan_date, 'unixepoch') AS scan_date, f.cves, f.rule_version
+    FROM scan_findings f
+    JOIN hosts h ON h.id = f.host_id
+    JOIN fingerprints p ON p.id = f.fingerprint_id
+    LEFT JOIN recommendations r ON r.id = f.recommendation_id
+    """,
+    # NULL never equals NULL in UNIQUE, so fingerprints are interned with
+    # IS comparisons rather than INSERT OR IGNORE
+    """
+    CREATE TRIGGER IF NOT EXISTS scans_intern INSTEAD OF INSERT ON scans
+    BEGIN
+        INSERT OR IGNORE INTO hosts (host) VALUES (NEW.host);
+        INSERT INTO fingerprints (protocol, service, product, version)
+        SELECT NEW.protocol, NEW.service, NEW.product, NEW.version
+        WHERE NOT EXISTS (SELECT 1 FROM fingerprints
+                          WHERE protocol IS NEW.protocol AND service IS NEW.service
+                            AND product IS NEW.product AND version IS NEW.version);
+        INSERT OR IGNORE INTO recommendations (text)
+        SELECT NEW.recommendation WHERE NEW.recommendation IS NOT NULL;
+        INSERT INTO scan_findings
+        (id, scan_id, host_id, hostname, port, fingerprint_id, risk, cvss_estimate,
+         recommendation_id, scan_date, cves, rule_version)
+        VALUES (
+            NEW.id, NEW.scan_id,
+            (SELECT id FROM hosts WHERE host = NEW.host),
+            NEW.hostname,
+            NEW.port,
+            (SELECT id FROM fingerprints
+             WHERE protocol IS NEW.protocol AND service IS NEW.service
+               AND product IS NEW.product AND version IS NEW.version),
+            NEW.risk, NEW.cvss_estimate,
+            (SELECT id FROM recommendations WHERE text = NEW.recommendation),
+            CAST(strftime('%s', NEW.scan_date) AS INTEGER), NEW.cves, NEW.rule_version
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scans_update INSTEAD OF UPDATE ON scans
+    BEGIN
+        INSERT OR IGNORE INTO hosts (host) VALUES (NEW.host);
+        INSERT INTO fingerprints (protocol, service, product, version)
+        SELECT NEW.protocol, NEW.service, NEW.product, NEW.version
+        WHERE NOT EXISTS (SELECT 1 FROM fingerprints
+                          WHERE protocol IS NEW.protocol AND service IS NEW.service
+                            AND product IS NEW.product AND version IS NEW.version);
+        INSERT OR IGNORE INTO recommendations (text)
+        SELECT NEW.recommendation WHERE NEW.recommendation IS NOT NULL;
+        UPDATE scan_findings SET
+            scan_id = NEW.scan_id,
+            host_id = (SELECT id FROM hosts WHERE host = NEW.host),
+            hostname = NEW.hostname,
+            port = NEW.port,
+            fingerprint_id = (SELECT id FROM fingerprints
+                              WHERE protocol IS NEW.protocol AND service IS NEW.service
+                                AND product IS NEW.product AND version IS NEW.version),
+            risk = NEW.risk,
+            cvss_estimate = NEW.cvss_estimate,
+            recommendation_id = (SELECT id FROM recommendations
+                                 WHERE text = NEW.recommendation),
+            scan_date = CAST(strftime('%s', NEW.scan_date) AS INTEGER),
+            cves = NEW.cves,
+            rule_version = NEW.rule_version
+        WHERE id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS scans_delete INSTEAD OF DELETE ON scans
+    BEGIN
+        DELETE FROM scan_findings WHERE id = OLD.id;
+    END
+    """,
+]
+
+INSERT_FINDING_SQL = """
+    INSERT INTO scans 
+    (scan_id, host, hostname, port, protocol, service, product, version, 
+     risk, cvss_estimate, recommendation, scan_date, cves, rule_version)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ConnectionManager:
+    """
+    Per-thread SQLite connections, reused across calls
+
+    Each thread gets one connection per database file, opened on first
+    use with CONNECTION_PRAGMAS applied, so repeated queries skip the
+    connect, pragma and schema-load cost. Connections are never shared
+    between threads.
+
+    Hooks registered with on_connect run on every new connection after
+    the pragmas; hooks registered with on_close run just before one is
+    closed.
+    """
+
+    def __init__(self, pragmas: Optional[Dict] = None, timeout: float = BUSY_TIMEOUT,
+                 isolation_level: Optional[str] = ""):
+        self.pragmas = dict(CONNECTION_PRAGMAS if pragmas is None else pragmas)
+        self.timeout = timeout
+        self.isolation_level = isolation_level
+        self.connect_hooks: List[Callable[[sqlite3.Connection], None]] = []
+        self.close_hooks: List[Callable[[sqlite3.Connection], None]] = []
+        self.opened = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Every open connection by (thread ident, db_path), for close_all
+        self._open: Dict[Tuple[int, str], sqlite3.Connection] = {}
+        # Bumped by close_all so threads drop connections closed under them
+        self._generation = 0
+
+    def on_connect(self, hook: Callable[[sqlite3.Connection], None]) -> Callable:
+        """Register a hook run on each new connection (usable as a decorator)"""
+        self.connect_hooks.append(hook)
+        return hook
+
+    def on_close(self, hook: Callable[[sqlite3.Connection], None]) -> Callable:
+        """Register a hook run before each connection is closed (usable as a decorator)"""
+        self.close_hooks.append(hook)
+        return hook
+
+    def _connections(self) -> Dict[str, sqlite3.Connection]:
+        """This thread's connections by database path"""
+        if getattr(self._local, "generation", None) != self._generation:
+            self._local.connections = {}
+            self._local.generation = self._generation
+        return self._local.connections
+
+    def get(self, db_path: str = DB_NAME) -> sqlite3.Connection:
+        """
+        Return this thread's connection to a database, opening it if needed
+
+        Args:
+            db_path: Path to database file
+
+        Returns:
+            Open connection; do not close it, use close() instead
+        """
+        connections = self._connections()
+        conn = connections.get(db_path)
+        if conn is not None:
+            return conn
+
+        # check_same_thread is off only so close_all can run from another
+        # thread at shutdown; each connection is otherwise used by one thread
+        conn = sqlite3.connect(db_path, timeout=self.timeout,
+                               isolation_level=self.isolation_level,
+                               check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        for hook in self.connect_hooks:
+            hook(conn)
+
+        connections[db_path] = conn
+        with self._lock:
+            self._open[(threading.get_ident(), db_path)] = conn
+            self.opened += 1
+        return conn
+
+    def _close(self, conn: sqlite3.Connection) -> None:
+        for hook in self.close_hooks:
+            hook(conn)
+        conn.close()
+
+    def close(self, db_path: Optional[str] = None) -> None:
+        """
+        Close this thread's connections
+
+        Args:
+            db_path: Only close the connection to this database
+        """
+        connections = self._connections()
+        for path in [db_path] if db_path else list(connections):
+            conn = connections.pop(path, None)
+            if conn is None:
+                continue
+            with self._lock:
+                self._open.pop((threading.get_ident(), path), None)
+            self._close(conn)
+
+    def close_all(self) -> None:
+        """Close every thread's connections, e.g. at shutdown"""
+        with self._lock:
+            connections = list(self._open.values())
+            self._open.clear()
+            self._generation += 1
+        for conn in connections:
+            self._close(conn)
+
+    @property
+    def open_count(self) -> int:
+        """Number of connections currently open across all threads"""
+        return len(self._open)
+
 
-def init_db(db_path: str = DB_NAME) -> None:
+connection_manager = ConnectionManager()
+atexit.register(connection_manager.close_all)
+
+
+def get_connection(db_path: str = DB_NAME) -> sqlite3.Connection:
+    """
+    Get the calling thread's managed connection to a database
+    
+    Args:
+        db_path: Path to database file
+    
+    Returns:
+        Open connection (owned by the manager; do not close it)
+    """
+    return connection_manager.get(db_path)
+
+
+@contextmanager
+def transaction(db_path: str = DB_NAME, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """
+    Run a block in a transaction on the managed connection
+    
+    Commits when the block finishes, rolls back if it raises.
+    
+    Args:
+        db_path: Path to database file
+        immediate: Take the write lock up front (BEGIN IMMEDIATE) rather
+                   than at the first write, so a long write cannot fail
+                   half-way on a lock held by another writer
+    
+    Yields:
+        Open connection
+    """
+    conn = get_connection(db_path)
+    with conn:
+        if immediate:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+def close_connections(db_path: Optional[str] = None) -> None:
+    """
+    Close the calling thread's managed connections
+    
+    Worker threads call this before exiting; the main thread's
+    connections are closed automatically at interpreter exit.
+    
+    Args:
+        db_path: Only close the connection to this database
+    """
+    connection_manager.close(db_path)
+
+
+def init_db(db_path: str = DB_NAME, normalized: bool = False) -> None:
     """
     Initialize database schema
     
     Args:
         db_path: Path to SQLite database file
+        normalized: Create a new database with the normalized layout
+                    (see NORMALIZED_SCHEMA); an existing layout is kept,
+                    use migrate_to_normalized to convert it
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
 
-    # Main scans table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS scans (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            scan_id TEXT NOT NULL,
-            host TEXT NOT NULL,
-            hostname TEXT,
-            port INTEGER NOT NULL,
-            protocol TEXT,
-            service TEXT,
-            product TEXT,
-            version TEXT,
-            risk TEXT,
-            cvss_estimate REAL,
-            recommendation TEXT,
-            scan_date TEXT NOT NULL,
-            FOREIGN KEY (scan_id) REFERENCES scan_summary(scan_id)
-        )
-    """)
+        if normalized and scans_layout(cursor) is None:
+            for statement in NORMALIZED_SCHEMA:
+                cursor.execute(statement)
 
-    # Scan summary table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS scan_summary (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            scan_id TEXT UNIQUE NOT NULL,
-            target TEXT NOT NULL,
-            total_findings INTEGER,
-            high_risk INTEGER,
-            medium_risk INTEGER,
-            low_risk INTEGER,
-            risk_score INTEGER,
-            scan_date TEXT NOT NULL,
-            scan_duration REAL,
-            notes TEXT
-        )
-    """)
+        # Main scans table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id TEXT NOT NULL,
+                host TEXT NOT NULL,
+                hostname TEXT,
+                port INTEGER NOT NULL,
+                protocol TEXT,
+                service TEXT,
+                product TEXT,
+                version TEXT,
+                risk TEXT,
+                cvss_estimate REAL,
+                recommendation TEXT,
+                scan_date TEXT NOT NULL,
+                cves TEXT,
+                rule_version TEXT,
+                FOREIGN KEY (scan_id) REFERENCES scan_summary(scan_id)
+            )
+        """)
 
-    # Create indexes for better query performance
-    cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_scan_id ON scans(scan_id)
-    """)
+        # Columns added since the first release; older databases gain them here
+        add_missing_columns(cursor, "scans", {"cves": "TEXT", "rule_version": "TEXT"})
+
+        # Every rule set findings were classified with, for selective re-scoring
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS rule_sets (
+                version TEXT PRIMARY KEY,
+                rules TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+
+        # Scan summary table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scan_summary (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scan_id TEXT UNIQUE NOT NULL,
+                target TEXT NOT NULL,
+                total_findings INTEGER,
+                high_risk INTEGER,
+                medium_risk INTEGER,
+                low_risk INTEGER,
+                risk_score INTEGER,
+                scan_date TEXT NOT NULL,
+                scan_duration REAL,
+                notes TEXT
+            )
+        """)
+
+        # Last full (version detection) scan per host, used by delta scanning
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS host_scan_state (
+                host TEXT PRIMARY KEY,
+                last_full_scan TEXT NOT NULL
+            )
+        """)
+
+        # Service fingerprint cache, used to skip repeated version probes
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprint_cache (
+                host TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                protocol TEXT NOT NULL,
+                service TEXT,
+                product TEXT,
+                version TEXT,
+                extrainfo TEXT,
+                cached_at TEXT NOT NULL,
+                PRIMARY KEY (host, port, protocol)
+            )
+        """)
+
+        # Create indexes for better query performance
+        for name in OBSOLETE_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        create_scan_indexes(cursor)
+        for name, columns in SUMMARY_INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+    print("[+] Database initialized successfully")
+
+
+def scans_layout(cursor: sqlite3.Cursor) -> Optional[str]:
+    """Return "table" or "view" (normalized layout) for scans, or None if missing"""
+    row = cursor.execute("SELECT type FROM sqlite_master WHERE name = 'scans'").fetchone()
+    return row[0] if row else None
+
+
+def create_scan_indexes(cursor: sqlite3.Cursor) -> None:
+    """Create the secondary indexes on the findings (the caller commits)"""
+    indexes = NORMALIZED_INDEXES if scans_layout(cursor) == "view" else SCAN_INDEXES
+    for name, columns in indexes.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+
+def drop_scan_indexes(cursor: sqlite3.Cursor) -> None:
+    """Drop the secondary indexes on the findings (the caller commits)"""
+    for name in {**SCAN_INDEXES, **NORMALIZED_INDEXES}.keys() | set(OBSOLETE_INDEXES):
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def migrate_to_normalized(db_path: str = DB_NAME, vacuum: bool = True) -> Dict:
+    """
+    Convert the scans table to the normalized layout in one transaction
+    
+    Distinct hosts, fingerprints and recommendations are copied into their
+    tables, findings keep their ids, and scans is replaced by the view.
+    Does nothing if the database is already normalized.
+    
+    Args:
+        db_path: Path to database file
+        vacuum: Reclaim the freed pages afterwards, shrinking the file
+    
+    Returns:
+        Dictionary with rows (0 if already normalized), bytes_before and
+        bytes_after, and after a migration hosts, fingerprints and
+        recommendations
+    """
+    init_db(db_path)
+    bytes_before = os.path.getsize(db_path)
+    
+    with transaction(db_path, immediate=True) as conn:
+        cursor = conn.cursor()
+        if scans_layout(cursor) == "view":
+            print("[*] Database already uses the normalized layout")
+            return {"rows": 0, "bytes_before": bytes_before, "bytes_after": bytes_before}
+        
+        # Legacy indexes move with the renamed table; their names are reused
+        drop_scan_indexes(cursor)
+        cursor.execute("ALTER TABLE scans RENAME TO scans_legacy")
+        for statement in NORMALIZED_SCHEMA:
+            cursor.execute(statement)
+        
+        cursor.execute("""
+            INSERT INTO hosts (host)
+            SELECT DISTINCT host FROM scans_legacy
+        """)
+        cursor.execute("""
+            INSERT INTO fingerprints (protocol, service, product, version)
+            SELECT DISTINCT protocol, service, product, version FROM scans_legacy
+        """)
+        cursor.execute("""
+            INSERT INTO recommendations (text)
+            SELECT DISTINCT recommendation FROM scans_legacy WHERE recommendation IS NOT NULL
+        """)
+        cursor.execute("""
+            INSERT INTO scan_findings
+            (id, scan_id, host_id, hostname, port, fingerprint_id, risk, cvss_estimate,
+             recommendation_id, scan_date, cves, rule_version)
+            SELECT s.id, s.scan_id, h.id, s.hostname, s.port, p.id, s.risk, s.cvss_estimate,
+                   r.id, CAST(strftime('%s', s.scan_date) AS INTEGER), s.cves, s.rule_version
+            FROM scans_legacy s
+            JOIN hosts h ON h.host = s.host
+            JOIN fingerprints p ON p.protocol IS s.protocol AND p.service IS s.service
+                               AND p.product IS s.product AND p.version IS s.version
+            LEFT JOIN recommendations r ON r.text = s.recommendation
+            ORDER BY s.id
+        """)
+        rows = cursor.rowcount
+        
+        cursor.execute("DROP TABLE scans_legacy")
+        create_scan_indexes(cursor)
+        
+        counts = {table: cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("hosts", "fingerprints", "recommendations")}
+    
+    if vacuum:
+        conn.execute("VACUUM")
     
+    stats = {"rows": rows, **counts, "bytes_before": bytes_before,
+             "bytes_after": os.path.getsize(db_path)}
+    print(f"[+] Normalized {rows} findings: {counts['hosts']} hosts, "
+          f"{counts['fingerprints']} fingerprints, {counts['recommendations']} recommendations")
+    return stats
+
+
+def prune_dimensions(cursor: sqlite3.Cursor) -> None:
+    """Delete interned rows no finding references any more (the caller commits)"""
+    cursor.execute("DELETE FROM hosts WHERE id NOT IN (SELECT host_id FROM scan_findings)")
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_risk ON scans(risk)
+        DELETE FROM fingerprints WHERE id NOT IN (SELECT fingerprint_id FROM scan_findings)
     """)
-    
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_host ON scans(host)
+        DELETE FROM recommendations
+        WHERE NOT EXISTS (SELECT 1 FROM scan_findings
+                          WHERE recommendation_id = recommendations.id)
     """)
 
-    conn.commit()
-    conn.close()
-    print("[+] Database initialized successfully")
+
+def add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]) -> None:
+    """Add columns that an existing table is missing (the caller commits)"""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, declaration in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
 
 
 def save_scan(results: List[Dict], target: str, scan_id: Optional[str] = None, 
-              notes: Optional[str] = None, db_path: str = DB_NAME) -> str:
+              notes: Optional[str] = None, rebuild_indexes: bool = False,
+              db_path: str = DB_NAME) -> str:
     """
     Save scan results to database
     
+    Findings are streamed into one executemany inside a single
+    transaction, and the summary is counted in the same pass.
+    
     Args:
         results: List of scan results with risk classification
         target: Target IP/range that was scanned
         scan_id: Optional custom scan ID (auto-generated if not provided)
         notes: Optional notes about the scan
+        rebuild_indexes: Drop the scans indexes before inserting and rebuild
+                         them after; faster when the scan is large compared
+                         with the rows already stored
         db_path: Path to database file
     
     Returns:
         Scan ID
     """
     if not scan_id:
-        scan_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        scan_id = new_scan_id()
     
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    start = time.perf_counter()
+    scan_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary = RiskSummary()
     
+    with transaction(db_path, immediate=True) as conn:
+        cursor = conn.cursor()
+        
+        if rebuild_indexes:
+            drop_scan_indexes(cursor)
+
+        # Save individual findings, counting summary statistics as they go
+        saved = insert_findings(cursor, results, scan_id, scan_date, summary)
+
+        if rebuild_indexes:
+            create_scan_indexes(cursor)
+
+        # Save scan summary
+        summary = summary.to_dict()
+        insert_summary(cursor, scan_id, target, summary, scan_date, notes)
+    
+    elapsed = time.perf_counter() - start
+    print(f"[+] Scan results saved successfully (ID: {scan_id})")
+    print(f"    Total findings: {summary['total']}")
+    print(f"    HIGH: {summary['high']} | MEDIUM: {summary['medium']} | LOW: {summary['low']}")
+    if elapsed > 0:
+        print(f"    Saved {saved} rows in {elapsed:.2f} seconds ({saved / elapsed:,.0f} rows/sec)")
+    
+    return scan_id
+
+
+def save_findings(results: List[Dict], scan_id: str, scan_date: Optional[str] = None,
+                  db_path: str = DB_NAME) -> int:
+    """
+    Append findings to a scan without writing its summary
+    
+    Used by streaming scans, which save each batch as it arrives and
+    call save_scan_summary once the scan has finished.
+    
+    Args:
+        results: List of scan results with risk classification
+        scan_id: Scan identifier the findings belong to
+        scan_date: Optional timestamp (defaults to now)
+        db_path: Path to database file
+    
+    Returns:
+        Number of findings saved
+    """
+    if not scan_date:
+        scan_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        insert_findings(cursor, results, scan_id, scan_date)
+    
+    return len(results)
+
+
+def save_scan_summary(scan_id: str, target: str, summary: Dict,
+                      notes: Optional[str] = None, scan_duration: Optional[float] = None,
+                      db_path: str = DB_NAME) -> str:
+    """
+    Save the summary row for a scan whose findings were saved incrementally
+    
+    Args:
+        scan_id: Scan identifier
+        target: Target IP/range that was scanned
+        summary: Summary with total, high, medium, low and risk_score keys
+        notes: Optional notes about the scan
+        scan_duration: Optional scan duration in seconds
+        db_path: Path to database file
+    
+    Returns:
+        Scan ID
+    """
     scan_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    # Calculate summary statistics
-    summary = {
-        "total": len(results),
-        "high": sum(1 for r in results if r.get("risk") == "HIGH"),
-        "medium": sum(1 for r in results if r.get("risk") == "MEDIUM"),
-        "low": sum(1 for r in results if r.get("risk") == "LOW"),
-    }
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        insert_summary(cursor, scan_id, target, summary, scan_date, notes, scan_duration)
     
-    # Calculate risk score
-    risk_weights = {"HIGH": 10, "MEDIUM": 5, "LOW": 1}
-    risk_score = sum(risk_weights.get(r.get("risk", "LOW"), 0) for r in results)
+    print(f"[+] Scan summary saved (ID: {scan_id})")
+    return scan_id
 
-    # Save individual findings
-    for item in results:
-        cursor.execute("""
-            INSERT INTO scans 
-            (scan_id, host, hostname, port, protocol, service, product, version, 
-             risk, cvss_estimate, recommendation, scan_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            scan_id,
-            item.get("host", ""),
-            item.get("hostname", ""),
-            item.get("port", 0),
-            item.get("protocol", "tcp"),
-            item.get("service", ""),
-            item.get("product", ""),
-            item.get("version", ""),
-            item.get("risk", "LOW"),
-            item.get("cvss_estimate", 0.0),
-            item.get("recommendation", ""),
-            scan_date
-        ))
-
-    # Save scan summary
+
+def new_scan_id() -> str:
+    """Generate a timestamp-based scan ID"""
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def insert_findings(cursor: sqlite3.Cursor, results: Iterable[Dict], scan_id: str,
+                     scan_date: str, summary: Optional[RiskSummary] = None) -> int:
+    """
+    Insert finding rows using an open cursor (the caller commits)
+    
+    Rows are generated lazily and fed to a single executemany, so the
+    findings are not copied into an intermediate list. They are counted
+    as they are generated: inserts through the normalized layout's view
+    do not show up in rowcount.
+    
+    Args:
+        cursor: Cursor on an open transaction
+        results: Scan results with risk classification
+        scan_id: Scan identifier
+        scan_date: Timestamp stored on each row
+        summary: Optional RiskSummary every finding is added to on the way
+    
+    Returns:
+        Number of rows inserted
+    """
+    # Rows are stamped with the rule set they were classified under
+    rule_version = register_rule_set(cursor)
+    add = summary.add if summary is not None else None
+    count = 0
+
+    def rows():
+        nonlocal count
+        for item in results:
+            count += 1
+            if add is not None:
+                add(item)
+            get = item.get
+            yield (
+                scan_id,
+                get("host", ""),
+                get("hostname", ""),
+                get("port", 0),
+                get("protocol", "tcp"),
+                get("service", ""),
+                get("product", ""),
+                get("version", ""),
+                get("risk", "LOW"),
+                get("cvss_estimate", 0.0),
+                get("recommendation", ""),
+                scan_date,
+                ",".join(get("cves") or []) or None,
+                rule_version
+            )
+
+    cursor.executemany(INSERT_FINDING_SQL, rows())
+    return count
+
+
+def register_rule_set(cursor: sqlite3.Cursor) -> str:
+    """Record the active rule set if it is new (the caller commits); returns its version"""
+    version = get_rules_version()
+    cursor.execute("""
+        INSERT OR IGNORE INTO rule_sets (version, rules, created_at) VALUES (?, ?, ?)
+    """, (version, json.dumps(normalize_rules(get_rules())),
+          datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    return version
+
+
+def get_rule_set(version: str, db_path: str = DB_NAME) -> Optional[Dict]:
+    """
+    Look up a stored rule set
+    
+    Args:
+        version: Rule set version
+        db_path: Path to database file
+    
+    Returns:
+        Rule lists, or None if the version is unknown
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT rules FROM rule_sets WHERE version = ?", (version,))
+    row = cursor.fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def get_rule_version_counts(db_path: str = DB_NAME) -> Dict[Optional[str], int]:
+    """
+    Count rule-scored findings per rule version (None for rows scored before versioning)
+    
+    Findings with CVE matches keep their vulnerability-based scoring and
+    are never re-scored, so they are left out.
+    
+    Args:
+        db_path: Path to database file
+    
+    Returns:
+        Dictionary mapping rule version to row count
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT rule_version, COUNT(*) FROM scans WHERE cves IS NULL GROUP BY rule_version
+    """)
+    counts = dict(cursor.fetchall())
+    return counts
+
+
+def insert_summary(cursor: sqlite3.Cursor, scan_id: str, target: str, summary: Dict,
+                    scan_date: str, notes: Optional[str] = None,
+                    scan_duration: Optional[float] = None) -> None:
+    """Insert the scan_summary row using an open cursor (the caller commits)"""
     cursor.execute("""
         INSERT INTO scan_summary 
         (scan_id, target, total_findings, high_risk, medium_risk, low_risk, 
-         risk_score, scan_date, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+         risk_score, scan_date, scan_duration, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         scan_id,
         target,
@@ -147,22 +819,20 @@ def save_scan(results: List[Dict], target: str, scan_id: Optional[str] = None,
         summary["high"],
         summary["medium"],
         summary["low"],
-        risk_score,
+        summary["risk_score"],
         scan_date,
+        scan_duration,
         notes
     ))
 
-    conn.commit()
-    conn.close()
-    
-    print(f"[+] Scan results saved successfully (ID: {scan_id})")
-    print(f"    Total findings: {summary['total']}")
-    print(f"    HIGH: {summary['high']} | MEDIUM: {summary['medium']} | LOW: {summary['low']}")
-    
-    return scan_id
+
+def _fetch_findings(cursor: sqlite3.Cursor) -> List[Finding]:
+    """Turn the rows of an executed findings query into Finding records"""
+    columns = [desc[0] for desc in cursor.description]
+    return [Finding(**dict(zip(columns, row))) for row in cursor.fetchall()]
 
 
-def get_scan_by_id(scan_id: str, db_path: str = DB_NAME) -> List[Dict]:
+def get_scan_by_id(scan_id: str, db_path: str = DB_NAME) -> List[Finding]:
     """
     Retrieve specific scan results by ID
     
@@ -171,26 +841,97 @@ def get_scan_by_id(scan_id: str, db_path: str = DB_NAME) -> List[Dict]:
         db_path: Path to database file
     
     Returns:
-        List of scan results
+        List of scan results as Finding records
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
         SELECT host, hostname, port, service, product, version, risk, 
-               cvss_estimate, recommendation, scan_date
+               cvss_estimate, recommendation, scan_date, cves
         FROM scans 
         WHERE scan_id = ?
         ORDER BY risk DESC, port ASC
     """, (scan_id,))
     
-    columns = [desc[0] for desc in cursor.description]
-    results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    results = _fetch_findings(cursor)
+    for item in results:
+        item["cves"] = item["cves"].split(",") if item["cves"] else []
     
-    conn.close()
     return results
 
 
+def get_scan_totals(scan_id: str, db_path: str = DB_NAME) -> Dict:
+    """
+    Compute summary counts for a scan from its stored findings
+    
+    Used when findings were written incrementally (streaming or
+    distributed scans) and the summary has to be derived afterwards.
+    
+    Args:
+        scan_id: Scan identifier
+        db_path: Path to database file
+    
+    Returns:
+        Dictionary with total, high, medium, low, hosts and risk_score
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT 
+            COUNT(*) as total,
+            COALESCE(SUM(risk = 'HIGH'), 0) as high,
+            COALESCE(SUM(risk = 'MEDIUM'), 0) as medium,
+            COALESCE(SUM(risk = 'LOW'), 0) as low,
+            COUNT(DISTINCT host) as hosts,
+            COALESCE(SUM(CASE risk WHEN 'HIGH' THEN 10 WHEN 'MEDIUM' THEN 5
+                                   WHEN 'LOW' THEN 1 ELSE 0 END), 0) as risk_score
+        FROM scans 
+        WHERE scan_id = ?
+    """, (scan_id,))
+    
+    columns = [desc[0] for desc in cursor.description]
+    totals = dict(zip(columns, cursor.fetchone()))
+    
+    return totals
+
+
+def refresh_scan_summaries(scan_ids: List[str], db_path: str = DB_NAME) -> int:
+    """
+    Recompute stored summary counts from the findings of the given scans
+    
+    Used after findings have been re-scored in place.
+    
+    Args:
+        scan_ids: Scan identifiers whose summaries are stale
+        db_path: Path to database file
+    
+    Returns:
+        Number of summaries updated
+    """
+    if not scan_ids:
+        return 0
+
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            UPDATE scan_summary SET
+                total_findings = (SELECT COUNT(*) FROM scans WHERE scan_id = ?1),
+                high_risk = (SELECT COUNT(*) FROM scans WHERE scan_id = ?1 AND risk = 'HIGH'),
+                medium_risk = (SELECT COUNT(*) FROM scans WHERE scan_id = ?1 AND risk = 'MEDIUM'),
+                low_risk = (SELECT COUNT(*) FROM scans WHERE scan_id = ?1 AND risk = 'LOW'),
+                risk_score = (SELECT COALESCE(SUM(CASE risk WHEN 'HIGH' THEN 10 WHEN 'MEDIUM' THEN 5
+                                                            WHEN 'LOW' THEN 1 ELSE 0 END), 0)
+                              FROM scans WHERE scan_id = ?1)
+            WHERE scan_id = ?1
+        """, [(scan_id,) for scan_id in scan_ids])
+        
+        updated = cursor.rowcount
+    return updated
+
+
 def get_all_scans(limit: int = 100, db_path: str = DB_NAME) -> List[Tuple]:
     """
     Retrieve all scan results (limited)
@@ -202,7 +943,7 @@ def get_all_scans(limit: int = 100, db_path: str = DB_NAME) -> List[Tuple]:
     Returns:
         List of tuples containing scan data
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -213,7 +954,6 @@ def get_all_scans(limit: int = 100, db_path: str = DB_NAME) -> List[Tuple]:
     """, (limit,))
     
     data = cursor.fetchall()
-    conn.close()
     return data
 
 
@@ -228,7 +968,7 @@ def get_scan_summaries(limit: int = 10, db_path: str = DB_NAME) -> List[Dict]:
     Returns:
         List of scan summaries
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -242,7 +982,6 @@ def get_scan_summaries(limit: int = 10, db_path: str = DB_NAME) -> List[Dict]:
     columns = [desc[0] for desc in cursor.description]
     summaries = [dict(zip(columns, row)) for row in cursor.fetchall()]
     
-    conn.close()
     return summaries
 
 
@@ -257,7 +996,7 @@ def get_scan_trends(days: int = 30, db_path: str = DB_NAME) -> List[Dict]:
     Returns:
         List of trend data
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -269,7 +1008,7 @@ def get_scan_trends(days: int = 30, db_path: str = DB_NAME) -> List[Dict]:
             SUM(low_risk) as total_low,
             AVG(risk_score) as avg_risk_score
         FROM scan_summary 
-        WHERE scan_date >= date('now', '-' || ? || ' days')
+        WHERE DATE(scan_date) >= date('now', '-' || ? || ' days')
         GROUP BY DATE(scan_date)
         ORDER BY date DESC
     """, (days,))
@@ -277,11 +1016,10 @@ def get_scan_trends(days: int = 30, db_path: str = DB_NAME) -> List[Dict]:
     columns = [desc[0] for desc in cursor.description]
     trends = [dict(zip(columns, row)) for row in cursor.fetchall()]
     
-    conn.close()
     return trends
 
 
-def get_high_risk_findings(limit: int = 20, db_path: str = DB_NAME) -> List[Dict]:
+def get_high_risk_findings(limit: int = 20, db_path: str = DB_NAME) -> List[Finding]:
     """
     Get all high-risk findings across all scans
     
@@ -290,9 +1028,9 @@ def get_high_risk_findings(limit: int = 20, db_path: str = DB_NAME) -> List[Dict
         db_path: Path to database file
     
     Returns:
-        List of high-risk findings
+        List of high-risk findings as Finding records
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
@@ -303,14 +1041,10 @@ def get_high_risk_findings(limit: int = 20, db_path: str = DB_NAME) -> List[Dict
         LIMIT ?
     """, (limit,))
     
-    columns = [desc[0] for desc in cursor.description]
-    findings = [dict(zip(columns, row)) for row in cursor.fetchall()]
-    
-    conn.close()
-    return findings
+    return _fetch_findings(cursor)
 
 
-def get_host_history(host: str, db_path: str = DB_NAME) -> List[Dict]:
+def get_host_history(host: str, db_path: str = DB_NAME) -> List[Finding]:
     """
     Get scan history for specific host
     
@@ -319,70 +1053,302 @@ def get_host_history(host: str, db_path: str = DB_NAME) -> List[Dict]:
         db_path: Path to database file
     
     Returns:
-        List of scans for the host
+        List of the host's findings as Finding records, newest first
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT scan_id, port, service, risk, scan_date
+        SELECT scan_id, port, protocol, service, product, version, risk, scan_date
         FROM scans 
         WHERE host = ?
         ORDER BY scan_date DESC
     """, (host,))
     
-    columns = [desc[0] for desc in cursor.description]
-    history = [dict(zip(columns, row)) for row in cursor.fetchall()]
-    
-    conn.close()
-    return history
+    return _fetch_findings(cursor)
 
 
-def delete_old_scans(days: int = 90, db_path: str = DB_NAME) -> int:
+def get_latest_findings(hosts: List[str], db_path: str = DB_NAME) -> Dict[str, List[Finding]]:
     """
-    Delete scans older than specified days (for cleanup)
+    Get the findings of each host's most recent scan in one query
+    
+    The host list is passed as one JSON parameter, so any number of hosts
+    costs a single statement. Each host's latest date is the first entry
+    of idx_host_date for it, and its rows are then read from the same index.
     
     Args:
-        days: Age threshold in days
+        hosts: Host IP addresses to look up
         db_path: Path to database file
     
     Returns:
-        Number of scans deleted
+        Dictionary mapping host to the Finding records of its latest scan,
+        with the get_host_history fields (hosts never scanned are omitted)
     """
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     cursor = conn.cursor()
     
-    # Get scan IDs to delete
     cursor.execute("""
-        SELECT scan_id FROM scan_summary
-        WHERE scan_date < date('now', '-' || ? || ' days')
-    """, (days,))
+        SELECT s.host, s.scan_id, s.port, s.protocol, s.service, s.product, s.version,
+               s.risk, s.scan_date
+        FROM json_each(?) AS wanted
+        JOIN scans s ON s.host = wanted.value
+         AND s.scan_date = (SELECT scan_date FROM scans WHERE host = wanted.value
+                            ORDER BY scan_date DESC LIMIT 1)
+    """, (json.dumps(hosts),))
     
-    scan_ids = [row[0] for row in cursor.fetchall()]
+    columns = [desc[0] for desc in cursor.description][1:]
+    latest: Dict[str, List[Finding]] = {}
+    for host, *row in cursor.fetchall():
+        rows = latest.setdefault(host, [])
+        # Two scans stored in the same second: keep one, as get_host_history would
+        if not rows or rows[0]["scan_id"] == row[0]:
+            rows.append(Finding(**dict(zip(columns, row))))
     
-    if not scan_ids:
-        conn.close()
-        return 0
+    return latest
+
+
+def get_last_full_scans(hosts: List[str], db_path: str = DB_NAME) -> Dict[str, str]:
+    """
+    Get the date of the last full version scan for each host
+    
+    Args:
+        hosts: Host IP addresses to look up
+        db_path: Path to database file
+    
+    Returns:
+        Dictionary mapping host to last full scan date (hosts never marked are omitted)
+    """
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
     
-    # Delete from both tables
-    placeholders = ','.join('?' * len(scan_ids))
+    last_scans = {}
+    for host in hosts:
+        cursor.execute("""
+            SELECT last_full_scan FROM host_scan_state WHERE host = ?
+        """, (host,))
+        row = cursor.fetchone()
+        if row:
+            last_scans[host] = row[0]
     
-    cursor.execute(f"""
-        DELETE FROM scans WHERE scan_id IN ({placeholders})
-    """, scan_ids)
+    return last_scans
+
+
+def mark_full_scan(hosts: List[str], scan_date: Optional[str] = None,
+                   db_path: str = DB_NAME) -> None:
+    """
+    Record that hosts received a full version scan
     
-    cursor.execute(f"""
-        DELETE FROM scan_summary WHERE scan_id IN ({placeholders})
-    """, scan_ids)
+    Args:
+        hosts: Host IP addresses that were fully scanned
+        scan_date: Optional timestamp (defaults to now)
+        db_path: Path to database file
+    """
+    if not scan_date:
+        scan_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT INTO host_scan_state (host, last_full_scan) VALUES (?, ?)
+            ON CONFLICT(host) DO UPDATE SET last_full_scan = excluded.last_full_scan
+        """, [(host, scan_date) for host in hosts])
+
+
+def get_cached_fingerprints(hosts: List[str], ttl_hours: float,
+                            db_path: str = DB_NAME) -> Dict[Tuple[str, int, str], Dict]:
+    """
+    Get unexpired service fingerprints for hosts
     
-    deleted_count = len(scan_ids)
-    conn.commit()
-    conn.close()
+    Args:
+        hosts: Host IP addresses to look up
+        ttl_hours: Maximum age of a cache entry in hours
+        db_path: Path to database file
+    
+    Returns:
+        Dictionary mapping (host, port, protocol) to service, product, version and extrainfo
+    """
+    cutoff = (datetime.now() - timedelta(hours=ttl_hours)).strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_connection(db_path)
+    cursor = conn.cursor()
+    
+    fingerprints = {}
+    for host in hosts:
+        cursor.execute("""
+            SELECT port, protocol, service, product, version, extrainfo
+            FROM fingerprint_cache
+            WHERE host = ? AND cached_at >= ?
+        """, (host, cutoff))
+        for port, protocol, service, product, version, extrainfo in cursor.fetchall():
+            fingerprints[(host, port, protocol)] = {
+                "service": service,
+                "product": product,
+                "version": version,
+                "extrainfo": extrainfo
+            }
+    
+    return fingerprints
+
+
+def save_fingerprints(results: List[Dict], db_path: str = DB_NAME) -> None:
+    """
+    Store or refresh service fingerprints from version-detection results
+    
+    Args:
+        results: Scan results produced with version detection
+        db_path: Path to database file
+    """
+    cached_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT INTO fingerprint_cache 
+            (host, port, protocol, service, product, version, extrainfo, cached_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(host, port, protocol) DO UPDATE SET
+                service = excluded.service,
+                product = excluded.product,
+                version = excluded.version,
+                extrainfo = excluded.extrainfo,
+                cached_at = excluded.cached_at
+        """, [
+            (item["host"], item["port"], item["protocol"], item.get("service", ""),
+             item.get("product", ""), item.get("version", ""), item.get("extrainfo", ""),
+             cached_at)
+            for item in results
+        ])
+
+
+def delete_old_scans(days: int = 90, db_path: str = DB_NAME) -> int:
+    """
+    Delete scans older than specified days (for cleanup)
+    
+    Args:
+        days: Age threshold in days
+        db_path: Path to database file
+    
+    Returns:
+        Number of scans deleted
+    """
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        
+        # Get scan IDs to delete
+        cursor.execute("""
+            SELECT scan_id FROM scan_summary
+            WHERE scan_date < date('now', '-' || ? || ' days')
+        """, (days,))
+        
+        scan_ids = [row[0] for row in cursor.fetchall()]
+        
+        if not scan_ids:
+            return 0
+        
+        # Delete from both tables
+        placeholders = ','.join('?' * len(scan_ids))
+        
+        cursor.execute(f"""
+            DELETE FROM scans WHERE scan_id IN ({placeholders})
+        """, scan_ids)
+        
+        cursor.execute(f"""
+            DELETE FROM scan_summary WHERE scan_id IN ({placeholders})
+        """, scan_ids)
+        
+        if scans_layout(cursor) == "view":
+            prune_dimensions(cursor)
+        
+        deleted_count = len(scan_ids)
     
     print(f"[+] Deleted {deleted_count} old scans")
     return deleted_count
 
 
+def check_query_plans(db_path: str = DB_NAME) -> Dict[str, List[str]]:
+    """
+    Check that every query the helpers issue is served by an index
+    
+    Each query helper is called once with statement tracing on (writers
+    with arguments that change nothing), and EXPLAIN QUERY PLAN is run on
+    every statement it issued. A scan dated 1900 is saved first so the
+    cleanup helper reaches its deletes; the cleanup removes it again.
+    A regression is a plan step that scans a whole table, walks a whole
+    index where the helper should seek, or builds a temp B-tree to sort
+    or group the result. Counting distinct hosts still needs a temp
+    B-tree, and pruning interned rows visits each of them once; both are
+    allowed, as are schema lookups and reading back the rows a write
+    through the scans view has already selected.
+    
+    Args:
+        db_path: Path to database file
+    
+    Returns:
+        Dictionary mapping each offending statement to its problem plan
+        steps; empty if every plan is clean
+    """
+    # (helper call, whether reading a whole index in order is expected:
+    # true for a top-N by a sort key and for aggregates over every row)
+    calls = [
+        (lambda: get_scan_by_id("", db_path), False),
+        (lambda: get_scan_totals("", db_path), False),
+        (lambda: refresh_scan_summaries([""], db_path), False),
+        (lambda: get_all_scans(100, db_path), True),
+        (lambda: get_scan_summaries(10, db_path), True),
+        (lambda: get_scan_trends(30, db_path), False),
+        (lambda: get_high_risk_findings(20, db_path), False),
+        (lambda: get_host_history("", db_path), False),
+        (lambda: get_latest_findings([""], db_path), False),
+        (lambda: get_last_full_scans([""], db_path), False),
+        (lambda: get_cached_fingerprints([""], 24, db_path), False),
+        (lambda: get_rule_set("", db_path), False),
+        (lambda: get_rule_version_counts(db_path), True),
+        (lambda: delete_old_scans(36500, db_path), False),
+    ]
+    
+    old_scan = {"host": "192.0.2.1", "port": 23, "protocol": "tcp", "service": "telnet",
+                "product": "", "version": "", "risk": "HIGH", "cvss_estimate": 7.5,
+                "recommendation": "Query plan check"}
+    with transaction(db_path) as conn:
+        cursor = conn.cursor()
+        insert_findings(cursor, [old_scan], "query_plan_check", "1900-01-01 00:00:00")
+        cursor.execute("""
+            INSERT OR REPLACE INTO scan_summary (scan_id, target, total_findings, high_risk,
+                                                 medium_risk, low_risk, risk_score, scan_date)
+            VALUES ('query_plan_check', '192.0.2.1', 1, 1, 0, 0, 10, '1900-01-01 00:00:00')
+        """)
+    
+    conn = get_connection(db_path)
+    views = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'")}
+    problems = {}
+    for call, index_scan_ok in calls:
+        statements: List[str] = []
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        
+        for statement in statements:
+            if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue  # Transaction control
+            steps = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+            scan_ok = views | {"sqlite_master"}
+            if statement.lstrip().upper().startswith("DELETE"):
+                scan_ok = scan_ok | _PRUNED_TABLES
+            bad = []
+            for step in steps:
+                table_scan = _TABLE_SCAN.match(step)
+                if ((table_scan and table_scan.group(1) not in scan_ok) or _SORT.match(step)
+                        or (not index_scan_ok and _INDEX_SCAN.match(step))):
+                    bad.append(step)
+            if bad:
+                problems[" ".join(statement.split())] = bad
+    return problems
+
+
 if __name__ == "__main__":
     # Example usage
     print("Initializing database...")
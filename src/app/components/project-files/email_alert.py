@@ -10,15 +10,17 @@ from typing import Dict, List
 import os
 from datetime import datetime
 
+from finding import Finding
 
-def send_alert(summary: Dict, high_risk_findings: List[Dict], 
+
+def send_alert(summary: Dict, high_risk_findings: List[Finding], 
                sender: str = None, receiver: str = None, password: str = None) -> bool:
     """
     Send email alert for high-risk vulnerabilities
     
     Args:
         summary: Risk summary dictionary
-        high_risk_findings: List of high-risk findings
+        high_risk_findings: High-risk Finding records (plain dicts are accepted too)
         sender: Email sender address (uses env var if not provided)
         receiver: Email receiver address (uses env var if not provided)
         password: Email password (uses env var if not provided)
@@ -70,7 +72,7 @@ def send_alert(summary: Dict, high_risk_findings: List[Dict],
         return False
 
 
-def create_text_body(summary: Dict, findings: List[Dict]) -> str:
+def create_text_body(summary: Dict, findings: List[Finding]) -> str:
     """Create plain text email body"""
     text = f"""
 SECUREVIGIL VULNERABILITY ALERT
@@ -104,7 +106,7 @@ This is an automated alert from SecureVigil
     return text
 
 
-def create_html_body(summary: Dict, findings: List[Dict]) -> str:
+def create_html_body(summary: Dict, findings: List[Finding]) -> str:
     """Create HTML email body"""
     
     # Generate findings list HTML
@@ -316,10 +318,10 @@ if __name__ == "__main__":
     }
     
     test_findings = [
-        {"host": "192.168.1.10", "port": 23, "service": "telnet", 
-         "product": "Linux telnetd", "version": "1.0"},
-        {"host": "192.168.1.10", "port": 21, "service": "ftp", 
-         "product": "vsftpd", "version": "2.3.4"},
+        Finding(host="192.168.1.10", port=23, service="telnet",
+                product="Linux telnetd", version="1.0"),
+        Finding(host="192.168.1.10", port=21, service="ftp",
+                product="vsftpd", version="2.3.4"),
     ]
     
     if should_send_alert(test_summary):
@@ -0,0 +1,91 @@
+"""
+SecureVigil Finding Module
+Compact slotted record for findings flowing through scanner, risk engine and database
+"""
+
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator
+
+# Finding fields, in the key order scan results have always used; scan_id
+# and scan_date are only set on findings read back from the database
+FIELDS = (
+    "host", "hostname", "port", "protocol", "service", "product", "version",
+    "extrainfo", "state", "risk", "recommendation", "cvss_estimate", "cves",
+    "scan_id", "scan_date",
+)
+
+# Low-cardinality string fields that repeat across findings; interning them
+# makes every finding share one copy of each value
+_INTERNED = frozenset(("host", "hostname", "protocol", "service", "product",
+                       "version", "extrainfo", "state", "risk", "scan_id", "scan_date"))
+
+_FIELD_SET = frozenset(FIELDS)
+_MISSING = object()
+
+
+class Finding(MutableMapping):
+    """
+    Scan finding stored in __slots__ instead of a per-instance dict
+
+    Behaves like the dictionaries the pipeline has always passed around
+    (item["port"], item.get("risk"), dict(item), json via to_dict), so
+    existing callers keep working. Fields that have not been set yet,
+    such as "risk" before apply_risk, are absent just like missing keys.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields: Any):
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, item: Dict) -> "Finding":
+        """Build a Finding from a result dictionary, ignoring unknown keys"""
+        finding = cls()
+        for key, value in item.items():
+            if key in _FIELD_SET:
+                finding[key] = value
+        return finding
+
+    def to_dict(self) -> Dict:
+        """Return a plain dictionary copy (e.g. for JSON output)"""
+        return {key: getattr(self, key) for key in self}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in _FIELD_SET:
+            raise KeyError(f"Finding has no field {key!r}")
+        if key in _INTERNED and type(value) is str:
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in _FIELD_SET or not hasattr(self, key):
+            raise KeyError(key)
+        delattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in FIELDS if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for key in FIELDS if hasattr(self, key))
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELD_SET and hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Faster than the MutableMapping default, which goes through KeyError
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return default
+
+    def __repr__(self) -> str:
+        return f"Finding({self.to_dict()!r})"
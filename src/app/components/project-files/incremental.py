@@ -0,0 +1,223 @@
+"""
+SecureVigil Incremental Scanning Module
+Delta scans and fingerprint caching that reuse stored results to skip repeat work
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Dict, Set, Tuple
+
+from scanner import (VulnerabilityScanner, chunk_hosts, split_target, format_port_spec,
+                     strip_port_selection, strip_version_detection, DEFAULT_SHARD_SIZE)
+from database import (get_latest_findings, get_last_full_scans, mark_full_scan,
+                      get_cached_fingerprints, save_fingerprints, DB_NAME)
+
+# Hosts without a full version scan for this long are rescanned in full
+DEFAULT_MAX_AGE_DAYS = 7
+
+# Cached service fingerprints older than this are probed again
+DEFAULT_FINGERPRINT_TTL_HOURS = 72.0
+
+
+def _ports_by_host(results: List[Dict]) -> Dict[str, Set[Tuple[int, str]]]:
+    """Group (port, protocol) pairs by host"""
+    ports: Dict[str, Set[Tuple[int, str]]] = {}
+    for item in results:
+        ports.setdefault(item["host"], set()).add((item["port"], item["protocol"]))
+    return ports
+
+
+def plan_delta_scan(port_states: Dict[str, Set[Tuple[int, str]]],
+                    max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+                    db_path: str = DB_NAME) -> Tuple[Dict[str, str], Dict[str, List[Dict]]]:
+    """
+    Decide which hosts need a full version scan
+
+    A host needs a full scan when it has no history, its port set differs
+    from the most recent stored scan, or its last full scan is older than
+    max_age_days.
+
+    Args:
+        port_states: (port, protocol) pairs seen per host by the port-state check
+        max_age_days: Maximum age of a full scan before it is repeated
+        db_path: Path to database file
+
+    Returns:
+        Tuple of (hosts needing a full scan mapped to the reason,
+                  latest stored findings for the remaining hosts)
+    """
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+    last_full_scans = get_last_full_scans(list(port_states), db_path)
+    latest = get_latest_findings(list(port_states), db_path)
+
+    full_scan: Dict[str, str] = {}
+    baselines: Dict[str, List[Dict]] = {}
+
+    for host, ports in port_states.items():
+        previous = latest.get(host)
+        if not previous:
+            full_scan[host] = "new"
+            continue
+
+        if {(row["port"], row["protocol"]) for row in previous} != ports:
+            full_scan[host] = "ports changed"
+            continue
+
+        # Scans stored before delta tracking were full -sV scans
+        last_full = last_full_scans.get(host, previous[0]["scan_date"])
+        if last_full < cutoff:
+            full_scan[host] = "stale"
+            continue
+
+        baselines[host] = previous
+
+    return full_scan, baselines
+
+
+def delta_scan(target: str, scan_type: str = "-sV -T4",
+               max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+               workers: int = 1, shard_size: int = DEFAULT_SHARD_SIZE,
+               db_path: str = DB_NAME) -> List[Dict]:
+    """
+    Scan target incrementally using stored history
+
+    Every host gets a cheap port-state check (scan_type without version
+    detection). Only new, changed or stale hosts then get the full scan;
+    unchanged hosts keep the service details from their last stored scan.
+
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap arguments for the full scan (default: -sV -T4)
+        max_age_days: Maximum age of a full scan before it is repeated
+        workers: Maximum number of concurrent nmap processes
+        shard_size: Maximum addresses per shard
+        db_path: Path to database file
+
+    Returns:
+        List of discovered services with details
+    """
+    scanner = VulnerabilityScanner()
+
+    check_args = strip_version_detection(scan_type)
+    print(f"[*] Port-state check on {target} ({check_args or 'nmap defaults'})...")
+    port_results, _ = scanner._scan_shards(split_target(target, shard_size),
+                                           check_args, workers)
+
+    port_states = _ports_by_host(port_results)
+    full_scan, baselines = plan_delta_scan(port_states, max_age_days, db_path)
+
+    reasons: Dict[str, int] = {}
+    for reason in full_scan.values():
+        reasons[reason] = reasons.get(reason, 0) + 1
+    print(f"[+] {len(port_states)} hosts checked: {len(full_scan)} need a full scan "
+          f"({', '.join(f'{count} {reason}' for reason, count in reasons.items()) or 'none'}), "
+          f"{len(baselines)} unchanged")
+
+    results: List[Dict] = []
+
+    if full_scan:
+        hosts = list(full_scan)
+        service_args = scan_type if "-Pn" in scan_type.split() else f"{scan_type} -Pn"
+        print(f"[*] Running full scan on {len(hosts)} hosts...")
+        full_results, _ = scanner._scan_shards(chunk_hosts(hosts, shard_size),
+                                               service_args, workers)
+        results.extend(full_results)
+
+        # Hosts lost to a failed shard keep their old date and are retried next run
+        scanned = {item["host"] for item in full_results}
+        mark_full_scan([host for host in hosts if host in scanned], db_path=db_path)
+        save_fingerprints(full_results, db_path)
+
+    # Unchanged hosts: current port state plus the last stored service details.
+    # Stored scans do not keep extrainfo, so it comes from the fingerprint
+    # cache filled by full scans.
+    fingerprints = get_cached_fingerprints(list(baselines), max_age_days * 24, db_path)
+    for item in port_results:
+        previous = baselines.get(item["host"])
+        if previous is None:
+            continue
+        for row in previous:
+            if row["port"] == item["port"] and row["protocol"] == item["protocol"]:
+                cached = fingerprints.get((item["host"], item["port"], item["protocol"]), {})
+                item["service"] = row["service"] or item["service"]
+                item["product"] = row["product"] or ""
+                item["version"] = row["version"] or ""
+                item["extrainfo"] = cached.get("extrainfo") or ""
+                break
+        results.append(item)
+
+    print(f"[+] Delta scan complete. Found {len(results)} services")
+    return results
+
+
+def cached_scan(target: str, scan_type: str = "-sV -T4",
+                ttl_hours: float = DEFAULT_FINGERPRINT_TTL_HOURS,
+                workers: int = 1, shard_size: int = DEFAULT_SHARD_SIZE,
+                db_path: str = DB_NAME) -> List[Dict]:
+    """
+    Scan target, running version probes only on uncached or expired ports
+
+    A port-state check finds open ports first. Ports with an unexpired
+    entry in the fingerprint cache take their service, product, version
+    and extrainfo from the cache; the rest are version-probed (hosts that
+    need the same ports are probed together) and the cache is refreshed.
+
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap arguments including version detection (default: -sV -T4)
+        ttl_hours: Maximum age of a cached fingerprint in hours
+        workers: Maximum number of concurrent nmap processes
+        shard_size: Maximum addresses per shard
+        db_path: Path to database file
+
+    Returns:
+        List of discovered services with details
+    """
+    scanner = VulnerabilityScanner()
+
+    check_args = strip_version_detection(scan_type)
+    print(f"[*] Port-state check on {target} ({check_args or 'nmap defaults'})...")
+    port_results, _ = scanner._scan_shards(split_target(target, shard_size),
+                                           check_args, workers)
+
+    hosts = list({item["host"] for item in port_results})
+    cache = get_cached_fingerprints(hosts, ttl_hours, db_path)
+
+    results: List[Dict] = []
+    to_probe: Dict[str, List[Tuple[int, str]]] = {}
+
+    for item in port_results:
+        cached = cache.get((item["host"], item["port"], item["protocol"]))
+        if cached is not None:
+            item.update(cached)
+            results.append(item)
+        elif item["state"] == "open":
+            to_probe.setdefault(item["host"], []).append((item["port"], item["protocol"]))
+        else:
+            # Closed/filtered ports have nothing to fingerprint
+            results.append(item)
+
+    probe_ports = sum(len(ports) for ports in to_probe.values())
+    print(f"[+] {len(port_results) - probe_ports} ports served from fingerprint cache, "
+          f"{probe_ports} need version probes")
+
+    if to_probe:
+        # Hosts needing the same ports share one nmap invocation
+        groups: Dict[str, List[str]] = {}
+        for host, ports in to_probe.items():
+            groups.setdefault(format_port_spec(ports), []).append(host)
+
+        probe_args = strip_port_selection(scan_type)
+        if "-Pn" not in probe_args.split():
+            probe_args += " -Pn"
+
+        probed: List[Dict] = []
+        for port_spec, group_hosts in groups.items():
+            group_results, _ = scanner._scan_shards(chunk_hosts(group_hosts, shard_size),
+                                                    f"{probe_args} -p {port_spec}", workers)
+            probed.extend(group_results)
+
+        save_fingerprints(probed, db_path)
+        results.extend(probed)
+
+    print(f"[+] Cached scan complete. Found {len(results)} services")
+    return results
@@ -0,0 +1,506 @@
+"""
+SecureVigil Job Queue Module
+SQLite-backed shard queue for distributing one scan across several workers
+"""
+
+import atexit
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+
+from scanner import VulnerabilityScanner, split_target, DEFAULT_SHARD_SIZE
+from risk_engine import apply_risk
+from database import (init_db, insert_findings, get_scan_totals, save_scan_summary,
+                      new_scan_id, close_connections, ConnectionManager, DB_NAME)
+
+# A claimed shard whose worker has been silent this long is handed out again
+DEFAULT_LEASE_SECONDS = 3600
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 5.0
+
+
+# Queue connections run in autocommit mode; transactions are managed
+# explicitly with BEGIN IMMEDIATE
+_queue_connections = ConnectionManager(isolation_level=None)
+atexit.register(_queue_connections.close_all)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Get this thread's queue connection, which waits on locks held by other workers"""
+    conn = _queue_connections.get(db_path)
+    # Every queue function commits or rolls back before returning, so an
+    # open transaction here was abandoned by a call that raised
+    if conn.in_transaction:
+        conn.execute("ROLLBACK")
+    return conn
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def init_queue(db_path: str = DB_NAME) -> None:
+    """
+    Initialize queue tables alongside the scan results
+
+    Keeping the queue in the results database lets a worker store a
+    shard's findings and mark it done in a single transaction.
+
+    Args:
+        db_path: Path to SQLite database file
+    """
+    init_db(db_path)
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            scan_id TEXT PRIMARY KEY,
+            target TEXT NOT NULL,
+            scan_args TEXT NOT NULL,
+            notes TEXT,
+            status TEXT NOT NULL DEFAULT 'running',
+            created_at TEXT NOT NULL,
+            completed_at TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scan_shards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id TEXT NOT NULL,
+            shard TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            claimed_at TEXT,
+            finished_at TEXT,
+            findings INTEGER,
+            error TEXT,
+            UNIQUE (scan_id, shard),
+            FOREIGN KEY (scan_id) REFERENCES scan_jobs(scan_id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_shard_status ON scan_shards(status, claimed_at)
+    """)
+
+    cursor.execute("COMMIT")
+
+
+def enqueue_scan(target: str, scan_args: str = "-sV -T4",
+                 shard_size: int = DEFAULT_SHARD_SIZE, notes: Optional[str] = None,
+                 scan_id: Optional[str] = None, db_path: str = DB_NAME) -> str:
+    """
+    Split a target into shards and queue them under one scan ID
+
+    Args:
+        target: IP address or CIDR range
+        scan_args: Nmap scan arguments every worker will use
+        shard_size: Maximum addresses per shard
+        notes: Optional notes stored with the scan summary
+        scan_id: Optional custom scan ID (auto-generated if not provided)
+        db_path: Path to database file
+
+    Returns:
+        Scan ID
+    """
+    init_queue(db_path)
+    scan_id = scan_id or new_scan_id()
+    shards = split_target(target, shard_size)
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("""
+        INSERT INTO scan_jobs (scan_id, target, scan_args, notes, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (scan_id, target, scan_args, notes, _now()))
+    cursor.executemany("""
+        INSERT INTO scan_shards (scan_id, shard) VALUES (?, ?)
+    """, [(scan_id, shard) for shard in shards])
+    cursor.execute("COMMIT")
+
+    print(f"[+] Queued {len(shards)} shards for {target} (scan ID: {scan_id})")
+    return scan_id
+
+
+def claim_shard(worker_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                scan_id: Optional[str] = None, db_path: str = DB_NAME) -> Optional[Dict]:
+    """
+    Atomically claim the next pending (or abandoned) shard
+
+    Args:
+        worker_id: Identifier recorded against the claimed shard
+        lease_seconds: Age after which a running shard counts as abandoned
+        scan_id: Optionally restrict claims to one scan
+        db_path: Path to database file
+
+    Returns:
+        Dictionary with id, scan_id, shard, scan_args and worker, or None if nothing is left
+    """
+    expired = (datetime.now() - timedelta(seconds=lease_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    # Abandoned shards that have used up their attempts will never finish
+    cursor.execute("""
+        SELECT DISTINCT scan_id FROM scan_shards
+        WHERE status = 'running' AND claimed_at < ? AND attempts >= ?
+    """, (expired, MAX_ATTEMPTS))
+    expired_scans = [scan for (scan,) in cursor.fetchall()]
+    cursor.execute("""
+        UPDATE scan_shards SET status = 'failed', error = 'lease expired'
+        WHERE status = 'running' AND claimed_at < ? AND attempts >= ?
+    """, (expired, MAX_ATTEMPTS))
+    cursor.execute("""
+        SELECT s.id, s.scan_id, s.shard, j.scan_args
+        FROM scan_shards s
+        JOIN scan_jobs j ON j.scan_id = s.scan_id
+        WHERE (s.status = 'pending' OR (s.status = 'running' AND s.claimed_at < ?))
+          AND s.attempts < ?
+          AND (? IS NULL OR s.scan_id = ?)
+        ORDER BY s.id
+        LIMIT 1
+    """, (expired, MAX_ATTEMPTS, scan_id, scan_id))
+    row = cursor.fetchone()
+
+    if row is not None:
+        cursor.execute("""
+            UPDATE scan_shards
+            SET status = 'running', worker = ?, claimed_at = ?, attempts = attempts + 1
+            WHERE id = ?
+        """, (worker_id, _now(), row[0]))
+    cursor.execute("COMMIT")
+
+    # An expired shard may have been the last one outstanding
+    for expired_scan in expired_scans:
+        report_finalized(expired_scan, db_path)
+
+    if row is None:
+        return None
+
+    return {"id": row[0], "scan_id": row[1], "shard": row[2], "scan_args": row[3],
+            "worker": worker_id}
+
+
+def complete_shard(shard: Dict, results: List[Dict], db_path: str = DB_NAME) -> bool:
+    """
+    Store a shard's findings and mark it done in one transaction
+
+    Args:
+        shard: Shard returned by claim_shard
+        results: Classified findings for the shard
+        db_path: Path to database file
+
+    Returns:
+        True if saved, False if the shard had meanwhile been reclaimed
+    """
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("""
+        UPDATE scan_shards
+        SET status = 'done', finished_at = ?, findings = ?, error = NULL
+        WHERE id = ? AND worker = ? AND status = 'running'
+    """, (_now(), len(results), shard["id"], shard["worker"]))
+
+    if cursor.rowcount != 1:
+        # Our lease expired and another worker reclaimed the shard
+        cursor.execute("ROLLBACK")
+        print(f"[!] Shard {shard['shard']} was reclaimed by another worker, discarding results")
+        return False
+
+    insert_findings(cursor, results, shard["scan_id"], _now())
+    cursor.execute("COMMIT")
+    return True
+
+
+def fail_shard(shard: Dict, error: str, db_path: str = DB_NAME) -> bool:
+    """
+    Release a shard after an error so it can be retried (up to MAX_ATTEMPTS)
+
+    Args:
+        shard: Shard returned by claim_shard
+        error: Error message to record
+        db_path: Path to database file
+
+    Returns:
+        True if the shard has used up its attempts and is now failed for good
+    """
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("""
+        UPDATE scan_shards
+        SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+            error = ?
+        WHERE id = ?
+    """, (MAX_ATTEMPTS, error, shard["id"]))
+    cursor.execute("SELECT status FROM scan_shards WHERE id = ?", (shard["id"],))
+    status = cursor.fetchone()[0]
+    cursor.execute("COMMIT")
+    return status == "failed"
+
+
+def get_scan_progress(scan_id: str, db_path: str = DB_NAME) -> Dict[str, int]:
+    """
+    Count a scan's shards by status
+
+    Args:
+        scan_id: Scan identifier
+        db_path: Path to database file
+
+    Returns:
+        Dictionary with pending, running, done and failed counts
+    """
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT status, COUNT(*) FROM scan_shards WHERE scan_id = ? GROUP BY status
+    """, (scan_id,))
+    progress = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    progress.update(dict(cursor.fetchall()))
+    return progress
+
+
+def get_scan_job(scan_id: str, db_path: str = DB_NAME) -> Optional[Dict]:
+    """
+    Look up a queued scan
+
+    Args:
+        scan_id: Scan identifier
+        db_path: Path to database file
+
+    Returns:
+        Dictionary with scan_id, target, scan_args, notes and status, or None
+    """
+    init_queue(db_path)
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT scan_id, target, scan_args, notes, status FROM scan_jobs WHERE scan_id = ?
+    """, (scan_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return dict(zip(("scan_id", "target", "scan_args", "notes", "status"), row))
+
+
+def is_scan_complete(scan_id: str, db_path: str = DB_NAME) -> bool:
+    """
+    Check whether a queued scan has been finalized
+
+    Args:
+        scan_id: Scan identifier
+        db_path: Path to database file
+
+    Returns:
+        True once the scan summary has been written
+    """
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT status FROM scan_jobs WHERE scan_id = ?", (scan_id,))
+    row = cursor.fetchone()
+    return row is not None and row[0] == "complete"
+
+
+def finalize_scan(scan_id: str, db_path: str = DB_NAME) -> Optional[Dict]:
+    """
+    Write the scan summary once no shards are pending or running
+
+    Every shard is then done or failed for good. Safe to call from every
+    worker; only the first call after the last shard finishes writes the
+    summary.
+
+    Args:
+        scan_id: Scan identifier
+        db_path: Path to database file
+
+    Returns:
+        Summary counts if the scan was finalized by this call, otherwise None
+    """
+    progress = get_scan_progress(scan_id, db_path)
+    if progress["pending"] or progress["running"]:
+        return None
+
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute("""
+        UPDATE scan_jobs SET status = 'complete', completed_at = ?
+        WHERE scan_id = ? AND status = 'running'
+    """, (_now(), scan_id))
+    claimed = cursor.rowcount == 1
+    cursor.execute("SELECT target, notes, created_at FROM scan_jobs WHERE scan_id = ?", (scan_id,))
+    target, notes, created_at = cursor.fetchone()
+    cursor.execute("COMMIT")
+
+    if not claimed:
+        return None
+
+    summary = get_scan_totals(scan_id, db_path)
+    duration = (datetime.now() - datetime.strptime(created_at, "%Y-%m-%d %H:%M:%S")).total_seconds()
+    if progress["failed"]:
+        notes = f"{notes or ''} [{progress['failed']} shards failed]".strip()
+    save_scan_summary(scan_id, target, summary, notes=notes, scan_duration=duration,
+                      db_path=db_path)
+    return summary
+
+
+def report_finalized(scan_id: str, db_path: str = DB_NAME) -> Optional[Dict]:
+    """Finalize a scan if every shard is done or failed, and report it"""
+    summary = finalize_scan(scan_id, db_path)
+    if summary is not None:
+        print(f"[+] Scan {scan_id} complete: {summary['total']} findings "
+              f"({summary['high']} HIGH)")
+    return summary
+
+
+def default_worker_id() -> str:
+    """Build a worker ID from hostname and process ID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(worker_id: Optional[str] = None, scan_id: Optional[str] = None,
+               exit_when_idle: bool = False, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+               poll_interval: float = POLL_INTERVAL, stop_event: Optional[threading.Event] = None,
+               vuln_index=None, db_path: str = DB_NAME) -> int:
+    """
+    Pull shards from the queue, scan them and write results back
+
+    Args:
+        worker_id: Identifier recorded against claimed shards
+        scan_id: Optionally only work on one scan
+        exit_when_idle: Return when the queue is empty instead of polling
+        lease_seconds: Age after which another worker's shard is reclaimed
+        poll_interval: Seconds to wait between polls of an empty queue
+        stop_event: Optional event that makes the worker stop before its next shard
+        vuln_index: Optional vuln_index.VulnerabilityIndex passed to apply_risk
+        db_path: Path to database file
+
+    Returns:
+        Number of shards completed by this worker
+    """
+    init_queue(db_path)
+    worker_id = worker_id or default_worker_id()
+    scanner = VulnerabilityScanner()
+    completed = 0
+
+    print(f"[*] Worker {worker_id} waiting for shards...")
+
+    while not (stop_event and stop_event.is_set()):
+        shard = claim_shard(worker_id, lease_seconds, scan_id, db_path)
+        if shard is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"[*] Worker {worker_id} scanning shard {shard['shard']} (scan {shard['scan_id']})")
+        try:
+            # Errors must fail the shard, not checkpoint it with no findings
+            shard_results, _ = scanner.scan_shard(shard["shard"], shard["scan_args"])
+            results = apply_risk(shard_results, sort=False, vuln_index=vuln_index)
+        except Exception as e:
+            print(f"[!] Shard {shard['shard']} failed: {e}")
+            if fail_shard(shard, str(e), db_path):
+                # A shard out of attempts may have been the last one outstanding
+                report_finalized(shard["scan_id"], db_path)
+            continue
+
+        if not complete_shard(shard, results, db_path):
+            continue
+        completed += 1
+
+        report_finalized(shard["scan_id"], db_path)
+
+    print(f"[+] Worker {worker_id} finished {completed} shards")
+    # Worker threads end here; do not leave their connections open until exit
+    _queue_connections.close(db_path)
+    close_connections(db_path)
+    return completed
+
+
+def reset_interrupted_shards(scan_id: str, retry_failed: bool = False,
+                             db_path: str = DB_NAME) -> int:
+    """
+    Return a scan's unfinished shards to the queue after an interruption
+
+    Shards left 'running' by a process that was killed or restarted are
+    reset to 'pending' straight away instead of waiting for their lease
+    to expire. Finished shards keep their checkpointed findings.
+
+    Args:
+        scan_id: Scan identifier
+        retry_failed: Also give failed shards a fresh set of attempts
+        db_path: Path to database file
+
+    Returns:
+        Number of shards returned to the queue
+    """
+    statuses = ("running", "failed") if retry_failed else ("running",)
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    # One transaction, so a claiming worker never sees requeued shards on
+    # a job that is still finalized
+    cursor.execute("BEGIN IMMEDIATE")
+    cursor.execute(f"""
+        UPDATE scan_shards SET status = 'pending', attempts = 0, worker = NULL
+        WHERE scan_id = ? AND status IN ({','.join('?' * len(statuses))})
+    """, (scan_id, *statuses))
+    reset = cursor.rowcount
+    # The job may already have been finalized with failed shards
+    if reset:
+        cursor.execute("""
+            UPDATE scan_jobs SET status = 'running', completed_at = NULL WHERE scan_id = ?
+        """, (scan_id,))
+        cursor.execute("DELETE FROM scan_summary WHERE scan_id = ?", (scan_id,))
+    cursor.execute("COMMIT")
+    return reset
+
+
+def run_local_workers(scan_id: str, workers: int = 1, vuln_index=None,
+                      db_path: str = DB_NAME) -> int:
+    """
+    Work through one queued scan with in-process worker threads
+
+    Every finished shard is checkpointed in the database, so an
+    interrupted run can be continued with reset_interrupted_shards and
+    another call to this function.
+
+    Args:
+        scan_id: Scan identifier
+        workers: Number of concurrent worker threads
+        vuln_index: Optional vuln_index.VulnerabilityIndex passed to apply_risk
+        db_path: Path to database file
+
+    Returns:
+        Number of shards completed in this run
+    """
+    stop_event = threading.Event()
+    base_id = default_worker_id()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(run_worker, f"{base_id}-{i}", scan_id, True,
+                        stop_event=stop_event, vuln_index=vuln_index, db_path=db_path)
+            for i in range(max(1, workers))
+        ]
+        try:
+            return sum(future.result() for future in futures)
+        except KeyboardInterrupt:
+            # Let in-flight shards finish and checkpoint, start no new ones
+            stop_event.set()
+            print(f"\n[!] Interrupted - finishing in-flight shards. "
+                  f"Resume with: python main.py --resume {scan_id}")
+            raise
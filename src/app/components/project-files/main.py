@@ -4,14 +4,37 @@ Command-line interface for vulnerability scanning
 """
 
 import argparse
+import os
+import tempfile
+import time
 from datetime import datetime
-from scanner import scan_target
-from risk_engine import apply_risk, generate_risk_summary, get_priority_findings
-from database import init_db, save_scan
+from scanner import (scan_target, scan_target_parallel, scan_target_two_phase, iter_scan,
+                     iter_progressive_scan, COMMON_PORTS, DEFAULT_PASS_SIZE,
+                     DEFAULT_SHARD_SIZE, DEFAULT_STREAM_SHARD_SIZE, DEFAULT_DISCOVERY_ARGS)
+from targets import plan_targets, read_target_file
+from reclassify import reclassify_scans, rescore_changed_rules
+from vuln_index import load_index
+from scheduler import adaptive_scan_target, DEFAULT_SUBNET_SIZE
+from async_scanner import async_scan_target, DEFAULT_CONCURRENCY, DEFAULT_HOST_TIMEOUT
+from incremental import (delta_scan, cached_scan, DEFAULT_MAX_AGE_DAYS,
+                         DEFAULT_FINGERPRINT_TTL_HOURS)
+from job_queue import (enqueue_scan, run_worker, run_local_workers, reset_interrupted_shards,
+                       get_scan_job, get_scan_progress, is_scan_complete, finalize_scan)
+from nmap_xml import iter_host_findings
+from risk_engine import (apply_risk, generate_risk_summary, get_priority_findings, RiskSummary,
+                         TopFindings,
+                         get_recommendation_cache_stats, load_rules, get_rules)
+from database import (init_db, save_scan, save_findings, save_scan_summary, new_scan_id,
+                      get_scan_by_id, migrate_to_normalized, check_query_plans,
+                      close_connections)
 from email_alert import send_alert, should_send_alert
 import json
 
 
+# High-risk findings shown on the console and sent in alerts
+PRIORITY_LIMIT = 10
+
+
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -25,9 +48,59 @@ Examples:
   # Scan network range
   python main.py 192.168.1.0/24
 
+  # Overlapping targets are merged; fragile devices are never scanned
+  python main.py 10.0.0.0/16 10.0.4.0/22 10.0.9.7 --exclude-file ot-devices.txt --exclude 10.0.0.1
+
   # Scan with custom Nmap arguments
   python main.py 192.168.1.10 --scan-args "-sV -T5 -p-"
 
+  # Scan a large range in parallel shards
+  python main.py 10.0.0.0/16 --workers 16 --shard-size 256
+
+  # Ping sweep first, then version-scan only the live hosts
+  python main.py 10.0.0.0/16 --discover --workers 16
+
+  # Stream findings host by host while the scan is running
+  python main.py 10.0.0.0/16 --stream --workers 8 --shard-size 16
+
+  # Tune timing per /24 from measured RTT and host timeouts; report per-subnet durations
+  python main.py 10.0.0.0/16 --adaptive --workers 8 --subnet-size 256
+
+  # Risky ports first, then the rest of 1-65535 in later passes
+  python main.py 10.0.0.0/20 --progressive --workers 8
+
+  # Async engine: 64 hosts at a time, 2 minutes per host, 1 hour overall
+  python main.py 10.0.0.0/20 --async --max-concurrency 64 --host-timeout 120 --scan-timeout 3600
+
+  # Import an existing nmap XML file (plain or .gz) without rescanning
+  python main.py --import-xml other-team-scan.xml.gz --notes "Imported from NetOps"
+
+  # Nightly delta scan: full -sV only on new, changed or 7+ day old hosts
+  python main.py 10.0.0.0/16 --delta --max-age-days 7 --workers 16
+
+  # Reuse service fingerprints younger than 24 hours, probe only the rest
+  python main.py 10.0.0.0/20 --fingerprint-cache --cache-ttl-hours 24
+
+  # Distributed scan: queue shards, then start workers on any number of nodes
+  python main.py 10.0.0.0/16 --coordinator --shard-size 256 --wait
+  python main.py --worker
+
+  # Checkpoint every shard so an interrupted scan can be resumed
+  python main.py 10.0.0.0/16 --checkpoint --workers 8
+  python main.py --resume 20260301_020000
+
+  # Classify with site-specific rules
+  python main.py 192.168.1.0/24 --rules risk_rules.json
+
+  # Match product versions against an offline CVE data file
+  python main.py 192.168.1.0/24 --vuln-db vulns.csv
+
+  # Re-score every stored finding after a policy change
+  python main.py --reclassify --rules risk_rules_2026.json
+
+  # Re-score only the findings the changed rules can affect
+  python main.py --rescore --rules risk_rules_2026.json
+
   # Save results to JSON
   python main.py 192.168.1.10 --output results.json
 
@@ -36,12 +109,29 @@ Examples:
 
   # Add notes to scan
   python main.py 192.168.1.10 --notes "Monthly security audit"
+
+  # Fail (exit 1) if a database query loses its index
+  python main.py --check-query-plans
         """
     )
     
     parser.add_argument(
         "target",
-        help="Target IP address or CIDR range (e.g., 192.168.1.10 or 192.168.1.0/24)"
+        nargs="*",
+        help="Target IP addresses, CIDR ranges or ranges (e.g., 192.168.1.10 192.168.1.0/24 "
+             "10.0.0.1-50); overlaps are merged"
+    )
+    
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Addresses, CIDRs or ranges never to scan; comma-separated, repeatable"
+    )
+    
+    parser.add_argument(
+        "--exclude-file",
+        help="File of addresses, CIDRs or ranges never to scan (one or more per line, # comments)"
     )
     
     parser.add_argument(
@@ -50,6 +140,196 @@ Examples:
         help="Nmap scan arguments (default: -sV -T4)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of concurrent nmap processes; >1 enables sharded scanning (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        help=f"Maximum addresses per shard (default: {DEFAULT_SHARD_SIZE}, "
+             f"{DEFAULT_STREAM_SHARD_SIZE} with --stream or --progressive)"
+    )
+    
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="Find live hosts with a ping sweep before running service detection"
+    )
+    
+    parser.add_argument(
+        "--discovery-args",
+        default=DEFAULT_DISCOVERY_ARGS,
+        help=f"Nmap arguments for the discovery phase (default: {DEFAULT_DISCOVERY_ARGS})"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process, save and report findings host by host as the scan runs"
+    )
+    
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Measure RTT and host timeouts per subnet and adapt nmap timing, parallelism "
+             "and shard size to each"
+    )
+    
+    parser.add_argument(
+        "--subnet-size",
+        type=int,
+        default=DEFAULT_SUBNET_SIZE,
+        help=f"Addresses per independently tuned subnet with --adaptive "
+             f"(default: {DEFAULT_SUBNET_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--progressive",
+        action="store_true",
+        help="Stream high-risk and common ports first, then cover all remaining "
+             "ports in later passes under the same scan ID"
+    )
+    
+    parser.add_argument(
+        "--pass-size",
+        type=int,
+        default=DEFAULT_PASS_SIZE,
+        help=f"Ports per long-tail pass with --progressive (default: {DEFAULT_PASS_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Use the asyncio engine (one nmap process per host)"
+    )
+    
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum concurrent nmap processes with --async (default: {DEFAULT_CONCURRENCY})"
+    )
+    
+    parser.add_argument(
+        "--host-timeout",
+        type=float,
+        default=DEFAULT_HOST_TIMEOUT,
+        help=f"Per-host deadline in seconds with --async (default: {DEFAULT_HOST_TIMEOUT:.0f})"
+    )
+    
+    parser.add_argument(
+        "--scan-timeout",
+        type=float,
+        help="Overall scan deadline in seconds with --async"
+    )
+    
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Full-scan only new, changed or stale hosts; port-check the rest"
+    )
+    
+    parser.add_argument(
+        "--max-age-days",
+        type=int,
+        default=DEFAULT_MAX_AGE_DAYS,
+        help=f"Rescan hosts in full after this many days with --delta (default: {DEFAULT_MAX_AGE_DAYS})"
+    )
+    
+    parser.add_argument(
+        "--fingerprint-cache",
+        action="store_true",
+        help="Version-probe only ports without an unexpired cached fingerprint"
+    )
+    
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=DEFAULT_FINGERPRINT_TTL_HOURS,
+        help=f"Fingerprint cache TTL in hours (default: {DEFAULT_FINGERPRINT_TTL_HOURS:.0f})"
+    )
+    
+    parser.add_argument(
+        "--coordinator",
+        action="store_true",
+        help="Queue the target as shards for --worker processes instead of scanning"
+    )
+    
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="With --coordinator, wait for workers to finish and report the results"
+    )
+    
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Run as a scan worker, pulling shards from the queue"
+    )
+    
+    parser.add_argument(
+        "--worker-id",
+        help="Worker identifier (default: hostname:pid)"
+    )
+    
+    parser.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="With --worker, exit once the queue is empty instead of polling"
+    )
+    
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Record each finished shard so the scan can be resumed with --resume"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        metavar="SCAN_ID",
+        help="Resume an interrupted --checkpoint or --coordinator scan"
+    )
+    
+    parser.add_argument(
+        "--import-xml",
+        metavar="FILE",
+        help="Ingest an existing nmap XML file instead of scanning (target is optional)"
+    )
+    
+    parser.add_argument(
+        "--rules",
+        metavar="FILE",
+        help="JSON file overriding the risk classification rules"
+    )
+    
+    parser.add_argument(
+        "--vuln-db",
+        metavar="FILE",
+        help="Offline vulnerability data (CSV: product,affected_from,fixed_in,cve,cvss) "
+             "to match product versions against known CVEs"
+    )
+    
+    parser.add_argument(
+        "--reclassify",
+        nargs="?",
+        const="all",
+        metavar="SCAN_ID",
+        help="Re-score stored findings (all scans, or one SCAN_ID) with the current "
+             "rules and exit"
+    )
+    
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Re-score only stored findings affected by rule changes since they "
+             "were scored, then exit"
+    )
+    
     parser.add_argument(
         "--output", "-o",
         help="Save results to JSON file"
@@ -72,12 +352,32 @@ Examples:
         help="Add notes to scan record"
     )
     
+    parser.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        help="Drop and rebuild the findings indexes around the save "
+             "(faster for very large scans)"
+    )
+    
     parser.add_argument(
         "--init-db",
         action="store_true",
         help="Initialize database and exit"
     )
     
+    parser.add_argument(
+        "--normalize-db",
+        action="store_true",
+        help="Convert the database to the normalized (interned) layout and exit"
+    )
+    
+    parser.add_argument(
+        "--check-query-plans",
+        action="store_true",
+        help="Verify every database query is served by an index (both schema "
+             "layouts); exit 1 on a full table scan or sort"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -86,6 +386,17 @@ Examples:
     
     args = parser.parse_args()
     
+    if not args.target and not (args.import_xml or args.init_db or args.worker or args.resume
+                                or args.reclassify or args.rescore
+                                or args.normalize_db or args.check_query_plans):
+        parser.error("target is required unless --import-xml, --worker, --resume, "
+                     "--reclassify, --rescore, --normalize-db, --check-query-plans "
+                     "or --init-db is given")
+    
+    if args.shard_size is None:
+        streaming = args.stream or args.progressive
+        args.shard_size = DEFAULT_STREAM_SHARD_SIZE if streaming else DEFAULT_SHARD_SIZE
+    
     # Initialize database if requested
     if args.init_db:
         print("[*] Initializing database...")
@@ -93,9 +404,73 @@ Examples:
         print("[+] Database initialized successfully")
         return
     
+    if args.check_query_plans:
+        if not check_schema_query_plans():
+            exit(1)
+        return
+    
+    if args.normalize_db:
+        print("[*] Normalizing database...")
+        stats = migrate_to_normalized()
+        print(f"[+] Database size: {stats['bytes_before'] / 1024:.0f} KiB -> "
+              f"{stats['bytes_after'] / 1024:.0f} KiB")
+        return
+    
     # Print banner
     print_banner()
     
+    if args.rules:
+        load_rules(args.rules)
+        print(f"[*] Risk rules loaded from {args.rules}")
+    
+    args.vuln_index = load_index(args.vuln_db) if args.vuln_db else None
+    
+    if args.target:
+        args.target = plan_scan_targets(args)
+        if not args.target:
+            parser.error("every target address is excluded")
+    
+    if args.reclassify:
+        init_db()
+        stats = reclassify_scans(None if args.reclassify == "all" else args.reclassify)
+        print(f"[+] Reclassified {stats['rows']} findings: {stats['changed']} changed "
+              f"({stats['unique_keys']} distinct port/service/version keys), "
+              f"{stats['scans_updated']} scan summaries updated in {stats['seconds']}s")
+        return
+    
+    if args.rescore:
+        init_db()
+        stats = rescore_changed_rules()
+        if not stats["versions"]:
+            print(f"[+] All stored findings already scored with rules {stats['rule_version']}")
+            return
+        for version, counts in stats["versions"].items():
+            print(f"    {version}: {counts['checked']} of {counts['rows']} findings "
+                  f"re-checked, {counts['changed']} changed")
+        print(f"[+] Rules {stats['rule_version']}: {stats['changed']} findings changed, "
+              f"{stats['scans_updated']} scan summaries updated in {stats['seconds']}s")
+        return
+    
+    if args.worker:
+        run_worker(args.worker_id, exit_when_idle=args.exit_when_idle,
+                   vuln_index=args.vuln_index)
+        return
+    
+    if args.coordinator:
+        run_coordinator(args)
+        return
+    
+    if args.checkpoint or args.resume:
+        run_checkpointed_scan(args)
+        return
+    
+    if args.import_xml:
+        print(f"\n[*] Importing nmap XML: {args.import_xml}")
+        print("=" * 60)
+        args.target = args.target or args.import_xml
+        run_streaming_scan(args, datetime.now(), iter_host_findings(args.import_xml))
+        return
+    
     # Perform scan
     print(f"\n[*] Target: {args.target}")
     print(f"[*] Scan Arguments: {args.scan_args}")
@@ -104,8 +479,45 @@ Examples:
     
     start_time = datetime.now()
     
+    if args.progressive:
+        rules = get_rules()
+        priority_ports = rules["high_risk_ports"] + rules["medium_risk_ports"] + COMMON_PORTS
+        run_streaming_scan(args, start_time, iter_progressive_scan(
+            args.target, args.scan_args, priority_ports,
+            args.workers, args.shard_size, args.pass_size))
+        return
+    
+    if args.stream:
+        run_streaming_scan(args, start_time)
+        return
+    
     # Execute scan
-    results = scan_target(args.target, args.scan_args)
+    phase_timings = None
+    subnet_timings = None
+    if args.use_async:
+        results = async_scan_target(args.target, args.scan_args, args.max_concurrency,
+                                    args.host_timeout, args.scan_timeout)
+    elif args.adaptive:
+        results, subnet_timings = adaptive_scan_target(args.target, args.scan_args,
+                                                       args.workers, args.subnet_size)
+        print_subnet_timings(subnet_timings)
+    elif args.delta:
+        init_db()  # Delta planning reads scan history
+        results = delta_scan(args.target, args.scan_args, args.max_age_days,
+                             args.workers, args.shard_size)
+    elif args.fingerprint_cache:
+        init_db()  # Fingerprint cache lives in the database
+        results = cached_scan(args.target, args.scan_args, args.cache_ttl_hours,
+                              args.workers, args.shard_size)
+    elif args.discover:
+        results, phase_timings = scan_target_two_phase(
+            args.target, args.scan_args, args.discovery_args,
+            args.workers, args.shard_size)
+    elif args.workers > 1:
+        results = scan_target_parallel(args.target, args.scan_args,
+                                       args.workers, args.shard_size)
+    else:
+        results = scan_target(args.target, args.scan_args)
     
     if not results:
         print("\n[!] No services discovered or scan failed")
@@ -113,7 +525,9 @@ Examples:
     
     # Apply risk classification
     print("\n[*] Analyzing risks...")
-    results = apply_risk(results)
+    results = apply_risk(results, vuln_index=args.vuln_index)
+    if args.verbose:
+        print_cache_stats(args.vuln_index)
     
     # Generate summary
     summary = generate_risk_summary(results)
@@ -127,7 +541,8 @@ Examples:
     if not args.no_db:
         print("\n[*] Saving to database...")
         init_db()  # Ensure database exists
-        scan_id = save_scan(results, args.target, notes=args.notes)
+        scan_id = save_scan(results, args.target, notes=args.notes,
+                            rebuild_indexes=args.rebuild_indexes)
         print(f"[+] Scan ID: {scan_id}")
     
     # Save to JSON if requested
@@ -138,10 +553,12 @@ Examples:
                 "target": args.target,
                 "scan_date": datetime.now().isoformat(),
                 "scan_duration": scan_duration,
+                "phase_timings": phase_timings,
+                "subnet_timings": subnet_timings,
                 "notes": args.notes
             },
             "summary": summary,
-            "results": results
+            "results": [dict(item) for item in results]
         }
         with open(args.output, 'w') as f:
             json.dump(output_data, f, indent=2)
@@ -150,7 +567,7 @@ Examples:
     # Send email alert if high-risk findings
     if not args.no_alert and should_send_alert(summary):
         print("\n[!] High-risk vulnerabilities detected - sending alert...")
-        priority_findings = get_priority_findings(results, limit=10)
+        priority_findings = get_priority_findings(results, limit=PRIORITY_LIMIT)
         if send_alert(summary, priority_findings):
             print("[+] Alert email sent successfully")
         else:
@@ -161,6 +578,259 @@ Examples:
     print("=" * 60)
 
 
+def check_schema_query_plans():
+    """
+    Check the query plans of a fresh database in each schema layout
+    
+    Returns:
+        True if no query scans a whole table or sorts its result
+    """
+    clean = True
+    for layout, normalized in (("default", False), ("normalized", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "plans.db")
+            init_db(db_path, normalized=normalized)
+            problems = check_query_plans(db_path)
+            close_connections(db_path)
+        
+        if not problems:
+            print(f"[+] {layout} layout: every query uses an index")
+            continue
+        clean = False
+        print(f"[!] {layout} layout: {len(problems)} queries regressed")
+        for statement, steps in problems.items():
+            print(f"    {statement[:100]}")
+            for step in steps:
+                print(f"      -> {step}")
+    return clean
+
+
+def plan_scan_targets(args):
+    """
+    Merge the command-line targets and subtract exclusions
+    
+    Hostnames and nmap patterns cannot be checked here, so when any are
+    scanned the exclusions are added to the nmap arguments as --exclude.
+    
+    Returns:
+        Space-separated minimal CIDR blocks (plus any hostnames) to scan
+    """
+    exclude = [spec for value in args.exclude for spec in value.split(",") if spec]
+    if args.exclude_file:
+        exclude.extend(read_target_file(args.exclude_file))
+    
+    plan = plan_targets(args.target, exclude)
+    if plan["duplicates"] or plan["excluded"] or len(plan["targets"]) > 1:
+        print(f"[*] Target plan: {plan['requested']} addresses requested, "
+              f"{plan['duplicates']} duplicate, {plan['excluded']} excluded -> "
+              f"{plan['addresses']} addresses in {len(plan['targets'])} blocks")
+    if plan["nmap_exclude"]:
+        option = f" --exclude {','.join(plan['nmap_exclude'])}"
+        args.scan_args += option
+        args.discovery_args += option
+        print(f"[!] Hostnames or nmap patterns in the targets cannot be checked against "
+              f"exclusions before scanning; passing {len(plan['nmap_exclude'])} exclusions "
+              f"to nmap with --exclude")
+    return " ".join(plan["targets"])
+
+
+def run_coordinator(args):
+    """Queue a distributed scan and optionally wait for the workers to finish it"""
+    scan_id = enqueue_scan(args.target, args.scan_args, args.shard_size, notes=args.notes)
+    print(f"[*] Start workers with: python main.py --worker")
+    
+    if not args.wait:
+        print(f"[+] Scan ID: {scan_id}")
+        return
+    
+    start_time = datetime.now()
+    while True:
+        progress = get_scan_progress(scan_id)
+        print(f"[*] Shards: {progress['done']} done, {progress['running']} running, "
+              f"{progress['pending']} pending, {progress['failed']} failed")
+        if is_scan_complete(scan_id):
+            break
+        if not progress["pending"] and not progress["running"]:
+            # Every shard is done or failed for good; no worker will finalize it now
+            finalize_scan(scan_id)
+            break
+        time.sleep(10)
+    
+    report_queued_scan(args, scan_id, start_time)
+
+
+def run_checkpointed_scan(args):
+    """Run (or resume) a scan whose shards are checkpointed in the database"""
+    start_time = datetime.now()
+    
+    if args.resume:
+        scan_id = args.resume
+        job = get_scan_job(scan_id)
+        if job is None:
+            print(f"[!] No checkpointed scan with ID {scan_id}")
+            return
+        args.target, args.notes = job["target"], job["notes"]
+        reset = reset_interrupted_shards(scan_id, retry_failed=True)
+        progress = get_scan_progress(scan_id)
+        print(f"[*] Resuming scan {scan_id}: {progress['done']} shards already done, "
+              f"{progress['pending']} to go ({reset} returned to the queue)")
+    else:
+        scan_id = enqueue_scan(args.target, args.scan_args, args.shard_size, notes=args.notes)
+    
+    run_local_workers(scan_id, args.workers, args.vuln_index)
+    
+    progress = get_scan_progress(scan_id)
+    if not progress["pending"] and not progress["running"]:
+        # Done or failed for good: write the summary even if shards failed
+        finalize_scan(scan_id)
+    
+    if not is_scan_complete(scan_id):
+        print(f"\n[!] Scan {scan_id} did not finish. Resume with: python main.py --resume {scan_id}")
+        return
+    
+    if progress["failed"]:
+        print(f"\n[!] {progress['failed']} shards failed. Retry them with: "
+              f"python main.py --resume {scan_id}")
+    report_queued_scan(args, scan_id, start_time)
+
+
+def report_queued_scan(args, scan_id, start_time):
+    """Print, alert on and optionally export a finished queued scan"""
+    results = get_scan_by_id(scan_id)
+    summary = generate_risk_summary(results)
+    scan_duration = (datetime.now() - start_time).total_seconds()
+    print_results(results, summary, scan_duration, args.verbose)
+    print(f"[+] Scan ID: {scan_id}")
+    
+    if args.output:
+        output_data = {
+            "scan_info": {
+                "scan_id": scan_id,
+                "target": args.target,
+                "scan_date": datetime.now().isoformat(),
+                "scan_duration": scan_duration,
+                "notes": args.notes
+            },
+            "summary": summary,
+            "results": [dict(item) for item in results]
+        }
+        with open(args.output, 'w') as f:
+            json.dump(output_data, f, indent=2)
+        print(f"[+] Results saved to {args.output}")
+    
+    if not args.no_alert and should_send_alert(summary):
+        print("\n[!] High-risk vulnerabilities detected - sending alert...")
+        if send_alert(summary, get_priority_findings(results, limit=PRIORITY_LIMIT)):
+            print("[+] Alert email sent successfully")
+        else:
+            print("[!] Alert email failed (check configuration)")
+
+
+def run_streaming_scan(args, start_time, host_findings=None):
+    """
+    Scan in streaming mode, handling each host's findings as they arrive
+    
+    host_findings may supply (host, findings) pairs from another source,
+    such as an imported XML file or a progressive scan whose passes report
+    the same host more than once; by default the target is scanned.
+    """
+    if host_findings is None:
+        host_findings = iter_scan(args.target, args.scan_args, args.workers, args.shard_size)
+    
+    scan_id = new_scan_id()
+    running_summary = RiskSummary()
+    top_findings = TopFindings(PRIORITY_LIMIT)
+    
+    if not args.no_db:
+        init_db()  # Ensure database exists
+    
+    # Results are written to JSON as they arrive instead of held in memory
+    output_file = None
+    written = 0
+    if args.output:
+        output_file = open(args.output, 'w')
+        output_file.write('{\n  "results": [')
+    
+    try:
+        for host, findings in host_findings:
+            if not findings:
+                continue
+            
+            findings = apply_risk(findings, sort=False, vuln_index=args.vuln_index)
+            running_summary.update(findings)
+            
+            if not args.no_db:
+                save_findings(findings, scan_id)
+            
+            if output_file:
+                for finding in findings:
+                    output_file.write(("," if written else "") + "\n    " + json.dumps(dict(finding)))
+                    written += 1
+            
+            for finding in get_priority_findings(findings):
+                print(f"  🚨 [{finding['host']}:{finding['port']}] {finding['service']} - "
+                      f"{finding.get('recommendation', 'Review immediately')}")
+            top_findings.update(findings)
+    finally:
+        scan_duration = (datetime.now() - start_time).total_seconds()
+        summary = running_summary.to_dict()
+        
+        if output_file:
+            scan_info = {
+                "target": args.target,
+                "scan_date": datetime.now().isoformat(),
+                "scan_duration": scan_duration,
+                "notes": args.notes
+            }
+            output_file.write(f'\n  ],\n  "summary": {json.dumps(summary)},'
+                              f'\n  "scan_info": {json.dumps(scan_info)}\n}}\n')
+            output_file.close()
+            print(f"[+] Results saved to {args.output}")
+    
+    print_summary(summary, scan_duration)
+    if args.verbose:
+        print_cache_stats(args.vuln_index)
+    
+    if summary["total"] == 0:
+        print("\n[!] No services discovered or scan failed")
+        return
+    
+    if not args.no_db:
+        save_scan_summary(scan_id, args.target, summary, notes=args.notes,
+                          scan_duration=scan_duration)
+        print(f"[+] Scan ID: {scan_id}")
+    
+    if not args.no_alert and should_send_alert(summary):
+        print("\n[!] High-risk vulnerabilities detected - sending alert...")
+        if send_alert(summary, top_findings.results()):
+            print("[+] Alert email sent successfully")
+        else:
+            print("[!] Alert email failed (check configuration)")
+
+
+def print_cache_stats(vuln_index=None):
+    """Print the recommendation (and vulnerability match) cache hit rates"""
+    stats = get_recommendation_cache_stats()
+    print(f"[*] Recommendation cache: {stats['hit_rate']}% hit rate "
+          f"({stats['hits']} hits, {stats['misses']} misses, {stats['size']} entries)")
+    if vuln_index is not None:
+        stats = vuln_index.cache_stats()
+        print(f"[*] Vulnerability match cache: {stats['hit_rate']}% hit rate "
+              f"({stats['hits']} hits, {stats['misses']} misses)")
+
+
+def print_subnet_timings(reports):
+    """Print per-subnet timing profile, measurements and duration"""
+    print("\n⏱  Subnet Timings:")
+    print(f"  {'Subnet':<20} {'Profile':<12} {'SRTT (ms)':>10} {'Timeouts':>9} "
+          f"{'Up':>5} {'Shards':>7} {'Time (s)':>9}")
+    for report in reports:
+        srtt = f"{report['srtt_ms']:.1f}" if report["srtt_ms"] is not None else "-"
+        print(f"  {report['subnet']:<20} {report['profile']:<12} {srtt:>10} "
+              f"{report['timeout_percent']:>8.1f}% {report['hosts_up']:>5} "
+              f"{report['shards']:>7} {report['duration']:>9.2f}")
+
+
 def print_banner():
     """Print application banner"""
     banner = """
@@ -174,12 +844,12 @@ def print_banner():
     print(banner)
 
 
-def print_results(results, summary, duration, verbose=False):
-    """Print scan results to console"""
+def print_summary(summary, duration):
+    """Print summary statistics to console"""
     print("\n" + "=" * 60)
     print("SCAN RESULTS")
     print("=" * 60)
-    
+
     print(f"\n📊 Summary:")
     print(f"  Total Findings: {summary['total']}")
     print(f"  High Risk:      {summary['high']} ({summary['high_percent']}%)")
@@ -188,17 +858,28 @@ def print_results(results, summary, duration, verbose=False):
     print(f"  Hosts Scanned:  {summary['hosts']}")
     print(f"  Risk Score:     {summary['risk_score']}")
     print(f"  Duration:       {duration:.2f} seconds")
-    
-    # Print high-risk findings
-    high_risk = [r for r in results if r.get("risk") == "HIGH"]
+
+
+def print_results(results, summary, duration, verbose=False):
+    """Print scan results to console"""
+    print_summary(summary, duration)
+
+    # Print high-risk findings, highest priority first
+    limit = summary["high"] if verbose else PRIORITY_LIMIT
+    high_risk = get_priority_findings(results, limit=limit)
     if high_risk:
-        print(f"\n🚨 HIGH RISK FINDINGS ({len(high_risk)}):")
+        print(f"\n🚨 HIGH RISK FINDINGS ({summary['high']}):")
         print("-" * 60)
         for finding in high_risk:
             print(f"\n  [{finding['host']}:{finding['port']}] {finding['service']}")
             if finding.get('product'):
                 print(f"    Product: {finding['product']} {finding.get('version', '')}")
+            if finding.get('cves'):
+                print(f"    CVEs: {', '.join(finding['cves'])} (CVSS {finding['cvss_estimate']})")
             print(f"    ⚠️  {finding.get('recommendation', 'Review immediately')}")
+        if summary["high"] > len(high_risk):
+            print(f"\n  ... and {summary['high'] - len(high_risk)} more "
+                  f"(use --verbose to list all)")
     
     # Print medium-risk findings if verbose
     if verbose:
@@ -0,0 +1,150 @@
+"""
+SecureVigil Nmap XML Module
+Incremental parsing of existing nmap XML output files
+"""
+
+import gzip
+import xml.etree.ElementTree as ET
+from typing import List, Dict, IO, Iterator, Tuple, Union
+
+from finding import Finding
+
+Source = Union[str, IO[bytes]]
+
+
+def _open_source(source: Source) -> IO[bytes]:
+    """Open a path (plain or .gz) or pass an already-open binary file through"""
+    if not isinstance(source, str):
+        return source
+    if source.endswith(".gz"):
+        return gzip.open(source, "rb")
+    return open(source, "rb")
+
+
+def _hostname(host_elem: ET.Element) -> str:
+    """Pick the hostname the same way python-nmap's hostname() does"""
+    names = host_elem.findall("hostnames/hostname")
+    for name in names:
+        if name.get("type") == "user":
+            return name.get("name", "")
+    return names[0].get("name", "") if names else ""
+
+
+def _parse_host(host_elem: ET.Element) -> Dict:
+    """
+    Convert a <host> element into a host record
+
+    Args:
+        host_elem: Fully parsed <host> element
+
+    Returns:
+        Dictionary with address, hostname, state, srtt, timedout and ports
+    """
+    address = ""
+    for addr in host_elem.findall("address"):
+        # Prefer the IP address over the MAC address nmap adds on local links
+        if addr.get("addrtype") in ("ipv4", "ipv6"):
+            address = addr.get("addr", "")
+            break
+        address = address or addr.get("addr", "")
+
+    status = host_elem.find("status")
+    times = host_elem.find("times")
+
+    ports = []
+    for port_elem in host_elem.findall("ports/port"):
+        state = port_elem.find("state")
+        service = port_elem.find("service")
+        service = service if service is not None else ET.Element("service")
+        ports.append({
+            "port": int(port_elem.get("portid", 0)),
+            "protocol": port_elem.get("protocol", "tcp"),
+            "service": service.get("name", ""),
+            "product": service.get("product", ""),
+            "version": service.get("version", ""),
+            "extrainfo": service.get("extrainfo", ""),
+            "state": state.get("state", "") if state is not None else ""
+        })
+
+    return {
+        "host": address,
+        "hostname": _hostname(host_elem),
+        "state": status.get("state", "") if status is not None else "",
+        "srtt": int(times.get("srtt", -1)) if times is not None else -1,
+        "timedout": host_elem.get("timedout") == "true",
+        "ports": ports
+    }
+
+
+def iter_host_records(source: Source) -> Iterator[Dict]:
+    """
+    Incrementally parse nmap XML, yielding one record per <host>
+
+    Each <host> subtree is discarded once it has been converted, so memory
+    stays bounded by the largest single host rather than the file size.
+
+    Args:
+        source: Path to an nmap XML file (optionally .gz) or a binary file object
+
+    Yields:
+        Host records (see _parse_host)
+    """
+    stream = _open_source(source)
+    try:
+        root = None
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+
+            if elem.tag == "host":
+                yield _parse_host(elem)
+                elem.clear()
+                # Drop the finished host from <nmaprun> as well
+                root.clear()
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+def iter_host_findings(source: Source) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Parse nmap XML into per-host findings in the scanner's result format
+
+    Args:
+        source: Path to an nmap XML file (optionally .gz) or a binary file object
+
+    Yields:
+        Tuple of (host, list of that host's services)
+    """
+    for record in iter_host_records(source):
+        findings = []
+        for port in record["ports"]:
+            findings.append(Finding(host=record["host"], hostname=record["hostname"], **port))
+        yield record["host"], findings
+
+
+def iter_findings(source: Source) -> Iterator[Dict]:
+    """
+    Parse nmap XML into a flat stream of findings
+
+    Args:
+        source: Path to an nmap XML file (optionally .gz) or a binary file object
+
+    Yields:
+        Finding dictionaries identical to VulnerabilityScanner.scan_target output
+    """
+    for _, findings in iter_host_findings(source):
+        yield from findings
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Example usage: python nmap_xml.py scan.xml
+    count = 0
+    for finding in iter_findings(sys.argv[1]):
+        count += 1
+        print(f"[{finding['host']}:{finding['port']}] {finding['service']}")
+    print(f"\n[+] Parsed {count} findings")
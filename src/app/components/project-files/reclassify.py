@@ -0,0 +1,284 @@
+"""
+SecureVigil Reclassification Module
+Batch re-scoring of stored findings after a risk policy change
+"""
+
+import sqlite3
+import time
+from typing import List, Dict, Optional, Tuple
+
+from risk_engine import apply_risk, get_rules, get_rules_version, normalize_rules
+from database import (refresh_scan_summaries, register_rule_set, get_rule_set,
+                      get_rule_version_counts, get_connection, DB_NAME)
+
+# Rows read, classified and written per chunk
+DEFAULT_CHUNK_SIZE = 50_000
+
+Outcome = Tuple[str, str, float]
+
+
+def classify_columns(ports: List[int], services: List[str], versions: List[str],
+                     cache: Optional[Dict[Tuple, Outcome]] = None) -> List[Outcome]:
+    """
+    Classify findings given as parallel columns
+
+    Each distinct (port, service, version) key is run through apply_risk
+    once, so results match apply_risk exactly; every row then takes the
+    outcome of its key.
+
+    Args:
+        ports: Port column
+        services: Service column (None is treated as "")
+        versions: Version column (None is treated as "")
+        cache: Optional key -> outcome map shared across chunks
+
+    Returns:
+        (risk, recommendation, cvss_estimate) per row
+    """
+    if cache is None:
+        cache = {}
+
+    outcomes = []
+    for key in zip(ports, services, versions):
+        outcome = cache.get(key)
+        if outcome is None:
+            port, service, version = key
+            item = apply_risk([{"port": port, "service": service or "",
+                                "version": version or ""}], sort=False)[0]
+            outcome = (item["risk"], item["recommendation"], item["cvss_estimate"])
+            cache[key] = outcome
+        outcomes.append(outcome)
+    return outcomes
+
+
+def _rescore_rows(conn: sqlite3.Connection, condition: str, params: List,
+                  chunk_size: int, dry_run: bool, cache: Dict[Tuple, Outcome]) -> Tuple[int, int, set]:
+    """
+    Re-score the rows matching an SQL condition, chunk by chunk
+
+    Rows carrying CVE matches keep their vulnerability-based scoring and
+    are skipped. Changed rows are written back with the active rule
+    version, one transaction per chunk.
+
+    Returns:
+        Tuple of (rows checked, rows changed, scan IDs with changed rows)
+    """
+    cursor = conn.cursor()
+    rule_version = get_rules_version()
+    query = f"""
+        SELECT id, scan_id, port, service, version, risk, recommendation, cvss_estimate
+        FROM scans
+        WHERE id > ? AND cves IS NULL AND ({condition})
+        ORDER BY id
+        LIMIT ?
+    """
+
+    affected_scans = set()
+    rows_seen = 0
+    changed = 0
+    last_id = 0
+
+    while True:
+        rows = cursor.execute(query, (last_id, *params, chunk_size)).fetchall()
+        if not rows:
+            break
+
+        ids, scan_ids, ports, services, versions, risks, recommendations, scores = zip(*rows)
+        outcomes = classify_columns(ports, services, versions, cache)
+
+        updates = []
+        for index, (risk, recommendation, score) in enumerate(outcomes):
+            if (risk != risks[index] or recommendation != recommendations[index]
+                    or score != scores[index]):
+                updates.append((risk, recommendation, score, rule_version, ids[index]))
+                affected_scans.add(scan_ids[index])
+
+        if updates and not dry_run:
+            with conn:
+                conn.executemany("""
+                    UPDATE scans SET risk = ?, recommendation = ?, cvss_estimate = ?, rule_version = ?
+                    WHERE id = ?
+                """, updates)
+
+        rows_seen += len(rows)
+        changed += len(updates)
+        last_id = ids[-1]
+        print(f"[*] Re-scored {rows_seen} rows ({changed} changed)")
+
+    return rows_seen, changed, affected_scans
+
+
+def reclassify_scans(scan_id: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     dry_run: bool = False, db_path: str = DB_NAME) -> Dict:
+    """
+    Re-run risk classification over stored findings and write back changes
+
+    Rows are read in id order, chunk_size at a time, and split into port,
+    service and version columns. Each distinct key is classified once.
+    Only rows whose risk, recommendation or cvss_estimate changed are
+    updated, in bulk, one transaction per chunk. Summaries of the affected
+    scans are then recomputed.
+
+    Args:
+        scan_id: Only reclassify this scan (default: every stored finding)
+        chunk_size: Rows per chunk
+        dry_run: Count changes without writing them
+        db_path: Path to database file
+
+    Returns:
+        Dictionary with rows, changed, unique_keys, scans_updated and seconds
+    """
+    start = time.perf_counter()
+    conn = get_connection(db_path)
+    cache: Dict[Tuple, Outcome] = {}
+
+    condition, params = ("scan_id = ?", [scan_id]) if scan_id else ("1", [])
+    rows_seen, changed, affected_scans = _rescore_rows(conn, condition, params,
+                                                       chunk_size, dry_run, cache)
+
+    if not dry_run:
+        # Every row checked is now consistent with the active rules
+        with conn:
+            register_rule_set(conn.cursor())
+            conn.execute(f"UPDATE scans SET rule_version = ? WHERE cves IS NULL AND ({condition})",
+                         (get_rules_version(), *params))
+
+    scans_updated = 0
+    if affected_scans and not dry_run:
+        scans_updated = refresh_scan_summaries(sorted(affected_scans), db_path)
+
+    return {
+        "rows": rows_seen,
+        "changed": changed,
+        "unique_keys": len(cache),
+        "scans_updated": scans_updated,
+        "seconds": round(time.perf_counter() - start, 2)
+    }
+
+
+def affected_rows_filter(old_rules: Dict, new_rules: Dict) -> Tuple[str, List]:
+    """
+    Build an SQL condition matching every row a rule change can re-score
+
+    classify_risk only tests port membership, service substrings, exact
+    service names and version substrings, so a row can only change if it
+    touches a port, service or indicator added or removed between the
+    two rule sets. The condition may match rows that end up unchanged,
+    never the reverse.
+
+    Args:
+        old_rules: Rule lists the rows were scored with
+        new_rules: Active rule lists
+
+    Returns:
+        Tuple of (SQL condition, parameters); "0" if nothing can change
+    """
+    old = normalize_rules(old_rules)
+    new = normalize_rules(new_rules)
+    clauses: List[str] = []
+    params: List = []
+
+    ports = set()
+    for key in ("high_risk_ports", "medium_risk_ports"):
+        ports |= set(old[key]) ^ set(new[key])
+    if ports:
+        clauses.append(f"port IN ({','.join('?' * len(ports))})")
+        params.extend(sorted(ports))
+
+    services = set(old["unencrypted_services"]) ^ set(new["unencrypted_services"])
+    if services:
+        clauses.append(f"lower(service) IN ({','.join('?' * len(services))})")
+        params.extend(sorted(services))
+
+    for key, column in (("high_risk_services", "service"), ("outdated_indicators", "version")):
+        for word in sorted(set(old[key]) ^ set(new[key])):
+            clauses.append(f"instr(lower({column}), ?) > 0")
+            params.append(word)
+
+    return " OR ".join(clauses) or "0", params
+
+
+def rescore_changed_rules(chunk_size: int = DEFAULT_CHUNK_SIZE, dry_run: bool = False,
+                          db_path: str = DB_NAME) -> Dict:
+    """
+    Re-score only the rows a rule change affects
+
+    For every rule version stored on rows other than the active one, the
+    rule diff selects the candidate rows (see affected_rows_filter); they
+    are re-scored and all rows of that version are stamped with the active
+    version. Rows scored before versioning, or under a rule set that was
+    not recorded, are re-scored in full.
+
+    Args:
+        chunk_size: Rows per chunk
+        dry_run: Count changes without writing them
+        db_path: Path to database file
+
+    Returns:
+        Dictionary with rule_version, versions (per old version: rows,
+        checked, changed), changed, scans_updated and seconds
+    """
+    start = time.perf_counter()
+    current_rules = get_rules()
+    current_version = get_rules_version()
+    stale = {version: count for version, count in get_rule_version_counts(db_path).items()
+             if version != current_version}
+
+    conn = get_connection(db_path)
+    cache: Dict[Tuple, Outcome] = {}
+    versions: Dict[str, Dict] = {}
+    affected_scans = set()
+    changed_total = 0
+
+    for version, count in stale.items():
+        old_rules = get_rule_set(version, db_path) if version else None
+        if old_rules is None:
+            condition, params = "1", []
+        else:
+            condition, params = affected_rows_filter(old_rules, current_rules)
+
+        scope = "rule_version IS NULL" if version is None else "rule_version = ?"
+        scope_params = [] if version is None else [version]
+        print(f"[*] Rule version {version or 'unversioned'}: {count} rows, "
+              f"{'full re-score' if old_rules is None else 'diff-based re-score'}")
+
+        checked, changed, scans = _rescore_rows(conn, f"{scope} AND ({condition})",
+                                                scope_params + params, chunk_size, dry_run, cache)
+        if not dry_run:
+            with conn:
+                conn.execute(f"UPDATE scans SET rule_version = ? WHERE cves IS NULL AND {scope}",
+                             (current_version, *scope_params))
+
+        versions[version or "unversioned"] = {"rows": count, "checked": checked,
+                                              "changed": changed}
+        affected_scans |= scans
+        changed_total += changed
+
+    if stale and not dry_run:
+        with conn:
+            register_rule_set(conn.cursor())
+
+    scans_updated = 0
+    if affected_scans and not dry_run:
+        scans_updated = refresh_scan_summaries(sorted(affected_scans), db_path)
+
+    return {
+        "rule_version": current_version,
+        "versions": versions,
+        "changed": changed_total,
+        "scans_updated": scans_updated,
+        "seconds": round(time.perf_counter() - start, 2)
+    }
+
+
+if __name__ == "__main__":
+    # Example usage: python reclassify.py [scan_id]
+    import sys
+
+    stats = reclassify_scans(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"[+] {stats['rows']} rows checked, {stats['changed']} changed "
+          f"({stats['unique_keys']} distinct keys) in {stats['seconds']}s")
+
+    stats = rescore_changed_rules()
+    print(f"[+] Rules {stats['rule_version']}: {stats['changed']} rows changed "
+          f"in {stats['seconds']}s")
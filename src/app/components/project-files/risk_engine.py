@@ -3,13 +3,131 @@ SecureVigil Risk Engine
 Vulnerability risk classification and remediation recommendations
 """
 
-from typing import Dict, List
+import hashlib
+import heapq
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 
 # Risk classification constants
 HIGH_RISK_PORTS = [21, 23, 25, 445, 1433, 3306, 3389, 5432, 5900, 6379]
 MEDIUM_RISK_PORTS = [80, 139, 443, 8080, 8443]
 HIGH_RISK_SERVICES = ["telnet", "ftp", "smb", "rdp", "mysql", "postgresql", "vnc", "redis"]
 UNENCRYPTED_SERVICES = ["http", "ftp", "telnet", "smtp"]
+OUTDATED_INDICATORS = ["1.0", "2.0", "legacy", "old", "deprecated"]
+
+# Keys accepted in a rules file, with the built-in defaults
+DEFAULT_RULES = {
+    "high_risk_ports": HIGH_RISK_PORTS,
+    "medium_risk_ports": MEDIUM_RISK_PORTS,
+    "high_risk_services": HIGH_RISK_SERVICES,
+    "unencrypted_services": UNENCRYPTED_SERVICES,
+    "outdated_indicators": OUTDATED_INDICATORS,
+}
+
+
+def _substring_matcher(words: List[str]):
+    """Compile a list of substrings into one regex search (None if empty)"""
+    if not words:
+        return None
+    pattern = "|".join(re.escape(word.lower()) for word in words)
+    return re.compile(pattern).search
+
+
+def compile_rules(rules: Dict) -> Dict:
+    """
+    Compile rule lists into constant-time lookups and precompiled matchers
+    
+    Args:
+        rules: Rule lists keyed like DEFAULT_RULES; missing keys use the defaults
+    
+    Returns:
+        Compiled rule table used by classify_risk
+    """
+    unknown = set(rules) - set(DEFAULT_RULES)
+    if unknown:
+        raise ValueError(f"Unknown rule keys: {', '.join(sorted(unknown))}")
+    
+    merged = {key: list(rules.get(key, default)) for key, default in DEFAULT_RULES.items()}
+    return {
+        "source": merged,
+        "version": rules_version(merged),
+        "high_ports": frozenset(int(port) for port in merged["high_risk_ports"]),
+        "medium_ports": frozenset(int(port) for port in merged["medium_risk_ports"]),
+        "high_services": _substring_matcher(merged["high_risk_services"]),
+        "unencrypted": frozenset(service.lower() for service in merged["unencrypted_services"]),
+        "outdated": _substring_matcher(merged["outdated_indicators"]),
+    }
+
+
+def normalize_rules(rules: Dict) -> Dict:
+    """
+    Canonical form of a rule set: every key, sorted and de-duplicated
+    
+    Args:
+        rules: Rule lists keyed like DEFAULT_RULES; missing keys use the defaults
+    
+    Returns:
+        Rule lists with ports as sorted ints and names as sorted lower-case strings
+    """
+    normalized = {}
+    for key, default in DEFAULT_RULES.items():
+        values = rules.get(key, default)
+        if key.endswith("_ports"):
+            normalized[key] = sorted({int(value) for value in values})
+        else:
+            normalized[key] = sorted({str(value).lower() for value in values})
+    return normalized
+
+
+def rules_version(rules: Dict) -> str:
+    """
+    Content hash identifying a rule set
+    
+    Rule sets with the same ports, services and indicators get the same
+    version regardless of order, duplicates or letter case.
+    
+    Args:
+        rules: Rule lists keyed like DEFAULT_RULES
+    
+    Returns:
+        12-character hex version string
+    """
+    canonical = json.dumps(normalize_rules(rules), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+
+_rules = compile_rules(DEFAULT_RULES)
+
+
+def load_rules(path: str) -> Dict:
+    """
+    Load classification rules from a JSON file and make them active
+    
+    The file holds any of the DEFAULT_RULES keys, e.g.
+    {"high_risk_ports": [21, 23, 8081], "outdated_indicators": ["1.0", "eol"]}
+    
+    Args:
+        path: Path to the rules file
+    
+    Returns:
+        The active rule lists
+    """
+    global _rules
+    with open(path) as f:
+        _rules = compile_rules(json.load(f))
+    return get_rules()
+
+
+def get_rules() -> Dict:
+    """Return a copy of the active rule lists"""
+    return {key: list(value) for key, value in _rules["source"].items()}
+
+
+def get_rules_version() -> str:
+    """Return the version of the active rule set"""
+    return _rules["version"]
 
 
 def classify_risk(port: int, service: str, version: str = "") -> str:
@@ -24,34 +142,72 @@ def classify_risk(port: int, service: str, version: str = "") -> str:
     Returns:
         Risk level: "HIGH", "MEDIUM", or "LOW"
     """
+    rules = _rules
     service_lower = service.lower()
     
     # Check for high-risk ports
-    if port in HIGH_RISK_PORTS:
+    if port in rules["high_ports"]:
         return "HIGH"
     
     # Check for high-risk services
-    if any(risky in service_lower for risky in HIGH_RISK_SERVICES):
+    if rules["high_services"] and rules["high_services"](service_lower):
         return "HIGH"
     
     # Check for unencrypted protocols on standard ports
-    if service_lower in UNENCRYPTED_SERVICES:
+    if service_lower in rules["unencrypted"]:
         return "MEDIUM"
     
     # Check for medium-risk ports
-    if port in MEDIUM_RISK_PORTS:
+    if port in rules["medium_ports"]:
         return "MEDIUM"
     
     # Check for outdated versions (basic heuristic)
-    if version:
-        outdated_indicators = ["1.0", "2.0", "legacy", "old", "deprecated"]
-        if any(indicator in version.lower() for indicator in outdated_indicators):
-            return "MEDIUM"
+    if version and rules["outdated"] and rules["outdated"](version.lower()):
+        return "MEDIUM"
     
     # Default to low risk
     return "LOW"
 
 
+# Remediation advice by risk level and service; "default" entries are
+# templates filled with the service name and port
+RECOMMENDATIONS = {
+    "HIGH": {
+        "telnet": "URGENT: Disable Telnet and use SSH instead",
+        "ftp": "URGENT: Disable FTP or use SFTP/FTPS with encryption",
+        "smb": "URGENT: Restrict SMB access, apply patches, use SMBv3",
+        "rdp": "URGENT: Restrict RDP access, use VPN, enable NLA",
+        "mysql": "URGENT: Restrict database access to localhost or VPN only",
+        "postgresql": "URGENT: Restrict database access to localhost or VPN only",
+        "default": "URGENT: Disable or restrict {service} on port {port}"
+    },
+    "MEDIUM": {
+        "http": "Review and consider enabling HTTPS for {service}",
+        "default": "Review and harden {service} configuration"
+    },
+    "LOW": {
+        "default": "Monitor {service} for updates and security advisories"
+    }
+}
+
+CVSS_ESTIMATES = {
+    "HIGH": 7.5,
+    "MEDIUM": 5.0,
+    "LOW": 2.0
+}
+
+# Distinct (risk, service, port) recommendations kept in memory
+RECOMMENDATION_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def _recommendation(risk_level: str, service: str, port: int) -> str:
+    """Build the recommendation for one (risk, service, port) combination"""
+    risk_recommendations = RECOMMENDATIONS.get(risk_level, RECOMMENDATIONS["LOW"])
+    template = risk_recommendations.get(service, risk_recommendations["default"])
+    return template.format(service=service, port=port)
+
+
 def get_recommendation(item: Dict) -> str:
     """
     Provide remediation recommendations based on finding
@@ -62,31 +218,26 @@ def get_recommendation(item: Dict) -> str:
     Returns:
         Remediation recommendation string
     """
-    risk_level = item.get("risk", "LOW")
-    service = item.get("service", "unknown")
-    port = item.get("port", 0)
-    
-    recommendations = {
-        "HIGH": {
-            "telnet": "URGENT: Disable Telnet and use SSH instead",
-            "ftp": "URGENT: Disable FTP or use SFTP/FTPS with encryption",
-            "smb": "URGENT: Restrict SMB access, apply patches, use SMBv3",
-            "rdp": "URGENT: Restrict RDP access, use VPN, enable NLA",
-            "mysql": "URGENT: Restrict database access to localhost or VPN only",
-            "postgresql": "URGENT: Restrict database access to localhost or VPN only",
-            "default": f"URGENT: Disable or restrict {service} on port {port}"
-        },
-        "MEDIUM": {
-            "http": f"Review and consider enabling HTTPS for {service}",
-            "default": f"Review and harden {service} configuration"
-        },
-        "LOW": {
-            "default": f"Monitor {service} for updates and security advisories"
-        }
-    }
+    return _recommendation(item.get("risk", "LOW"), item.get("service", "unknown"),
+                           item.get("port", 0))
+
+
+def get_recommendation_cache_stats() -> Dict:
+    """
+    Report how often recommendations were served from the cache
     
-    risk_recommendations = recommendations.get(risk_level, recommendations["LOW"])
-    return risk_recommendations.get(service, risk_recommendations["default"])
+    Returns:
+        Dictionary with hits, misses, size, maxsize and hit_rate (percent)
+    """
+    info = _recommendation.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": round(info.hits / lookups * 100, 1) if lookups else 0.0
+    }
 
 
 def get_cvss_estimate(risk_level: str) -> float:
@@ -99,20 +250,57 @@ def get_cvss_estimate(risk_level: str) -> float:
     Returns:
         Estimated CVSS score (0-10)
     """
-    cvss_mapping = {
-        "HIGH": 7.5,
-        "MEDIUM": 5.0,
-        "LOW": 2.0
-    }
-    return cvss_mapping.get(risk_level, 0.0)
+    return CVSS_ESTIMATES.get(risk_level, 0.0)
+
 
+# CVSS severity bands used to escalate findings with known vulnerabilities
+CVSS_HIGH = 7.0
+CVSS_MEDIUM = 4.0
+_RISK_RANK = {"LOW": 0, "MEDIUM": 1, "HIGH": 2}
 
-def apply_risk(results: List[Dict]) -> List[Dict]:
+
+def apply_known_vulnerabilities(item: Dict, vuln_index) -> None:
+    """
+    Match a classified finding against an offline vulnerability index
+    
+    Matching findings get a cves list, the highest matching CVSS score
+    (never lower than the estimate) and a risk level raised to that
+    score's severity band; the recommendation names the CVEs.
+    
+    Args:
+        item: Classified scan result
+        vuln_index: vuln_index.VulnerabilityIndex
+    """
+    product = item.get("product") or ""
+    version = item.get("version") or ""
+    matches = vuln_index.match(product, version)
+    if not matches:
+        return
+    
+    cves = [cve for cve, _ in matches]
+    top_cvss = matches[0][1]
+    item["cves"] = cves
+    item["cvss_estimate"] = max(item.get("cvss_estimate") or 0.0, top_cvss)
+    
+    severity = "HIGH" if top_cvss >= CVSS_HIGH else "MEDIUM" if top_cvss >= CVSS_MEDIUM else "LOW"
+    if _RISK_RANK[severity] > _RISK_RANK.get(item["risk"], 0):
+        item["risk"] = severity
+    
+    listed = ", ".join(cves[:3]) + (f" and {len(cves) - 3} more" if len(cves) > 3 else "")
+    prefix = "URGENT: " if item["risk"] == "HIGH" else ""
+    item["recommendation"] = f"{prefix}Upgrade {product} {version} (known vulnerabilities: {listed})"
+
+
+def apply_risk(results: List[Dict], sort: bool = True, vuln_index=None) -> List[Dict]:
     """
     Apply risk classification to all scan results
     
     Args:
         results: List of scan results
+        sort: Order results HIGH -> MEDIUM -> LOW; streaming callers that
+              only need the top findings (see TopFindings) can skip it
+        vuln_index: Optional vuln_index.VulnerabilityIndex for matching
+                    product versions to known CVEs
     
     Returns:
         Results with risk classification and recommendations added
@@ -125,14 +313,170 @@ def apply_risk(results: List[Dict]) -> List[Dict]:
         )
         item["recommendation"] = get_recommendation(item)
         item["cvss_estimate"] = get_cvss_estimate(item["risk"])
+        if vuln_index is not None:
+            apply_known_vulnerabilities(item, vuln_index)
     
-    # Sort by risk level (HIGH -> MEDIUM -> LOW)
-    risk_order = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
-    results.sort(key=lambda x: risk_order.get(x["risk"], 3))
+    if sort:
+        # Sort by risk level (HIGH -> MEDIUM -> LOW)
+        risk_order = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+        results.sort(key=lambda x: risk_order.get(x["risk"], 3))
     
     return results
 
 
+# How critical a compromise of each service would be (0-1)
+SERVICE_CRITICALITY = {
+    "telnet": 1.0, "ms-wbt-server": 1.0, "rdp": 1.0, "microsoft-ds": 1.0, "smb": 1.0,
+    "mysql": 0.9, "postgresql": 0.9, "ms-sql-s": 0.9, "oracle": 0.9, "redis": 0.9,
+    "mongodb": 0.9, "vnc": 0.9, "ftp": 0.8, "snmp": 0.7, "ssh": 0.6, "smtp": 0.5,
+    "http": 0.4, "https": 0.3,
+}
+DEFAULT_CRITICALITY = 0.3
+
+# How reachable a port is, by nmap port state (0-1)
+STATE_EXPOSURE = {"open": 1.0, "open|filtered": 0.5, "filtered": 0.3}
+
+
+def priority_score(item: Dict) -> float:
+    """
+    Composite priority of a classified finding
+    
+    CVSS estimate (0-10) plus 3 x service criticality plus 2 x exposure,
+    where exposure is the port state's reachability with a bonus for
+    cleartext protocols. Findings loaded from the database carry no
+    state and count as open.
+    
+    Args:
+        item: Classified scan result
+    
+    Returns:
+        Score from 0 to 16; higher needs attention sooner
+    """
+    service = (item.get("service") or "").lower()
+    exposure = STATE_EXPOSURE.get(item.get("state", "open"), 0.0)
+    if service in _rules["unencrypted"]:
+        exposure += 0.5
+    return ((item.get("cvss_estimate") or 0.0)
+            + 3 * SERVICE_CRITICALITY.get(service, DEFAULT_CRITICALITY)
+            + 2 * exposure)
+
+
+class TopFindings:
+    """
+    Streaming top-k selector ranked by priority_score
+    
+    Keeps a k-entry min-heap, so n findings cost O(n log k) time and O(k)
+    memory; findings can be pushed batch by batch as a scan streams in.
+    Ties keep the finding seen first.
+    """
+
+    def __init__(self, k: int = 10, risk: Optional[str] = "HIGH"):
+        self.k = k
+        self.risk = risk
+        self.seen = 0
+        self._heap: List[Tuple[float, int, Dict]] = []
+
+    def push(self, item: Dict) -> None:
+        """Offer one classified finding (ignored unless it matches risk)"""
+        if self.k <= 0 or (self.risk is not None and item.get("risk") != self.risk):
+            return
+        self.seen += 1
+        entry = (priority_score(item), -self.seen, item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def update(self, results: Iterable[Dict]) -> "TopFindings":
+        """Offer a batch of findings; returns self for chaining"""
+        for item in results:
+            self.push(item)
+        return self
+
+    def results(self) -> List[Dict]:
+        """Return the selected findings, highest priority first"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2],
+                                              reverse=True)]
+
+
+# Weights used for the overall risk score
+RISK_WEIGHTS = {"HIGH": 10, "MEDIUM": 5, "LOW": 1}
+
+
+class RiskSummary:
+    """
+    Single-pass accumulator for executive summary statistics
+    
+    Add findings one at a time or in batches, and merge partial summaries
+    from parallel shards or streaming batches; to_dict() gives the same
+    fields generate_risk_summary has always returned.
+    """
+
+    __slots__ = ("total", "high", "medium", "low", "risk_score", "hosts")
+
+    def __init__(self):
+        self.total = 0
+        self.high = 0
+        self.medium = 0
+        self.low = 0
+        self.risk_score = 0
+        self.hosts = set()
+
+    def add(self, item: Dict) -> None:
+        """Count one classified finding"""
+        risk = item.get("risk")
+        self.total += 1
+        if risk == "HIGH":
+            self.high += 1
+        elif risk == "MEDIUM":
+            self.medium += 1
+        elif risk == "LOW":
+            self.low += 1
+        # As generate_risk_summary always has: a missing risk weighs as LOW,
+        # an explicit None (or unknown level) as nothing
+        self.risk_score += RISK_WEIGHTS.get(item.get("risk", "LOW"), 0)
+        self.hosts.add(item.get("host"))
+
+    def update(self, results: Iterable[Dict]) -> "RiskSummary":
+        """Count a batch of classified findings; returns self for chaining"""
+        for item in results:
+            self.add(item)
+        return self
+
+    def merge(self, other: "RiskSummary") -> "RiskSummary":
+        """Fold another partial summary into this one; returns self"""
+        self.total += other.total
+        self.high += other.high
+        self.medium += other.medium
+        self.low += other.low
+        self.risk_score += other.risk_score
+        self.hosts |= other.hosts
+        return self
+
+    def to_dict(self) -> Dict:
+        """
+        Return summary statistics
+        
+        Returns:
+            Dictionary with total, high, medium, low, hosts, risk_score and
+            the high/medium/low percentages
+        """
+        summary = {
+            "total": self.total,
+            "high": self.high,
+            "medium": self.medium,
+            "low": self.low,
+            "hosts": len(self.hosts),
+            "risk_score": self.risk_score,
+        }
+        for level in ("high", "medium", "low"):
+            if self.total > 0:
+                summary[f"{level}_percent"] = round(summary[level] / self.total * 100, 1)
+            else:
+                summary[f"{level}_percent"] = 0
+        return summary
+
+
 def generate_risk_summary(results: List[Dict]) -> Dict:
     """
     Generate executive summary statistics
@@ -143,47 +487,21 @@ def generate_risk_summary(results: List[Dict]) -> Dict:
     Returns:
         Dictionary with summary statistics
     """
-    summary = {
-        "total": len(results),
-        "high": sum(1 for r in results if r.get("risk") == "HIGH"),
-        "medium": sum(1 for r in results if r.get("risk") == "MEDIUM"),
-        "low": sum(1 for r in results if r.get("risk") == "LOW"),
-        "hosts": len(set(r.get("host") for r in results)),
-    }
-    
-    # Calculate risk score (weighted average)
-    risk_weights = {"HIGH": 10, "MEDIUM": 5, "LOW": 1}
-    total_risk_score = sum(
-        risk_weights.get(r.get("risk", "LOW"), 0) for r in results
-    )
-    summary["risk_score"] = total_risk_score
-    
-    # Calculate percentages
-    if summary["total"] > 0:
-        summary["high_percent"] = round(summary["high"] / summary["total"] * 100, 1)
-        summary["medium_percent"] = round(summary["medium"] / summary["total"] * 100, 1)
-        summary["low_percent"] = round(summary["low"] / summary["total"] * 100, 1)
-    else:
-        summary["high_percent"] = 0
-        summary["medium_percent"] = 0
-        summary["low_percent"] = 0
-    
-    return summary
+    return RiskSummary().update(results).to_dict()
 
 
-def get_priority_findings(results: List[Dict], limit: int = 10) -> List[Dict]:
+def get_priority_findings(results: Iterable[Dict], limit: int = 10) -> List[Dict]:
     """
     Get top priority vulnerabilities for immediate attention
     
     Args:
-        results: List of scan results
+        results: Scan results (any iterable; it is consumed once)
         limit: Maximum number of findings to return
     
     Returns:
-        List of highest priority findings
+        Highest priority HIGH-risk findings, best first
     """
-    high_risk = [r for r in results if r.get("risk") == "HIGH"]
-    return high_risk[:limit]
+    return TopFindings(limit).update(results).results()
 
 
 if __name__ == "__main__":
@@ -5,7 +5,238 @@ Network vulnerability scanning using Nmap
 
 import nmap
 import json
-from typing import List, Dict, Optional
+import ipaddress
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from finding import Finding
+from targets import shard_targets
+
+# Parallel scanning defaults
+DEFAULT_SHARD_SIZE = 256
+DEFAULT_WORKERS = 4
+DEFAULT_STREAM_SHARD_SIZE = 16
+DEFAULT_DISCOVERY_ARGS = "-sn -T4"
+
+# Progressive scanning: well-known ports right after the priority pass,
+# then the long tail in fixed-size port ranges
+WELL_KNOWN_PORT_MAX = 1024
+DEFAULT_PASS_SIZE = 8192
+MAX_PORT = 65535
+
+# Commonly exposed services swept in the first progressive pass
+COMMON_PORTS = [22, 53, 110, 111, 135, 143, 993, 995, 1723, 8000, 8888]
+
+
+def split_target(target: str, shard_size: int = DEFAULT_SHARD_SIZE) -> List[str]:
+    """
+    Split a CIDR range into host shards for parallel scanning
+    
+    Args:
+        target: IP address or CIDR range, or several separated by spaces
+                (as produced by targets.plan_targets)
+        shard_size: Maximum addresses per shard (rounded down to a power of two)
+    
+    Returns:
+        List of shard targets in address order
+    """
+    if len(target.split()) > 1:
+        return shard_targets(target.split(), shard_size)
+
+    try:
+        network = ipaddress.ip_network(target, strict=False)
+    except ValueError:
+        # Hostnames and nmap range syntax (e.g. 10.0.0.1-50) stay a single shard
+        return [target]
+
+    shard_size = max(shard_size, 1)
+    if network.num_addresses <= shard_size:
+        return [target]
+
+    new_prefix = network.max_prefixlen - (shard_size.bit_length() - 1)
+    return [str(subnet) for subnet in network.subnets(new_prefix=new_prefix)]
+
+
+def strip_version_detection(scan_type: str) -> str:
+    """
+    Remove service/version detection options from nmap arguments
+    
+    The remaining arguments (timing, port selection, scan technique) give
+    a cheap port-state check over the same ports as the full scan.
+    
+    Args:
+        scan_type: Nmap scan arguments
+    
+    Returns:
+        Nmap arguments without -sV, -A and --version-* options
+    """
+    args = scan_type.split()
+    kept = []
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg in ("-sV", "-A", "--version-light", "--version-all", "--version-trace"):
+            continue
+        if arg == "--version-intensity":
+            skip_next = True
+            continue
+        kept.append(arg)
+    return " ".join(kept)
+
+
+def strip_port_selection(scan_type: str) -> str:
+    """
+    Remove port selection options (-p, -p-, -F, --top-ports) from nmap arguments
+    
+    Args:
+        scan_type: Nmap scan arguments
+    
+    Returns:
+        Nmap arguments without port selection, ready for an explicit -p list
+    """
+    args = scan_type.split()
+    kept = []
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg in ("-p", "--top-ports", "--port-ratio"):
+            skip_next = True
+            continue
+        if arg.startswith("-p") or arg == "-F":
+            continue
+        kept.append(arg)
+    return " ".join(kept)
+
+
+def strip_timing(scan_type: str) -> str:
+    """
+    Remove timing and parallelism options from nmap arguments
+    
+    Args:
+        scan_type: Nmap scan arguments
+    
+    Returns:
+        Nmap arguments without -T<n>, --min/max-parallelism, RTT timeout
+        and --host-timeout options
+    """
+    valued = ("--min-parallelism", "--max-parallelism", "--min-rtt-timeout",
+              "--max-rtt-timeout", "--initial-rtt-timeout", "--host-timeout")
+    args = scan_type.split()
+    kept = []
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg in valued:
+            skip_next = True
+            continue
+        if (arg.startswith("-T") and len(arg) == 3) or arg.split("=")[0] in valued:
+            continue
+        kept.append(arg)
+    return " ".join(kept)
+
+
+def format_port_spec(ports: List[Tuple[int, str]]) -> str:
+    """
+    Build an nmap -p value for (port, protocol) pairs
+    
+    Args:
+        ports: List of (port, protocol) tuples
+    
+    Returns:
+        Port specification such as "T:22,80,U:53"
+    """
+    prefixes = {"tcp": "T", "udp": "U", "sctp": "S"}
+    by_proto: Dict[str, List[int]] = {}
+    for port, proto in ports:
+        by_proto.setdefault(proto, []).append(port)
+
+    parts = []
+    for proto in sorted(by_proto):
+        port_list = ",".join(str(port) for port in sorted(set(by_proto[proto])))
+        parts.append(f"{prefixes.get(proto, 'T')}:{port_list}")
+    return ",".join(parts)
+
+
+def compress_ports(ports: List[int]) -> str:
+    """
+    Render a sorted port list as compact nmap ranges
+    
+    Args:
+        ports: Port numbers
+    
+    Returns:
+        Port specification such as "1-20,24,26-52"
+    """
+    ports = sorted(set(ports))
+    parts = []
+    start = prev = None
+    for port in ports:
+        if prev is not None and port == prev + 1:
+            prev = port
+            continue
+        if start is not None:
+            parts.append(str(start) if start == prev else f"{start}-{prev}")
+        start = prev = port
+    if start is not None:
+        parts.append(str(start) if start == prev else f"{start}-{prev}")
+    return ",".join(parts)
+
+
+def build_port_passes(priority_ports: List[int],
+                      pass_size: int = DEFAULT_PASS_SIZE) -> List[str]:
+    """
+    Plan progressive port passes covering all 65535 ports exactly once
+    
+    The first pass covers priority_ports, the second the remaining
+    well-known ports (1-1024), and later passes the rest in ranges of
+    pass_size ports. With no priority ports the well-known pass comes first.
+    
+    Args:
+        priority_ports: Ports to sweep first (e.g. known high-risk ports)
+        pass_size: Ports per long-tail pass
+    
+    Returns:
+        List of nmap -p specifications, one per pass
+    """
+    priority = set(priority_ports)
+    # An empty -p specification would make nmap fail
+    passes = [compress_ports(list(priority))] if priority else []
+
+    boundaries = [(1, WELL_KNOWN_PORT_MAX)]
+    start = WELL_KNOWN_PORT_MAX + 1
+    while start <= MAX_PORT:
+        end = min(start + pass_size - 1, MAX_PORT)
+        boundaries.append((start, end))
+        start = end + 1
+
+    for low, high in boundaries:
+        ports = [port for port in range(low, high + 1) if port not in priority]
+        if ports:
+            passes.append(compress_ports(ports))
+
+    return passes
+
+
+def chunk_hosts(hosts: List[str], shard_size: int = DEFAULT_SHARD_SIZE) -> List[str]:
+    """
+    Group individual hosts into space-separated nmap target shards
+    
+    Args:
+        hosts: List of host addresses
+        shard_size: Maximum hosts per shard
+    
+    Returns:
+        List of shard targets
+    """
+    shard_size = max(shard_size, 1)
+    return [" ".join(hosts[i:i + shard_size]) for i in range(0, len(hosts), shard_size)]
 
 
 class VulnerabilityScanner:
@@ -13,6 +244,7 @@ class VulnerabilityScanner:
     
     def __init__(self):
         self.nm = nmap.PortScanner()
+        self.phase_timings: Dict[str, float] = {}
     
     def scan_target(self, target: str, scan_type: str = "-sV -T4") -> List[Dict]:
         """
@@ -33,32 +265,304 @@ class VulnerabilityScanner:
             print(f"[!] Scan error: {e}")
             return []
 
+        results = self._collect_results(self.nm)
+
+        print(f"[+] Scan complete. Found {len(results)} services on {len(self.nm.all_hosts())} hosts")
+        return results
+
+    def scan_parallel(self, target: str, scan_type: str = "-sV -T4",
+                      workers: int = DEFAULT_WORKERS,
+                      shard_size: int = DEFAULT_SHARD_SIZE) -> List[Dict]:
+        """
+        Split target into host shards and scan them concurrently
+        
+        Each shard runs in its own nmap process, so a slow subnet only
+        holds up its own worker instead of the whole scan.
+        
+        Args:
+            target: IP address or CIDR range
+            scan_type: Nmap scan arguments (default: -sV -T4)
+            workers: Maximum number of concurrent nmap processes
+            shard_size: Maximum addresses per shard
+        
+        Returns:
+            List of discovered services, merged in shard order
+        """
+        shards = split_target(target, shard_size)
+        print(f"[*] Starting parallel scan on {target} "
+              f"({len(shards)} shards, {min(workers, len(shards))} workers)...")
+
+        results, hosts = self._scan_shards(shards, scan_type, workers)
+
+        print(f"[+] Scan complete. Found {len(results)} services on {len(hosts)} hosts")
+        return results
+
+    def iter_scan(self, target: str, scan_type: str = "-sV -T4",
+                  workers: int = DEFAULT_WORKERS,
+                  shard_size: int = DEFAULT_STREAM_SHARD_SIZE) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Stream scan results host by host as shards complete
+        
+        Smaller shards give finer-grained streaming at the cost of more
+        nmap processes. Nothing is accumulated, so memory stays flat
+        regardless of target size.
+        
+        Args:
+            target: IP address or CIDR range
+            scan_type: Nmap scan arguments (default: -sV -T4)
+            workers: Maximum number of concurrent nmap processes
+            shard_size: Maximum addresses per shard
+        
+        Yields:
+            Tuple of (host, list of that host's discovered services)
+        """
+        shards = split_target(target, shard_size)
+        print(f"[*] Starting streaming scan on {target} "
+              f"({len(shards)} shards, {min(workers, len(shards))} workers)...")
+
+        for _, shard_results, shard_hosts in self._iter_shards(shards, scan_type, workers):
+            by_host: Dict[str, List[Dict]] = {host: [] for host in shard_hosts}
+            for item in shard_results:
+                by_host.setdefault(item["host"], []).append(item)
+
+            for host, findings in by_host.items():
+                yield host, findings
+
+    def iter_progressive(self, target: str, scan_type: str, priority_ports: List[int],
+                         workers: int = DEFAULT_WORKERS,
+                         shard_size: int = DEFAULT_STREAM_SHARD_SIZE,
+                         pass_size: int = DEFAULT_PASS_SIZE) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Stream findings pass by pass, priority ports first, then the long tail
+        
+        Any port selection in scan_type is replaced by the pass port lists.
+        Hosts that are down in the first pass are not rescanned; live hosts
+        skip host discovery (-Pn) in later passes.
+        
+        Args:
+            target: IP address or CIDR range
+            scan_type: Nmap scan arguments
+            priority_ports: Ports covered by the first pass
+            workers: Maximum number of concurrent nmap processes
+            shard_size: Maximum addresses per shard
+            pass_size: Ports per long-tail pass
+        
+        Yields:
+            Tuple of (host, list of that host's services found in the current pass)
+        """
+        base_args = strip_port_selection(scan_type)
+        passes = build_port_passes(priority_ports, pass_size)
+        shards = split_target(target, shard_size)
+        live_hosts: List[str] = []
+
+        for number, port_spec in enumerate(passes, 1):
+            label = port_spec if len(port_spec) <= 40 else port_spec[:37] + "..."
+            print(f"[*] Pass {number}/{len(passes)}: ports {label}")
+            start = time.perf_counter()
+            pass_args = f"{base_args} -p {port_spec}"
+
+            if number > 1:
+                if not live_hosts:
+                    break
+                shards = chunk_hosts(live_hosts, shard_size)
+                if "-Pn" not in pass_args.split():
+                    pass_args += " -Pn"
+
+            found = 0
+            for _, shard_results, shard_hosts in self._iter_shards(shards, pass_args, workers):
+                if number == 1:
+                    live_hosts.extend(shard_hosts)
+                by_host: Dict[str, List[Dict]] = {}
+                for item in shard_results:
+                    by_host.setdefault(item["host"], []).append(item)
+                for host, findings in by_host.items():
+                    found += len(findings)
+                    yield host, findings
+
+            print(f"[+] Pass {number}/{len(passes)} complete: {found} services "
+                  f"in {time.perf_counter() - start:.2f} seconds")
+
+    def discover_hosts(self, target: str, discovery_args: str = DEFAULT_DISCOVERY_ARGS,
+                       workers: int = 1,
+                       shard_size: int = DEFAULT_SHARD_SIZE) -> List[str]:
+        """
+        Find live hosts in target with a ping sweep (no port scanning)
+        
+        Args:
+            target: IP address or CIDR range
+            discovery_args: Nmap host discovery arguments (default: -sn -T4)
+            workers: Maximum number of concurrent nmap processes
+            shard_size: Maximum addresses per shard
+        
+        Returns:
+            List of live host addresses
+        """
+        print(f"[*] Discovering live hosts in {target}...")
+        _, hosts = self._scan_shards(split_target(target, shard_size),
+                                     discovery_args, workers)
+        return hosts
+
+    def scan_two_phase(self, target: str, scan_type: str = "-sV -T4",
+                       discovery_args: str = DEFAULT_DISCOVERY_ARGS,
+                       workers: int = 1,
+                       shard_size: int = DEFAULT_SHARD_SIZE) -> List[Dict]:
+        """
+        Ping sweep target first, then run service detection on live hosts only
+        
+        Phase durations are stored in self.phase_timings.
+        
+        Args:
+            target: IP address or CIDR range
+            scan_type: Nmap arguments for the service detection phase
+            discovery_args: Nmap arguments for the discovery phase
+            workers: Maximum number of concurrent nmap processes
+            shard_size: Maximum addresses (or live hosts) per shard
+        
+        Returns:
+            List of discovered services with details
+        """
+        start = time.perf_counter()
+        live_hosts = self.discover_hosts(target, discovery_args, workers, shard_size)
+        discovery_time = time.perf_counter() - start
+        print(f"[+] Discovery complete. {len(live_hosts)} live hosts "
+              f"in {discovery_time:.2f} seconds")
+
+        results: List[Dict] = []
+        if live_hosts:
+            # Hosts are already known to be up, so skip nmap's own ping probe
+            service_args = scan_type if "-Pn" in scan_type.split() else f"{scan_type} -Pn"
+            print(f"[*] Running service detection on {len(live_hosts)} live hosts...")
+            results, _ = self._scan_shards(chunk_hosts(live_hosts, shard_size),
+                                           service_args, workers)
+
+        total_time = time.perf_counter() - start
+        self.phase_timings = {
+            "discovery": round(discovery_time, 2),
+            "service_detection": round(total_time - discovery_time, 2),
+            "total": round(total_time, 2)
+        }
+
+        print(f"[+] Scan complete. Found {len(results)} services on {len(live_hosts)} hosts")
+        print(f"    Discovery: {self.phase_timings['discovery']}s | "
+              f"Service detection: {self.phase_timings['service_detection']}s")
+        return results
+
+    def _scan_shards(self, shards: List[str], scan_type: str,
+                     workers: int) -> Tuple[List[Dict], List[str]]:
+        """
+        Scan shards on a worker pool and merge their output in shard order
+        
+        Args:
+            shards: Shard targets passed to nmap
+            scan_type: Nmap scan arguments
+            workers: Maximum number of concurrent nmap processes
+        
+        Returns:
+            Tuple of (merged results, live hosts)
+        """
+        shard_output: List[Tuple[List[Dict], List[str]]] = [([], []) for _ in shards]
+
+        for index, shard_results, shard_hosts in self._iter_shards(shards, scan_type, workers):
+            shard_output[index] = (shard_results, shard_hosts)
+
+        results = [item for shard_results, _ in shard_output for item in shard_results]
+        hosts = [host for _, shard_hosts in shard_output for host in shard_hosts]
+        return results, hosts
+
+    def _iter_shards(self, shards: List[str], scan_type: str,
+                     workers: int) -> Iterator[Tuple[int, List[Dict], List[str]]]:
+        """
+        Scan shards on a worker pool, yielding each one as soon as it finishes
+        
+        Args:
+            shards: Shard targets passed to nmap
+            scan_type: Nmap scan arguments
+            workers: Maximum number of concurrent nmap processes
+        
+        Yields:
+            Tuple of (shard index, shard results, live hosts in shard)
+        """
+        if not shards:
+            return
+
+        workers = max(1, min(workers, len(shards)))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self._scan_shard, shard, scan_type): index
+                for index, shard in enumerate(shards)
+            }
+            try:
+                for future in as_completed(futures):
+                    shard_results, shard_hosts = future.result()
+                    yield futures[future], shard_results, shard_hosts
+            finally:
+                # Consumer stopped early: drop shards that have not started yet
+                for future in futures:
+                    future.cancel()
+
+    def scan_shard(self, shard: str, scan_type: str) -> Tuple[List[Dict], List[str]]:
+        """
+        Scan a single shard with a dedicated PortScanner, raising nmap errors
+        
+        Args:
+            shard: Shard target passed to nmap
+            scan_type: Nmap scan arguments
+        
+        Returns:
+            Tuple of (shard results, live hosts in shard)
+        """
+        # PortScanner keeps per-scan state, so each worker needs its own
+        nm = nmap.PortScanner()
+        nm.scan(shard, arguments=scan_type)
+
+        hosts = [host for host in nm.all_hosts() if nm[host].state() == "up"]
+        return self._collect_results(nm), hosts
+
+    def _scan_shard(self, shard: str, scan_type: str) -> Tuple[List[Dict], List[str]]:
+        """Scan a single shard, reporting errors and returning empty results"""
+        try:
+            return self.scan_shard(shard, scan_type)
+        except Exception as e:
+            print(f"[!] Scan error on shard {shard}: {e}")
+            return [], []
+
+    @staticmethod
+    def _collect_results(nm: nmap.PortScanner) -> List[Dict]:
+        """
+        Convert PortScanner state into the list of service dictionaries
+        
+        Args:
+            nm: PortScanner that has completed a scan
+        
+        Returns:
+            List of discovered services with details
+        """
         results = []
 
-        for host in self.nm.all_hosts():
+        for host in nm.all_hosts():
             host_info = {
-                "state": self.nm[host].state(),
-                "hostname": self.nm[host].hostname()
+                "state": nm[host].state(),
+                "hostname": nm[host].hostname()
             }
             
-            for proto in self.nm[host].all_protocols():
-                ports = self.nm[host][proto].keys()
+            for proto in nm[host].all_protocols():
+                ports = nm[host][proto].keys()
 
                 for port in ports:
-                    service = self.nm[host][proto][port]
-                    results.append({
-                        "host": host,
-                        "hostname": host_info["hostname"],
-                        "port": port,
-                        "protocol": proto,
-                        "service": service["name"],
-                        "product": service.get("product", ""),
-                        "version": service.get("version", ""),
-                        "extrainfo": service.get("extrainfo", ""),
-                        "state": service["state"]
-                    })
+                    service = nm[host][proto][port]
+                    results.append(Finding(
+                        host=host,
+                        hostname=host_info["hostname"],
+                        port=port,
+                        protocol=proto,
+                        service=service["name"],
+                        product=service.get("product", ""),
+                        version=service.get("version", ""),
+                        extrainfo=service.get("extrainfo", ""),
+                        state=service["state"]
+                    ))
 
-        print(f"[+] Scan complete. Found {len(results)} services on {len(self.nm.all_hosts())} hosts")
         return results
 
 
@@ -77,6 +581,89 @@ def scan_target(target: str, scan_type: str = "-sV -T4") -> List[Dict]:
     return scanner.scan_target(target, scan_type)
 
 
+def scan_target_parallel(target: str, scan_type: str = "-sV -T4",
+                         workers: int = DEFAULT_WORKERS,
+                         shard_size: int = DEFAULT_SHARD_SIZE) -> List[Dict]:
+    """
+    Convenience function for sharded parallel scanning
+    
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap scan arguments
+        workers: Maximum number of concurrent nmap processes
+        shard_size: Maximum addresses per shard
+    
+    Returns:
+        List of scan results
+    """
+    scanner = VulnerabilityScanner()
+    return scanner.scan_parallel(target, scan_type, workers, shard_size)
+
+
+def scan_target_two_phase(target: str, scan_type: str = "-sV -T4",
+                          discovery_args: str = DEFAULT_DISCOVERY_ARGS,
+                          workers: int = 1,
+                          shard_size: int = DEFAULT_SHARD_SIZE) -> Tuple[List[Dict], Dict[str, float]]:
+    """
+    Convenience function for discovery-first scanning
+    
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap arguments for the service detection phase
+        discovery_args: Nmap arguments for the discovery phase
+        workers: Maximum number of concurrent nmap processes
+        shard_size: Maximum addresses per shard
+    
+    Returns:
+        Tuple of (scan results, phase timings in seconds)
+    """
+    scanner = VulnerabilityScanner()
+    results = scanner.scan_two_phase(target, scan_type, discovery_args, workers, shard_size)
+    return results, scanner.phase_timings
+
+
+def iter_scan(target: str, scan_type: str = "-sV -T4",
+              workers: int = DEFAULT_WORKERS,
+              shard_size: int = DEFAULT_STREAM_SHARD_SIZE) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Convenience generator for streaming scans
+    
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap scan arguments
+        workers: Maximum number of concurrent nmap processes
+        shard_size: Maximum addresses per shard
+    
+    Yields:
+        Tuple of (host, list of that host's discovered services)
+    """
+    scanner = VulnerabilityScanner()
+    yield from scanner.iter_scan(target, scan_type, workers, shard_size)
+
+
+def iter_progressive_scan(target: str, scan_type: str, priority_ports: List[int],
+                          workers: int = DEFAULT_WORKERS,
+                          shard_size: int = DEFAULT_STREAM_SHARD_SIZE,
+                          pass_size: int = DEFAULT_PASS_SIZE) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Convenience generator for progressive port coverage scans
+    
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap scan arguments
+        priority_ports: Ports covered by the first pass
+        workers: Maximum number of concurrent nmap processes
+        shard_size: Maximum addresses per shard
+        pass_size: Ports per long-tail pass
+    
+    Yields:
+        Tuple of (host, list of that host's services found in the current pass)
+    """
+    scanner = VulnerabilityScanner()
+    yield from scanner.iter_progressive(target, scan_type, priority_ports,
+                                        workers, shard_size, pass_size)
+
+
 def scan_and_save(target: str, output_file: Optional[str] = None) -> List[Dict]:
     """
     Scan target and optionally save results to JSON
@@ -92,7 +679,7 @@ def scan_and_save(target: str, output_file: Optional[str] = None) -> List[Dict]:
     
     if output_file:
         with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+            json.dump([dict(item) for item in results], f, indent=2)
         print(f"[+] Results saved to {output_file}")
     
     return results
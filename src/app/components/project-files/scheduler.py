@@ -0,0 +1,301 @@
+"""
+SecureVigil Scheduler Module
+Adaptive per-subnet nmap timing driven by measured round-trip time and host timeouts
+"""
+
+import io
+import ipaddress
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple
+
+import nmap
+
+from nmap_xml import iter_host_records
+from scanner import VulnerabilityScanner, split_target, strip_timing, DEFAULT_WORKERS
+
+# Each subnet gets its own timing; /24 by default
+DEFAULT_SUBNET_SIZE = 256
+
+# Addresses in the first shard of a subnet, scanned before anything is measured
+PROBE_SHARD_SIZE = 16
+
+# Smoothing factor for the per-subnet RTT average (same as TCP's SRTT)
+RTT_ALPHA = 0.125
+
+# Ordered fastest to slowest. A subnet uses the first profile whose limits
+# its measured smoothed RTT and timeout rate fit within. The timeout rate is
+# the fraction of responsive hosts that hit --host-timeout, not packet loss.
+TIMING_PROFILES = [
+    {"name": "lan", "max_srtt_ms": 5.0, "max_timeout_rate": 0.0, "shard_size": 256,
+     "args": "-T5 --min-parallelism 64 --host-timeout 2m"},
+    {"name": "datacenter", "max_srtt_ms": 25.0, "max_timeout_rate": 0.02, "shard_size": 64,
+     "args": "-T4 --min-parallelism 16 --host-timeout 5m"},
+    {"name": "wan", "max_srtt_ms": 100.0, "max_timeout_rate": 0.05, "shard_size": 16,
+     "args": "-T3 --max-parallelism 16 --host-timeout 15m"},
+    {"name": "constrained", "max_srtt_ms": float("inf"), "max_timeout_rate": 1.0, "shard_size": 4,
+     "args": "-T2 --max-parallelism 4 --host-timeout 30m"},
+]
+
+# Unmeasured subnets start conservatively so a slow branch link is not flooded
+PROBE_PROFILE = TIMING_PROFILES[2]
+
+
+class SubnetStats:
+    """Running RTT, host timeout and progress measurements for one subnet"""
+
+    def __init__(self, subnet: str):
+        self.subnet = subnet
+        self.profile = PROBE_PROFILE
+        self.srtt_ms: Optional[float] = None
+        self.hosts_up = 0
+        self.timeouts = 0
+        self.shards = 0
+        self.findings = 0
+        self.duration = 0.0
+
+    @property
+    def timeout_rate(self) -> float:
+        """Fraction of responsive hosts that hit the host timeout (not packet loss)"""
+        return self.timeouts / self.hosts_up if self.hosts_up else 0.0
+
+    def observe(self, records: List[Dict]) -> None:
+        """
+        Fold host records from one shard's nmap XML into the measurements
+
+        Args:
+            records: Host records from nmap_xml.iter_host_records
+        """
+        for record in records:
+            if record["state"] != "up":
+                continue  # Down hosts carry no timing information
+            self.hosts_up += 1
+            if record["timedout"]:
+                self.timeouts += 1
+            if record["srtt"] > 0:
+                sample = record["srtt"] / 1000.0  # nmap reports microseconds
+                if self.srtt_ms is None:
+                    self.srtt_ms = sample
+                else:
+                    self.srtt_ms += RTT_ALPHA * (sample - self.srtt_ms)
+
+    def to_dict(self) -> Dict:
+        """Return the subnet report"""
+        return {
+            "subnet": self.subnet,
+            "profile": self.profile["name"],
+            "srtt_ms": round(self.srtt_ms, 2) if self.srtt_ms is not None else None,
+            "timeout_percent": round(self.timeout_rate * 100, 1),
+            "hosts_up": self.hosts_up,
+            "shards": self.shards,
+            "findings": self.findings,
+            "duration": round(self.duration, 2)
+        }
+
+
+def address_shards(subnet: str) -> Iterator[str]:
+    """
+    Cut a subnet into consecutive shards whose size is chosen per shard
+
+    Prime the generator with next(), then send it each shard size; each
+    value it yields is that many addresses (fewer at the end), as
+    space-separated minimal CIDRs. Non-CIDR targets such as hostnames
+    are yielded whole.
+
+    Args:
+        subnet: CIDR range, space-separated CIDR ranges or single target
+
+    Yields:
+        Shard target strings for nmap
+    """
+    size = yield None
+    try:
+        networks = [ipaddress.ip_network(part, strict=False) for part in subnet.split()]
+    except ValueError:
+        yield subnet
+        return
+
+    # A packed shard from targets.shard_targets holds several blocks; a
+    # shard may take the tail of one block and the head of the next
+    pending = [(type(network.network_address), int(network.network_address),
+                int(network.broadcast_address)) for network in networks]
+    index = 0
+    while index < len(pending):
+        blocks = []
+        remaining = size
+        while remaining and index < len(pending):
+            address, first, last = pending[index]
+            end = min(first + remaining - 1, last)
+            blocks.extend(ipaddress.summarize_address_range(address(first), address(end)))
+            remaining -= end - first + 1
+            if end == last:
+                index += 1
+            else:
+                pending[index] = (address, end + 1, last)
+        size = yield " ".join(str(block) for block in blocks)
+
+
+def choose_profile(stats: SubnetStats) -> Dict:
+    """
+    Pick the timing profile matching a subnet's measurements
+
+    Args:
+        stats: Subnet measurements so far
+
+    Returns:
+        Timing profile; the current one if nothing has been measured yet
+    """
+    if stats.srtt_ms is None:
+        return stats.profile
+    for profile in TIMING_PROFILES:
+        if stats.srtt_ms <= profile["max_srtt_ms"] and stats.timeout_rate <= profile["max_timeout_rate"]:
+            return profile
+    return TIMING_PROFILES[-1]
+
+
+def timing_args(stats: SubnetStats) -> str:
+    """
+    Build the timing arguments for a subnet's next shard
+
+    Args:
+        stats: Subnet measurements so far
+
+    Returns:
+        Nmap timing, parallelism and RTT timeout arguments
+    """
+    args = stats.profile["args"]
+    if stats.srtt_ms is not None:
+        # Retransmit well before the profile's generic ceiling on fast links,
+        # and never give up too early on slow ones
+        args += f" --max-rtt-timeout {max(100, int(stats.srtt_ms * 4))}ms"
+    return args
+
+
+class AdaptiveScheduler:
+    """Scan subnets concurrently, each with timing tuned to its own link"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS,
+                 subnet_size: int = DEFAULT_SUBNET_SIZE):
+        self.workers = workers
+        self.subnet_size = subnet_size
+        self.subnet_reports: List[Dict] = []
+
+    def scan(self, target: str, scan_type: str = "-sV -T4") -> List[Dict]:
+        """
+        Scan target, adapting timing per subnet as measurements arrive
+
+        Timing options in scan_type are replaced by the per-subnet profile;
+        all other arguments are passed through unchanged.
+
+        Args:
+            target: IP address or CIDR range
+            scan_type: Nmap scan arguments
+
+        Returns:
+            List of discovered services with details
+        """
+        subnets = split_target(target, self.subnet_size)
+        base_args = strip_timing(scan_type)
+        workers = max(1, min(self.workers, len(subnets)))
+
+        print(f"[*] Adaptive scan of {target}: {len(subnets)} subnets, {workers} at a time")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(lambda subnet: self._scan_subnet(subnet, base_args),
+                                     subnets))
+
+        results: List[Dict] = []
+        self.subnet_reports = []
+        for subnet_results, stats in outcomes:
+            results.extend(subnet_results)
+            self.subnet_reports.append(stats.to_dict())
+
+        print(f"[+] Adaptive scan complete. Found {len(results)} services")
+        return results
+
+    def _scan_subnet(self, subnet: str, base_args: str) -> Tuple[List[Dict], SubnetStats]:
+        """Scan one subnet shard by shard, re-tuning after every shard"""
+        stats = SubnetStats(subnet)
+        results: List[Dict] = []
+        shards = address_shards(subnet)
+        next(shards)
+        shard_size = PROBE_SHARD_SIZE
+        start = time.perf_counter()
+
+        while True:
+            try:
+                shard = shards.send(shard_size)
+            except StopIteration:
+                break
+
+            shard_results, records = self._run_shard(shard, f"{base_args} {timing_args(stats)}")
+            results.extend(shard_results)
+            stats.shards += 1
+            stats.observe(records)
+
+            profile = choose_profile(stats)
+            if profile is not stats.profile:
+                print(f"[*] {subnet}: switching to {profile['name']} timing "
+                      f"(srtt {stats.srtt_ms:.1f} ms, host timeouts {stats.timeout_rate * 100:.1f}%)")
+                stats.profile = profile
+            shard_size = profile["shard_size"]
+
+        stats.findings = len(results)
+        stats.duration = time.perf_counter() - start
+        print(f"[+] {subnet}: {stats.findings} services in {stats.duration:.2f} seconds "
+              f"({stats.profile['name']}, {stats.shards} shards)")
+        return results, stats
+
+    @staticmethod
+    def _run_shard(shard: str, scan_type: str) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Scan one shard and measure it
+
+        Args:
+            shard: Shard target passed to nmap
+            scan_type: Nmap scan arguments
+
+        Returns:
+            Tuple of (shard results, host records with srtt and timeout flags)
+        """
+        try:
+            nm = nmap.PortScanner()
+            nm.scan(shard, arguments=scan_type)
+        except Exception as e:
+            print(f"[!] Scan error on shard {shard}: {e}")
+            return [], []
+
+        # python-nmap drops <times>, so read RTTs from the raw XML
+        xml = nm.get_nmap_last_output()
+        if isinstance(xml, str):
+            xml = xml.encode()
+        records = list(iter_host_records(io.BytesIO(xml))) if xml else []
+        return VulnerabilityScanner._collect_results(nm), records
+
+
+def adaptive_scan_target(target: str, scan_type: str = "-sV -T4",
+                         workers: int = DEFAULT_WORKERS,
+                         subnet_size: int = DEFAULT_SUBNET_SIZE) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Convenience function for adaptive per-subnet scanning
+
+    Args:
+        target: IP address or CIDR range
+        scan_type: Nmap scan arguments
+        workers: Number of subnets scanned concurrently
+        subnet_size: Addresses per independently tuned subnet
+
+    Returns:
+        Tuple of (scan results, per-subnet timing reports)
+    """
+    scheduler = AdaptiveScheduler(workers, subnet_size)
+    results = scheduler.scan(target, scan_type)
+    return results, scheduler.subnet_reports
+
+
+if __name__ == "__main__":
+    # Example usage
+    results, reports = adaptive_scan_target("192.168.1.0/23", workers=2)
+    for report in reports:
+        print(f"{report['subnet']:<20} {report['profile']:<12} "
+              f"srtt {report['srtt_ms']} ms  {report['duration']}s")
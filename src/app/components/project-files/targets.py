@@ -0,0 +1,274 @@
+"""
+SecureVigil Targets Module
+Target planning: merge overlapping ranges, subtract exclusions, emit minimal CIDR shards
+"""
+
+import bisect
+import ipaddress
+from typing import List, Dict, Iterable, Optional, Tuple
+
+# (IP version, first address, last address) as integers
+Interval = Tuple[int, int, int]
+
+
+def parse_target(spec: str) -> Optional[Interval]:
+    """
+    Convert a target specification into an integer address interval
+
+    Args:
+        spec: IP address, CIDR range, full range (10.0.0.5-10.0.0.9)
+              or nmap last-octet range (10.0.0.5-9)
+
+    Returns:
+        Interval, or None for hostnames and other nmap syntax
+    """
+    try:
+        network = ipaddress.ip_network(spec, strict=False)
+        return (network.version, int(network.network_address), int(network.broadcast_address))
+    except ValueError:
+        pass
+
+    if "-" not in spec:
+        return None
+
+    start_text, end_text = spec.split("-", 1)
+    try:
+        start = ipaddress.ip_address(start_text)
+        if start.version == 4 and end_text.isdigit():
+            # nmap shorthand: only the last octet varies
+            end = ipaddress.ip_address(start_text.rsplit(".", 1)[0] + "." + end_text)
+        else:
+            end = ipaddress.ip_address(end_text)
+    except ValueError:
+        return None
+
+    if start.version != end.version or end < start:
+        return None
+    return (start.version, int(start), int(end))
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Merge overlapping and adjacent intervals
+
+    Args:
+        intervals: Address intervals in any order
+
+    Returns:
+        Sorted, non-overlapping intervals
+    """
+    merged: List[Interval] = []
+    for version, first, last in sorted(intervals):
+        if merged and merged[-1][0] == version and first <= merged[-1][2] + 1:
+            if last > merged[-1][2]:
+                merged[-1] = (version, merged[-1][1], last)
+        else:
+            merged.append((version, first, last))
+    return merged
+
+
+class ExclusionSet:
+    """Sorted, merged exclusion intervals with bisect lookups"""
+
+    def __init__(self, intervals: Iterable[Interval]):
+        self.intervals = merge_intervals(intervals)
+        # Sort keys for bisect: (version, first)
+        self._starts = [(version, first) for version, first, _ in self.intervals]
+
+    def __contains__(self, address: Tuple[int, int]) -> bool:
+        index = bisect.bisect_right(self._starts, address) - 1
+        if index < 0:
+            return False
+        version, _, last = self.intervals[index]
+        return version == address[0] and address[1] <= last
+
+    def subtract(self, interval: Interval) -> List[Interval]:
+        """
+        Remove excluded addresses from an interval
+
+        Args:
+            interval: Address interval
+
+        Returns:
+            Remaining pieces of the interval, in address order
+        """
+        version, first, last = interval
+        pieces: List[Interval] = []
+
+        # Start from the last exclusion beginning at or before the interval
+        index = max(bisect.bisect_right(self._starts, (version, first)) - 1, 0)
+        while index < len(self.intervals) and first <= last:
+            ex_version, ex_first, ex_last = self.intervals[index]
+            if ex_version > version or (ex_version == version and ex_first > last):
+                break
+            if ex_version == version and ex_last >= first:
+                if ex_first > first:
+                    pieces.append((version, first, ex_first - 1))
+                first = ex_last + 1
+            index += 1
+
+        if first <= last:
+            pieces.append((version, first, last))
+        return pieces
+
+
+def interval_to_cidrs(interval: Interval) -> List[str]:
+    """
+    Express an interval as the minimal list of CIDR blocks
+
+    Args:
+        interval: Address interval
+
+    Returns:
+        CIDR strings in address order
+    """
+    version, first, last = interval
+    address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+    return [str(network) for network in
+            ipaddress.summarize_address_range(address(first), address(last))]
+
+
+def plan_targets(targets: List[str], exclude: Optional[List[str]] = None) -> Dict:
+    """
+    Merge overlapping targets and subtract exclusions
+
+    IP addresses, CIDRs and ranges are merged and emitted as minimal CIDR
+    blocks. Hostnames and other nmap syntax cannot be merged; they are
+    de-duplicated, dropped if listed verbatim in exclude, and kept as-is.
+    Their addresses are only known once nmap resolves them, so while any
+    are kept the exclusions are also returned as an nmap --exclude list.
+
+    Args:
+        targets: Target specifications
+        exclude: Specifications of addresses that must not be scanned
+
+    Returns:
+        Dictionary with targets (CIDRs then other specs), addresses (count
+        after planning), requested (count before), duplicates, excluded and
+        nmap_exclude (exclusions for nmap's --exclude; empty unless other
+        specs are kept)
+    """
+    intervals: List[Interval] = []
+    others: List[str] = []
+    for spec in targets:
+        interval = parse_target(spec)
+        if interval is not None:
+            intervals.append(interval)
+        elif spec not in others:
+            others.append(spec)
+
+    exclusions: List[Interval] = []
+    excluded_names = set()
+    for spec in exclude or []:
+        interval = parse_target(spec)
+        if interval is not None:
+            exclusions.append(interval)
+        else:
+            excluded_names.add(spec)
+
+    requested = sum(last - first + 1 for _, first, last in intervals)
+    merged = merge_intervals(intervals)
+    merged_count = sum(last - first + 1 for _, first, last in merged)
+
+    exclusion_set = ExclusionSet(exclusions)
+    remaining = [piece for interval in merged for piece in exclusion_set.subtract(interval)]
+    remaining_count = sum(last - first + 1 for _, first, last in remaining)
+
+    cidrs = [cidr for interval in remaining for cidr in interval_to_cidrs(interval)]
+    others = [spec for spec in others if spec not in excluded_names]
+
+    nmap_exclude: List[str] = []
+    if others:
+        # nmap has no a.b.c.d-e.f.g.h syntax, so ranges go over as CIDR blocks
+        nmap_exclude = [cidr for interval in exclusion_set.intervals
+                        for cidr in interval_to_cidrs(interval)]
+        nmap_exclude += sorted(excluded_names)
+
+    return {
+        "targets": cidrs + others,
+        "addresses": remaining_count,
+        "requested": requested,
+        "duplicates": requested - merged_count,
+        "excluded": merged_count - remaining_count,
+        "nmap_exclude": nmap_exclude
+    }
+
+
+def shard_targets(targets: List[str], shard_size: int) -> List[str]:
+    """
+    Pack planned targets into shards of at most shard_size addresses
+
+    Blocks larger than shard_size are split into power-of-two subnets;
+    smaller blocks are packed together (space-separated, as nmap accepts)
+    so a long list of scattered hosts does not become one nmap run each.
+
+    Args:
+        targets: Non-overlapping targets, e.g. plan_targets()["targets"]
+        shard_size: Maximum addresses per shard
+
+    Returns:
+        List of shard target strings
+    """
+    shard_size = max(shard_size, 1)
+    shards: List[str] = []
+    current: List[str] = []
+    current_size = 0
+
+    for spec in targets:
+        interval = parse_target(spec)
+        if interval is None:
+            shards.append(spec)
+            continue
+
+        blocks = []
+        for cidr in interval_to_cidrs(interval):
+            network = ipaddress.ip_network(cidr)
+            if network.num_addresses > shard_size:
+                new_prefix = network.max_prefixlen - (shard_size.bit_length() - 1)
+                blocks.extend(network.subnets(new_prefix=new_prefix))
+            else:
+                blocks.append(network)
+
+        for block in blocks:
+            size = block.num_addresses
+            if current and current_size + size > shard_size:
+                shards.append(" ".join(current))
+                current, current_size = [], 0
+            current.append(str(block))
+            current_size += size
+
+    if current:
+        shards.append(" ".join(current))
+    return shards
+
+
+def read_target_file(path: str) -> List[str]:
+    """
+    Read target specifications from a file
+
+    One or more specifications per line, separated by whitespace or commas;
+    anything after # is a comment.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        List of target specifications
+    """
+    specs = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            specs.extend(spec for spec in line.replace(",", " ").split() if spec)
+    return specs
+
+
+if __name__ == "__main__":
+    # Example usage
+    plan = plan_targets(["10.0.0.0/24", "10.0.0.128/25", "10.0.1.5", "10.0.0.10-10.0.1.20"],
+                        exclude=["10.0.0.64/28", "10.0.1.7"])
+    print(f"Targets: {' '.join(plan['targets'])}")
+    print(f"{plan['addresses']} addresses ({plan['duplicates']} duplicate, "
+          f"{plan['excluded']} excluded)")
+    for shard in shard_targets(plan["targets"], 64):
+        print(f"  shard: {shard}")
@@ -0,0 +1,63 @@
+"""
+SecureVigil Database Tests
+Migration to the normalized layout and index coverage of every query
+"""
+
+import sqlite3
+
+import pytest
+
+from database import (init_db, save_scan, get_scan_by_id, get_all_scans, migrate_to_normalized,
+                      check_query_plans, close_connections)
+from risk_engine import apply_risk
+
+SCAN_A = [
+    {"host": "10.0.0.1", "hostname": "gw.lab", "port": 22, "protocol": "tcp", "state": "open",
+     "service": "ssh", "product": "OpenSSH", "version": "7.2p2 Ubuntu 4ubuntu2.10"},
+    {"host": "10.0.0.1", "hostname": "gw.lab", "port": 23, "protocol": "tcp", "state": "open",
+     "service": "telnet", "product": "", "version": ""},
+    {"host": "10.0.0.2", "hostname": None, "port": 22, "protocol": "tcp", "state": "open",
+     "service": "ssh", "product": "OpenSSH", "version": "7.2p2 Ubuntu 4ubuntu2.10"},
+]
+SCAN_B = [
+    {"host": "10.0.0.2", "hostname": "", "port": 161, "protocol": "udp", "state": "open",
+     "service": "snmp", "product": "", "version": ""},
+    {"host": "10.0.0.3", "hostname": "web.lab", "port": 443, "protocol": "tcp", "state": "open",
+     "service": "https", "product": "nginx", "version": "1.18.0",
+     "cves": ["CVE-2021-23017"]},
+]
+
+
+def _snapshot(db_path):
+    return ([dict(item) for item in get_scan_by_id("scan_a", db_path)],
+            [dict(item) for item in get_scan_by_id("scan_b", db_path)],
+            get_all_scans(100, db_path))
+
+
+def test_migrate_to_normalized_preserves_results(tmp_path):
+    db_path = str(tmp_path / "scans.db")
+    init_db(db_path)
+    save_scan(apply_risk(SCAN_A), "10.0.0.0/30", scan_id="scan_a", db_path=db_path)
+    save_scan(apply_risk(SCAN_B), "10.0.0.0/30", scan_id="scan_b", db_path=db_path)
+    before = _snapshot(db_path)
+
+    stats = migrate_to_normalized(db_path)
+    close_connections(db_path)
+
+    assert stats["rows"] == 5
+    assert (stats["hosts"], stats["fingerprints"]) == (3, 4)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT type FROM sqlite_master WHERE name = 'scans'").fetchone() == (
+            "view",)
+    assert _snapshot(db_path) == before
+    assert migrate_to_normalized(db_path)["rows"] == 0
+
+
+@pytest.mark.parametrize("normalized", [False, True])
+def test_every_query_uses_an_index(tmp_path, normalized):
+    db_path = str(tmp_path / "scans.db")
+    init_db(db_path, normalized=normalized)
+
+    assert check_query_plans(db_path) == {}
+    # The seeded old scan was traced through the cleanup and removed again
+    assert get_scan_by_id("query_plan_check", db_path) == []
@@ -0,0 +1,77 @@
+"""
+SecureVigil Job Queue Tests
+Shard bookkeeping when the last outstanding shard fails or is retried
+"""
+
+import sqlite3
+
+import job_queue
+from job_queue import (enqueue_scan, claim_shard, run_worker, get_scan_progress,
+                       is_scan_complete, reset_interrupted_shards, MAX_ATTEMPTS)
+
+
+class FailingScanner:
+    """Scanner stand-in that finds nothing and errors on one shard"""
+
+    def __init__(self, failing_shard):
+        self.failing_shard = failing_shard
+
+    def scan_shard(self, shard, scan_type):
+        if shard == self.failing_shard:
+            raise RuntimeError("nmap exited with status 1")
+        return [], []
+
+
+def _summary_notes(db_path, scan_id):
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute("SELECT notes FROM scan_summary WHERE scan_id = ?",
+                           (scan_id,)).fetchone()
+    return row[0] if row else None
+
+
+def test_last_shard_failing_finalizes_scan(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "queue.db")
+    monkeypatch.setattr(job_queue, "VulnerabilityScanner",
+                        lambda: FailingScanner("10.0.0.12/30"))
+
+    scan_id = enqueue_scan("10.0.0.0/28", shard_size=4, scan_id="scan_fail",
+                           db_path=db_path)
+    run_worker("worker-1", scan_id, exit_when_idle=True, db_path=db_path)
+
+    assert get_scan_progress(scan_id, db_path) == {"pending": 0, "running": 0,
+                                                   "done": 3, "failed": 1}
+    assert is_scan_complete(scan_id, db_path)
+    assert _summary_notes(db_path, scan_id) == "[1 shards failed]"
+
+
+def test_expired_last_shard_finalizes_scan(tmp_path):
+    db_path = str(tmp_path / "queue.db")
+    scan_id = enqueue_scan("10.0.0.0/30", shard_size=4, scan_id="scan_lease",
+                           db_path=db_path)
+
+    # A worker claimed the only shard for the last time and went silent
+    assert claim_shard("worker-1", scan_id=scan_id, db_path=db_path) is not None
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE scan_shards SET attempts = ?, claimed_at = '2000-01-01 00:00:00'",
+                     (MAX_ATTEMPTS,))
+
+    assert claim_shard("worker-2", scan_id=scan_id, db_path=db_path) is None
+    assert get_scan_progress(scan_id, db_path)["failed"] == 1
+    assert is_scan_complete(scan_id, db_path)
+    assert _summary_notes(db_path, scan_id) == "[1 shards failed]"
+
+
+def test_retrying_failed_shard_reopens_finalized_scan(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "queue.db")
+    monkeypatch.setattr(job_queue, "VulnerabilityScanner",
+                        lambda: FailingScanner("10.0.0.4/30"))
+    scan_id = enqueue_scan("10.0.0.0/29", shard_size=4, scan_id="scan_retry",
+                           db_path=db_path)
+    run_worker("worker-1", scan_id, exit_when_idle=True, db_path=db_path)
+    assert is_scan_complete(scan_id, db_path)
+
+    assert reset_interrupted_shards(scan_id, retry_failed=True, db_path=db_path) == 1
+    assert get_scan_progress(scan_id, db_path) == {"pending": 1, "running": 0,
+                                                   "done": 1, "failed": 0}
+    assert not is_scan_complete(scan_id, db_path)
+    assert _summary_notes(db_path, scan_id) is None
@@ -0,0 +1,103 @@
+"""
+SecureVigil Nmap XML Tests
+Streaming parse of saved nmap output
+"""
+
+import gzip
+import io
+
+import nmap
+import pytest
+
+from nmap_xml import iter_findings, iter_host_findings
+from scanner import VulnerabilityScanner
+
+SCAN_XML = b"""<?xml version="1.0"?>
+<nmaprun scanner="nmap" args="nmap -sV -oX - 10.0.0.0/29" start="0" version="7.94">
+<scaninfo type="syn" protocol="tcp" numservices="1000" services="1-1000"/>
+<host>
+  <status state="up" reason="arp-response" reason_ttl="0"/>
+  <address addr="10.0.0.1" addrtype="ipv4"/>
+  <address addr="00:11:22:33:44:55" addrtype="mac"/>
+  <hostnames>
+    <hostname name="gw.ptr.lab" type="PTR"/>
+    <hostname name="gateway" type="user"/>
+  </hostnames>
+  <ports>
+    <port protocol="tcp" portid="22"><state state="open" reason="syn-ack" reason_ttl="0"/>
+      <service name="ssh" product="OpenSSH" version="7.2p2 Ubuntu 4ubuntu2.10" extrainfo="Ubuntu Linux; protocol 2.0" method="probed" conf="10"/></port>
+    <port protocol="tcp" portid="80"><state state="filtered" reason="no-response" reason_ttl="0"/>
+      <service name="http" method="table" conf="3"/></port>
+  </ports>
+  <times srtt="1200" rttvar="100" to="100000"/>
+</host>
+<host>
+  <status state="up" reason="echo-reply" reason_ttl="0"/>
+  <address addr="00:aa:bb:cc:dd:ee" addrtype="mac"/>
+  <address addr="10.0.0.2" addrtype="ipv4"/>
+  <hostnames>
+    <hostname name="db1.lab" type="PTR"/>
+    <hostname name="db1-alias.lab" type="PTR"/>
+  </hostnames>
+  <ports>
+    <port protocol="tcp" portid="3306"><state state="open" reason="syn-ack" reason_ttl="0"/>
+      <service name="mysql" product="MySQL" version="5.7.33" method="probed" conf="10"/></port>
+    <port protocol="udp" portid="161"><state state="open" reason="udp-response" reason_ttl="0"/></port>
+  </ports>
+</host>
+<host>
+  <status state="up" reason="echo-reply" reason_ttl="0"/>
+  <address addr="10.0.0.3" addrtype="ipv4"/>
+  <hostnames/>
+  <ports>
+    <port protocol="tcp" portid="443"><state state="open" reason="syn-ack" reason_ttl="0"/>
+      <service name="https" product="nginx" version="1.18.0" method="probed" conf="10"/></port>
+  </ports>
+</host>
+<runstats><finished time="1" timestr="x" elapsed="1.0" summary="x" exit="success"/>
+<hosts up="3" down="5" total="8"/></runstats>
+</nmaprun>
+"""
+
+
+def _key(item):
+    return item["host"], item["protocol"], item["port"]
+
+
+def test_iter_findings_fields_and_hostnames():
+    findings = {_key(item): dict(item) for item in iter_findings(io.BytesIO(SCAN_XML))}
+
+    assert len(findings) == 5
+    # A user-supplied name wins over PTR records, otherwise the first name is used
+    assert findings["10.0.0.1", "tcp", 22]["hostname"] == "gateway"
+    assert findings["10.0.0.2", "tcp", 3306]["hostname"] == "db1.lab"
+    assert findings["10.0.0.3", "tcp", 443]["hostname"] == ""
+
+    ssh = findings["10.0.0.1", "tcp", 22]
+    assert (ssh["service"], ssh["product"], ssh["version"], ssh["state"]) == (
+        "ssh", "OpenSSH", "7.2p2 Ubuntu 4ubuntu2.10", "open")
+    assert ssh["extrainfo"] == "Ubuntu Linux; protocol 2.0"
+    assert findings["10.0.0.1", "tcp", 80]["state"] == "filtered"
+    # Ports without a <service> element still produce a finding
+    assert findings["10.0.0.2", "udp", 161]["service"] == ""
+
+
+def test_iter_host_findings_groups_by_host_and_reads_gzip(tmp_path):
+    path = tmp_path / "scan.xml.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(SCAN_XML)
+
+    hosts = [(host, len(findings)) for host, findings in iter_host_findings(str(path))]
+    assert hosts == [("10.0.0.1", 2), ("10.0.0.2", 2), ("10.0.0.3", 1)]
+
+
+def test_iter_findings_matches_python_nmap():
+    try:
+        nm = nmap.PortScanner()
+    except nmap.PortScannerError:
+        pytest.skip("nmap binary not installed")
+    nm.analyse_nmap_xml_scan(nmap_xml_output=SCAN_XML.decode())
+
+    expected = sorted((dict(item) for item in VulnerabilityScanner._collect_results(nm)), key=_key)
+    parsed = sorted((dict(item) for item in iter_findings(io.BytesIO(SCAN_XML))), key=_key)
+    assert parsed == expected
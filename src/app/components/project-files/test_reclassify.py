@@ -0,0 +1,49 @@
+"""
+SecureVigil Reclassification Tests
+Diff-based re-scoring when a port moves between rule sets
+"""
+
+import risk_engine
+from database import init_db, save_scan, get_scan_by_id, close_connections
+from reclassify import affected_rows_filter, rescore_changed_rules
+from risk_engine import DEFAULT_RULES, apply_risk, compile_rules
+
+# 8080 moves from the medium to the high risk ports
+MOVED_RULES = {
+    **DEFAULT_RULES,
+    "high_risk_ports": DEFAULT_RULES["high_risk_ports"] + [8080],
+    "medium_risk_ports": [port for port in DEFAULT_RULES["medium_risk_ports"] if port != 8080],
+}
+
+
+def test_filter_includes_port_moved_between_rule_sets():
+    condition, params = affected_rows_filter(DEFAULT_RULES, MOVED_RULES)
+
+    assert condition == "port IN (?)"
+    assert params == [8080]
+    # Reordering or repeating a list is not a change
+    reordered = {**DEFAULT_RULES, "high_risk_ports": DEFAULT_RULES["high_risk_ports"][::-1] + [21]}
+    assert affected_rows_filter(DEFAULT_RULES, reordered) == ("0", [])
+
+
+def test_rescore_changed_rules_updates_moved_port(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "scans.db")
+    init_db(db_path)
+    results = apply_risk([
+        {"host": "10.0.0.1", "port": 8080, "protocol": "tcp", "state": "open",
+         "service": "http-proxy", "product": "Jetty", "version": "9.4"},
+        {"host": "10.0.0.1", "port": 443, "protocol": "tcp", "state": "open",
+         "service": "https", "product": "nginx", "version": "1.18"},
+    ])
+    scan_id = save_scan(results, "10.0.0.1", scan_id="scan_rules", db_path=db_path)
+    assert {item["port"]: item["risk"] for item in get_scan_by_id(scan_id, db_path)} == {
+        8080: "MEDIUM", 443: "MEDIUM"}
+
+    monkeypatch.setattr(risk_engine, "_rules", compile_rules(MOVED_RULES))
+    stats = rescore_changed_rules(db_path=db_path)
+    close_connections(db_path)
+
+    assert stats["changed"] == 1
+    assert list(stats["versions"].values())[0]["checked"] == 1
+    assert {item["port"]: item["risk"] for item in get_scan_by_id(scan_id, db_path)} == {
+        8080: "HIGH", 443: "MEDIUM"}
@@ -0,0 +1,49 @@
+"""
+SecureVigil Risk Engine Tests
+Summary accumulation and priority selection
+"""
+
+from finding import Finding
+from risk_engine import RiskSummary, generate_risk_summary, get_priority_findings
+
+
+def _one_pass_summary(results):
+    """The original list-based computation RiskSummary must reproduce"""
+    risk_weights = {"HIGH": 10, "MEDIUM": 5, "LOW": 1}
+    summary = {
+        "total": len(results),
+        "high": sum(1 for r in results if r.get("risk") == "HIGH"),
+        "medium": sum(1 for r in results if r.get("risk") == "MEDIUM"),
+        "low": sum(1 for r in results if r.get("risk") == "LOW"),
+        "hosts": len(set(r.get("host") for r in results)),
+        "risk_score": sum(risk_weights.get(r.get("risk", "LOW"), 0) for r in results),
+    }
+    for level in ("high", "medium", "low"):
+        summary[f"{level}_percent"] = (round(summary[level] / summary["total"] * 100, 1)
+                                       if summary["total"] else 0)
+    return summary
+
+
+RESULTS = [
+    {"host": "10.0.0.1", "port": 23, "risk": "HIGH"},
+    {"host": "10.0.0.1", "port": 80, "risk": "MEDIUM"},
+    {"host": "10.0.0.2", "port": 443, "risk": "LOW"},
+    {"host": "10.0.0.2", "port": 8443, "risk": None},
+    {"host": "10.0.0.3", "port": 8080},
+    Finding(host="10.0.0.3", port=22, risk="HIGH"),
+    Finding(host="10.0.0.4", port=25),
+]
+
+
+def test_summary_matches_one_pass_computation():
+    assert generate_risk_summary(RESULTS) == _one_pass_summary(RESULTS)
+
+
+def test_merged_summaries_match_one_pass_computation():
+    merged = RiskSummary().update(RESULTS[:3]).merge(RiskSummary().update(RESULTS[3:]))
+    assert merged.to_dict() == _one_pass_summary(RESULTS)
+
+
+def test_priority_findings_with_zero_limit():
+    assert get_priority_findings(RESULTS, limit=0) == []
+    assert len(get_priority_findings(RESULTS, limit=1)) == 1
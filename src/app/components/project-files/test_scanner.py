@@ -0,0 +1,31 @@
+"""
+SecureVigil Scanner Tests
+Progressive port pass planning
+"""
+
+from scanner import build_port_passes, WELL_KNOWN_PORT_MAX, MAX_PORT
+
+
+def _expand(port_spec):
+    ports = []
+    for part in port_spec.split(","):
+        low, _, high = part.partition("-")
+        ports.extend(range(int(low), int(high or low) + 1))
+    return ports
+
+
+def test_port_passes_cover_every_port_once():
+    passes = build_port_passes([3389, 22, 80, 8080])
+
+    assert passes[0] == "22,80,3389,8080"
+    ports = [port for port_spec in passes for port in _expand(port_spec)]
+    assert sorted(ports) == list(range(1, MAX_PORT + 1))
+
+
+def test_port_passes_without_priority_ports():
+    passes = build_port_passes([])
+
+    assert all(passes)
+    assert passes[0] == f"1-{WELL_KNOWN_PORT_MAX}"
+    ports = [port for port_spec in passes for port in _expand(port_spec)]
+    assert sorted(ports) == list(range(1, MAX_PORT + 1))
@@ -0,0 +1,70 @@
+"""
+SecureVigil Targets Tests
+Interval merging, exclusion lookups and CIDR planning
+"""
+
+from targets import (parse_target, merge_intervals, ExclusionSet, interval_to_cidrs,
+                     plan_targets)
+
+
+def _ip(text):
+    return parse_target(text)[1]
+
+
+def test_merge_intervals_overlap_adjacency_and_versions():
+    intervals = [parse_target("10.0.0.8/29"), parse_target("10.0.0.0-10.0.0.9"),
+                 parse_target("10.0.0.16"), parse_target("10.0.0.18"),
+                 parse_target("::a-::f")]
+
+    assert merge_intervals(intervals) == [
+        (4, _ip("10.0.0.0"), _ip("10.0.0.16")),  # overlap, then adjacent .16
+        (4, _ip("10.0.0.18"), _ip("10.0.0.18")),
+        (6, 0xA, 0xF),
+    ]
+    # Equal integers in different IP versions are never merged
+    assert merge_intervals([(6, 1, 5), (4, 1, 5)]) == [(4, 1, 5), (6, 1, 5)]
+
+
+def test_exclusion_set_contains_and_subtract():
+    exclusions = ExclusionSet([parse_target("10.0.0.4-7"), parse_target("10.0.0.6-10.0.0.9"),
+                               parse_target("10.0.0.20")])
+
+    assert (4, _ip("10.0.0.4")) in exclusions
+    assert (4, _ip("10.0.0.9")) in exclusions
+    assert (4, _ip("10.0.0.10")) not in exclusions
+    assert (4, _ip("10.0.0.3")) not in exclusions
+    assert (6, _ip("10.0.0.5")) not in exclusions
+
+    pieces = exclusions.subtract(parse_target("10.0.0.0/27"))
+    assert pieces == [(4, _ip("10.0.0.0"), _ip("10.0.0.3")),
+                      (4, _ip("10.0.0.10"), _ip("10.0.0.19")),
+                      (4, _ip("10.0.0.21"), _ip("10.0.0.31"))]
+    assert exclusions.subtract(parse_target("10.0.0.5-8")) == []
+    assert ExclusionSet([]).subtract((4, 1, 9)) == [(4, 1, 9)]
+
+
+def test_interval_to_cidrs_minimal_blocks():
+    assert interval_to_cidrs(parse_target("10.0.0.5-10.0.0.20")) == [
+        "10.0.0.5/32", "10.0.0.6/31", "10.0.0.8/29", "10.0.0.16/30", "10.0.0.20/32"]
+    assert interval_to_cidrs(parse_target("10.0.0.0/24")) == ["10.0.0.0/24"]
+    assert interval_to_cidrs(parse_target("2001:db8::/127")) == ["2001:db8::/127"]
+
+
+def test_plan_targets_subtracts_exclusions_from_addresses():
+    plan = plan_targets(["10.0.0.0/28", "10.0.0.8-20"], exclude=["10.0.0.4/30"])
+
+    assert plan["targets"] == ["10.0.0.0/30", "10.0.0.8/29", "10.0.0.16/30", "10.0.0.20/32"]
+    assert (plan["requested"], plan["duplicates"], plan["excluded"], plan["addresses"]) == (
+        29, 8, 4, 17)
+    assert plan["nmap_exclude"] == []
+
+
+def test_plan_targets_passes_exclusions_to_nmap_for_hostnames():
+    plan = plan_targets(["10.0.0.0/29", "web.lab", "10.0.1-3.*", "web.lab", "db.lab"],
+                        exclude=["10.0.0.1-10.0.0.2", "10.0.2.0/24", "db.lab", "mail.lab"])
+
+    assert plan["targets"] == ["10.0.0.0/32", "10.0.0.3/32", "10.0.0.4/30",
+                               "web.lab", "10.0.1-3.*"]
+    # Ranges become CIDRs; names nmap will resolve itself are kept
+    assert plan["nmap_exclude"] == ["10.0.0.1/32", "10.0.0.2/32", "10.0.2.0/24",
+                                    "db.lab", "mail.lab"]
@@ -0,0 +1,59 @@
+"""
+SecureVigil Vulnerability Index Tests
+Version ordering and interval matching, including overlapping ranges
+"""
+
+from vuln_index import VulnerabilityIndex, version_key
+
+VULN_CSV = """product,affected_from,fixed_in,cve,cvss
+openbsd:openssh|openssh,,7.2p2,CVE-OLD,5.0
+openbsd:openssh|openssh,7.2p2,7.4,CVE-P2,7.5
+openbsd:openssh|openssh,7.3,,CVE-OPEN,4.0
+example:widget,1.0,3.0,CVE-WIDE,6.0
+example:widget,1.5,1.6,CVE-NARROW-1,9.0
+example:widget,2.0,2.1,CVE-NARROW-2,8.0
+example:widget,2.5,,CVE-LATEST,3.0
+"""
+
+
+def _index(tmp_path):
+    path = tmp_path / "vulns.csv"
+    path.write_text(VULN_CSV)
+    return VulnerabilityIndex(str(path))
+
+
+def _cves(index, product, version):
+    return [cve for cve, _ in index.match(product, version)]
+
+
+def test_version_key_ordering():
+    ordered = ["1.0", "1.0p1", "1.1", "2.4.9", "2.4.52", "7.2p2",
+               "7.2p2 Ubuntu 4ubuntu2.10", "7.3"]
+    assert sorted(ordered, key=version_key) == ordered
+
+
+def test_overlapping_ranges_walk_back_past_shorter_ranges(tmp_path):
+    index = _index(tmp_path)
+
+    assert _cves(index, "widget", "0.9") == []
+    # Highest CVSS first
+    assert _cves(index, "widget", "1.5.3") == ["CVE-NARROW-1", "CVE-WIDE"]
+    assert _cves(index, "widget", "2.0") == ["CVE-NARROW-2", "CVE-WIDE"]
+    # Two narrower ranges start closer to the version but have ended
+    assert _cves(index, "widget", "2.2") == ["CVE-WIDE"]
+    assert _cves(index, "widget", "2.7") == ["CVE-WIDE", "CVE-LATEST"]
+    assert _cves(index, "widget", "3.0") == ["CVE-LATEST"]
+    assert _cves(index, "Example:Widget", "1.5") == ["CVE-NARROW-1", "CVE-WIDE"]
+
+
+def test_distribution_version_suffixes(tmp_path):
+    index = _index(tmp_path)
+
+    # A vendor suffix sorts after the upstream version it is built from
+    assert _cves(index, "OpenSSH", "7.2p2 Ubuntu 4ubuntu2.10") == ["CVE-P2"]
+    assert _cves(index, "OpenSSH", "7.2p1") == ["CVE-OLD"]
+    assert _cves(index, "OpenSSH", "7.3p1 Debian") == ["CVE-P2", "CVE-OPEN"]
+    assert _cves(index, "openbsd:OpenSSH", "8.9p1") == ["CVE-OPEN"]
+    assert _cves(index, "OpenSSH", "") == []
+    assert _cves(index, "OpenSSH", "unknown") == []
+    assert _cves(index, "Dropbear", "7.2") == []
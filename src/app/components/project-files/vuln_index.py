@@ -0,0 +1,171 @@
+"""
+SecureVigil Vulnerability Index Module
+Offline product/version matching against known vulnerabilities
+"""
+
+import bisect
+import csv
+import re
+from functools import lru_cache
+from typing import List, Dict, Tuple
+
+# Distinct (product, version) lookups kept in memory
+MATCH_CACHE_SIZE = 65536
+
+# Comparable version key: one (kind, number, text) part per component
+VersionKey = Tuple[Tuple[int, int, str], ...]
+
+# Sorts above every real version; marks an open-ended range
+_UNBOUNDED = ((2, 0, ""),)
+
+_VERSION_PART = re.compile(r"\d+|[a-z]+")
+_NAME_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+def version_key(version: str) -> VersionKey:
+    """
+    Turn a version string into a comparable tuple
+
+    Numeric components compare as numbers and sort after letter components
+    at the same position, so 1.0 < 1.0p1 < 1.1 and 2.4.9 < 2.4.52.
+
+    Args:
+        version: Version string such as "8.9p1" or "2.4.52"
+
+    Returns:
+        Version key
+    """
+    return tuple((1, int(part), "") if part.isdigit() else (0, 0, part)
+                 for part in _VERSION_PART.findall(version.lower()))
+
+
+def normalize_product(name: str) -> str:
+    """Lower-case a product name and collapse spaces, dashes and underscores"""
+    return _NAME_SEPARATORS.sub("_", name.strip().lower())
+
+
+class VulnerabilityIndex:
+    """
+    Per-product interval index of vulnerable version ranges
+
+    The data file is CSV with a header row and the columns
+
+        product,affected_from,fixed_in,cve,cvss
+
+    product is a CPE-like vendor:product name; extra names nmap reports
+    for it can follow, separated by "|" (e.g.
+    "openbsd:openssh|openssh"). A finding is affected when
+    affected_from <= version < fixed_in; an empty bound is open-ended.
+
+    Ranges for each product are sorted by start with a running maximum of
+    the ends, so a lookup bisects to the last range starting at or below
+    the version and walks back only while an earlier range can still
+    reach it.
+
+    The file is parsed once into these in-memory tables; each process
+    that loads the index holds its own copy.
+    """
+
+    def __init__(self, path: str, cache_size: int = MATCH_CACHE_SIZE):
+        self.path = path
+        self.entries = 0
+        self._products: Dict[str, Dict] = {}
+        self._load(path)
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _load(self, path: str) -> None:
+        """Read the data file and build the intervals"""
+        ranges: Dict[str, List[Tuple[VersionKey, VersionKey, str, float]]] = {}
+
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                names = [normalize_product(name) for name in row["product"].split("|")]
+                # vendor:product is also matched on the bare product name
+                names += [name.split(":", 1)[1] for name in names if ":" in name]
+                interval = (
+                    version_key(row["affected_from"]) if row["affected_from"] else (),
+                    version_key(row["fixed_in"]) if row["fixed_in"] else _UNBOUNDED,
+                    row["cve"].strip(),
+                    float(row["cvss"] or 0.0),
+                )
+                for name in set(names):
+                    ranges.setdefault(name, []).append(interval)
+                self.entries += 1
+
+        for name, intervals in ranges.items():
+            intervals.sort()
+            max_ends = []
+            running = ()
+            for interval in intervals:
+                running = max(running, interval[1])
+                max_ends.append(running)
+            self._products[name] = {
+                "starts": [interval[0] for interval in intervals],
+                "intervals": intervals,
+                "max_ends": max_ends,
+            }
+
+    def _match(self, product: str, version: str) -> Tuple[Tuple[str, float], ...]:
+        """Find known vulnerabilities for one product and version (cached)"""
+        table = self._products.get(normalize_product(product))
+        if table is None or not version:
+            return ()
+
+        key = version_key(version)
+        # Without a number the version cannot be placed in any range
+        if not any(kind for kind, _, _ in key):
+            return ()
+
+        matches = []
+        index = bisect.bisect_right(table["starts"], key) - 1
+        while index >= 0 and table["max_ends"][index] > key:
+            _, end, cve, cvss = table["intervals"][index]
+            if key < end:
+                matches.append((cve, cvss))
+            index -= 1
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return tuple(matches)
+
+    def cache_stats(self) -> Dict:
+        """Return hits, misses and hit rate (percent) of the match cache"""
+        info = self.match.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups * 100, 1) if lookups else 0.0
+        }
+
+    @property
+    def product_count(self) -> int:
+        """Number of distinct product names (including aliases) indexed"""
+        return len(self._products)
+
+    def __len__(self) -> int:
+        return self.entries
+
+
+def load_index(path: str) -> VulnerabilityIndex:
+    """
+    Load an offline vulnerability data file
+
+    Args:
+        path: Path to the CSV data file
+
+    Returns:
+        VulnerabilityIndex ready for matching
+    """
+    index = VulnerabilityIndex(path)
+    print(f"[+] Loaded {len(index)} vulnerability records for "
+          f"{index.product_count} product names from {path}")
+    return index
+
+
+if __name__ == "__main__":
+    # Example usage: python vuln_index.py vulns.csv OpenSSH 7.2p2
+    import sys
+
+    vulns = load_index(sys.argv[1])
+    for cve, cvss in vulns.match(sys.argv[2], sys.argv[3]):
+        print(f"  {cve} (CVSS {cvss})")